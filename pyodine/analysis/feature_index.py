@@ -0,0 +1,272 @@
+"""A precomputed index of the features in a reference spectrum.
+
+Locating a sample by cross-correlating it with the whole reference is costly
+and needs to be redone for every new sample.  The reference, however, doesn't
+change.  This module extracts its characteristic points (extrema and
+zero-crossings) at multiple scales once, together with a signature of their
+surroundings.  Samples are then located by looking up their own characteristic
+points' signatures in the index and verifying the few resulting candidates by a
+local cross-correlation.
+
+The index of a reference file is stored next to it and reused as long as the
+reference file doesn't change.
+"""
+import hashlib
+import logging
+from typing import Dict, List, Tuple  # pylint: disable=unused-import
+
+import numpy as np
+from scipy import ndimage, signal
+
+from .feature_locator import FeatureLocator
+
+# Smoothing widths (standard deviation of gaussian kernel) in reference samples
+# at which to extract features.
+SCALES = (2, 8, 32)
+
+# Signatures sample the smoothed signal around a feature at this many points,
+# spanning this many smoothing widths to either side.
+SIGNATURE_LENGTH = 32
+SIGNATURE_RADIUS = 8
+
+# Ignore features that are less pronounced than this fraction of the most
+# pronounced feature at the same scale.  The reference index is more inclusive
+# than samples, as samples usually only contain a few prominent features.
+REF_FEATURE_THRESH = 0.02
+SAMPLE_FEATURE_THRESH = 0.1
+
+# Signatures need to be at least this similar (cosine similarity in [-1, 1])
+# for a feature to be considered a look-up hit.
+SIGNATURE_MATCH_THRESH = 0.9
+
+# Don't verify more than this many candidate positions.
+MAX_CANDIDATES = 5
+
+INDEX_FORMAT_VERSION = 1
+
+LOGGER = logging.getLogger('pyodine.analysis.feature_index')
+
+Features = Tuple[np.ndarray, np.ndarray, np.ndarray]
+"""Positions, kinds (-1: minimum, 0: zero-crossing, 1: maximum) and
+signatures of the features found at one scale."""
+
+
+def extract_features(data: np.ndarray, scale: float,
+                     threshold: float) -> Features:
+    """Find the characteristic points of ``data`` at the given scale.
+
+    :param scale: Smoothing width in samples.
+    :param threshold: Ignore extrema lower and zero-crossings flatter than
+                this fraction of the highest extremum/steepest crossing.
+    :returns: Positions, kinds and signatures of all features, whose signature
+                fits into ``data``.
+    """
+    smooth = ndimage.gaussian_filter1d(np.asarray(data, dtype=float), scale)
+    slope = np.gradient(smooth)
+    maxima = signal.argrelmax(smooth)[0]
+    minima = signal.argrelmin(smooth)[0]
+    crossings = np.flatnonzero(np.diff(np.signbit(smooth)))
+
+    extrema = np.concatenate((maxima, minima))
+    height = np.abs(smooth[extrema])
+    extrema = extrema[height >= threshold * height.max()] if extrema.size else extrema
+    steepness = np.abs(slope[crossings])
+    crossings = (crossings[steepness >= threshold * steepness.max()]
+                 if crossings.size else crossings)
+
+    positions = np.concatenate((extrema, crossings))
+    kinds = np.concatenate((np.sign(smooth[extrema]), np.zeros(len(crossings))))
+    radius = SIGNATURE_RADIUS * scale
+    fits = (positions >= radius) & (positions < len(data) - radius)
+    positions, kinds = positions[fits], kinds[fits]
+
+    offsets = np.linspace(-radius, radius, SIGNATURE_LENGTH)
+    grid = positions[:, np.newaxis] + offsets
+    signatures = np.interp(grid, np.arange(len(smooth)), smooth)
+    signatures -= signatures.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(signatures, axis=1)
+    usable = norms > 0
+    signatures = signatures[usable] / norms[usable, np.newaxis]
+    return positions[usable], kinds[usable], signatures
+
+
+class ReferenceIndex:
+    """Features of a reference spectrum, extracted at multiple scales."""
+
+    def __init__(self, reference: np.ndarray) -> None:
+        """Build the index.  This is the costly part, avoid doing it twice.
+
+        :param reference: The reference signal, sampled equidistantly.
+        """
+        self.reference = np.asarray(reference, dtype=float)
+        self.features = {scale: extract_features(self.reference, scale,
+                                                 REF_FEATURE_THRESH)
+                         for scale in SCALES}  # type: Dict[int, Features]
+        # Allows for calculating the norm of any reference section in O(1).
+        self._cum_squares = np.concatenate(([0], np.cumsum(self.reference**2)))
+
+    @classmethod
+    def for_file(cls, filename: str) -> 'ReferenceIndex':
+        """Load the index of a binary (float64) reference file.
+
+        The index is stored as ``<filename>.index.npz``.  If there is no such
+        file or if it doesn't match the reference, the index is rebuilt and
+        saved.
+        """
+        with open(filename, 'rb') as file:
+            raw = file.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        index_file = filename + '.index.npz'
+        try:
+            with np.load(index_file) as stored:
+                if (str(stored['sha1']) == digest
+                        and int(stored['version']) == INDEX_FORMAT_VERSION):
+                    return cls._from_arrays(stored)
+            LOGGER.info("Index %s is outdated.", index_file)
+        except (OSError, KeyError, ValueError):
+            LOGGER.info("No usable index for %s, building one.", filename)
+        index = cls(np.frombuffer(raw, dtype=np.float64))
+        try:
+            index.save(index_file, digest)
+        except OSError:
+            LOGGER.warning("Couldn't save index to %s.", index_file)
+            LOGGER.debug("Reason:", exc_info=True)
+        return index
+
+    def save(self, filename: str, sha1: str = '') -> None:
+        """Store the index in a .npz file.
+
+        :param sha1: Hash of the reference file the index was built from.
+        """
+        arrays = {'reference': self.reference, 'sha1': sha1,
+                  'version': INDEX_FORMAT_VERSION}
+        for scale, (positions, kinds, signatures) in self.features.items():
+            arrays['positions_{}'.format(scale)] = positions
+            arrays['kinds_{}'.format(scale)] = kinds
+            arrays['signatures_{}'.format(scale)] = signatures
+        with open(filename, 'wb') as file:
+            np.savez(file, **arrays)
+
+    def find_candidates(self, sample: np.ndarray,
+                        tolerance: int) -> List[int]:
+        """Look up where the sample's features occur in the reference.
+
+        :param sample: The sample, resampled to the reference's sample rate.
+        :param tolerance: Consider features this many samples apart to belong
+                    to the same sample placement.
+        :returns: The most probable reference indices of the sample's left
+                    edge, sorted by the number of matching features.
+        """
+        votes = []  # type: List[np.ndarray]
+        weights = []  # type: List[np.ndarray]
+        for scale in SCALES:
+            ref_pos, ref_kinds, ref_sigs = self.features[scale]
+            pos, kinds, sigs = extract_features(sample, scale,
+                                                SAMPLE_FEATURE_THRESH)
+            if not len(pos) or not len(ref_pos):
+                continue
+            similarity = sigs @ ref_sigs.transpose()
+            similarity[kinds[:, np.newaxis] != ref_kinds] = -1
+            hits = np.nonzero(similarity > SIGNATURE_MATCH_THRESH)
+            votes.append(ref_pos[hits[1]] - pos[hits[0]])
+            weights.append(similarity[hits])
+        if not votes:
+            return []
+        offsets, weights = np.concatenate(votes), np.concatenate(weights)
+        valid = ((offsets >= -tolerance)
+                 & (offsets <= len(self.reference) - len(sample) + tolerance))
+        offsets, weights = offsets[valid], weights[valid]
+        if not offsets.size:
+            return []
+
+        # Cluster the votes and rank clusters by accumulated similarity.
+        bins = np.round(offsets / tolerance).astype(int)
+        unique_bins, members = np.unique(bins, return_inverse=True)
+        scores = np.bincount(members, weights=weights)
+        best = np.argsort(scores)[::-1][:MAX_CANDIDATES]
+        return [int(np.median(offsets[members == b])) for b in best]
+
+    def correlate_locally(self, sample: np.ndarray, center: int, tolerance: int,
+                          feature_threshold: float) -> Tuple[int, np.ndarray]:
+        """Cross-correlate the sample with the reference around ``center``.
+
+        The correlation is normalized the same way
+        :meth:`FeatureLocator.correlate` does.
+
+        :param sample: Normalized sample at the reference's rate.
+        :returns: The reference index of the first correlation value and the
+                    normalized correlation for sample placements within
+                    ``tolerance`` of ``center``.
+        """
+        n_sample, n_ref = len(sample), len(self.reference)
+        lower = min(max(0, center - tolerance), n_ref - n_sample)
+        upper = max(min(n_ref - n_sample, center + tolerance), lower)
+        corr = signal.correlate(self.reference[lower:upper + n_sample], sample,
+                                mode='valid')
+        norms = self.section_norms(n_sample)
+        local_norms = norms[lower:upper + 1].copy()
+        local_norms[local_norms < norms.max() * feature_threshold] = 1.11111111
+        return lower, corr / local_norms
+
+    def section_norms(self, length: int) -> np.ndarray:
+        """Norms of all reference sections of given length."""
+        squares = self._cum_squares[length:] - self._cum_squares[:-length]
+        return np.sqrt(np.maximum(squares, 0))
+
+    @classmethod
+    def _from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'ReferenceIndex':
+        index = cls.__new__(cls)
+        index.reference = arrays['reference']
+        index.features = {
+            scale: (arrays['positions_{}'.format(scale)],
+                    arrays['kinds_{}'.format(scale)],
+                    arrays['signatures_{}'.format(scale)])
+            for scale in SCALES}
+        index._cum_squares = np.concatenate(([0], np.cumsum(index.reference**2)))
+        return index
+
+
+class IndexedFeatureLocator(FeatureLocator):
+    """A :class:`FeatureLocator` using a precomputed :class:`ReferenceIndex`.
+
+    Results are compatible with the plain ``FeatureLocator``, but only a few
+    short sections of the reference are correlated with each sample.  If the
+    index doesn't yield any candidates, this falls back to a full
+    cross-correlation.
+    """
+    def __init__(self, index: ReferenceIndex, ref_span: float,
+                 feature_threshold: float = 0.001) -> None:
+        super().__init__(feature_threshold)
+        self.index = index
+        self.reference = index.reference
+        self.ref_span = ref_span
+
+    def locate_sample(self, sample: np.ndarray, span: float) -> List[List[float]]:
+        """Locate a sample in the reference.  See base class for details."""
+        if sample.shape[0] != 2:
+            raise ValueError("Sample has to have (2, n) shape for n sampled points.")
+        if not span > 0 or not span < self.ref_span:
+            raise ValueError("Sample span needs to be in ]0, <ref. span>[.")
+        self._set_sample(sample, span)
+
+        tolerance = 2 * max(SCALES)
+        candidates = self.index.find_candidates(self._sample, tolerance)
+        if not candidates:
+            LOGGER.debug("Index lookup failed, correlating globally.")
+            return super().locate_sample(sample, span)
+
+        maxima = []  # type: List[List[float]]
+        correlations = []  # type: List[np.ndarray]
+        for center in candidates:
+            start, corr = self.index.correlate_locally(
+                self._sample, center, tolerance, self.feature_threshold)
+            correlations.append(corr)
+            peak = int(np.argmax(corr))
+            if 0 < start + peak < len(self._ref) - len(self._sample):
+                position = (start + peak) / len(self._ref) * self.ref_span
+                if not any(abs(m[0] - position) < 1e-9 for m in maxima):
+                    maxima.append([position, corr[peak]])
+
+        # `rate_finds()` relies on the correlation for judging single finds.
+        self._corr = np.concatenate(correlations)
+        return self.rate_finds(maxima)
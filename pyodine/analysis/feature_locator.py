@@ -266,7 +266,7 @@ class FeatureLocator:
         # on.
         inter = interpolate.Akima1DInterpolator(xvals, sampled_points[1])
         n_samples = (span / self.ref_span) * len(self.reference)
-        sample = inter(np.linspace(0, 1, n_samples))
+        sample = inter(np.linspace(0, 1, int(round(n_samples))))
 
         # Normalize values for reproducible cross correllation results.
         norm = np.linalg.norm(sample)
@@ -1,9 +1,15 @@
 """Parses various freq. time series input into "Measurement" objects."""
 
+import hashlib
+import logging
+from typing import Iterator, Sequence, Tuple
 import numpy as np
 import matplotlib.pyplot as plt
+import pandas as pd
 import allantools  # https://github.com/aewallin/allantools
 
+LOGGER = logging.getLogger('measurement')
+
 
 class Measurement:
     def __init__(self, times: iter=[], frequencies: iter=[]) -> None:
@@ -58,16 +64,199 @@ class Measurement:
         plt.show()
 
 
-def from_counter_dat(filename: str) -> Measurement:
-    times, freqs = np.loadtxt(filename, usecols=(1, 3), skiprows=2,
-                              unpack=True)
+class _AdevLevel:
+    """Running sums of one octave of :class:`AdevAccumulator`."""
+
+    def __init__(self, averaging_factor: int, stride: int) -> None:
+        self.averaging_factor = averaging_factor
+        self.stride = stride  # Only use every ~th phase point.
+        self.lag = averaging_factor // stride  # Lag in decimated points.
+        self.tail = np.zeros(1)  # Last 2 * lag decimated phase points.
+        self.sum = 0.
+        self.count = 0
+
+
+class AdevAccumulator:
+    """Calculate the overlapping Allan deviation of a stream of samples.
+
+    Frequency samples may be fed in blocks of any size at any time, the
+    deviations at octave-spaced averaging times can be queried in between.
+
+    Only a fixed number of phase points is kept for every octave, independent
+    of the stream length.  For averaging factors up to ``resolution`` this
+    yields the exact overlapping ADEV.  Beyond that, only ``resolution``
+    equally spaced overlapping estimates per averaging interval are used,
+    which is a common and negligible approximation.
+    """
+
+    def __init__(self, sample_interval: float, resolution: int = 16,
+                 max_octaves: int = 30) -> None:
+        """
+        :param sample_interval: Time between two consecutive samples (tau0).
+        :param resolution: Number of overlapping estimates per averaging
+                    interval to keep on long averaging times.  Power of 2.
+        :param max_octaves: Don't evaluate averaging times longer than
+                    ``2**max_octaves * sample_interval``.
+        :raises ValueError: Invalid parameters.
+        """
+        if not sample_interval > 0:
+            raise ValueError("Sample interval must be positive.")
+        if resolution < 1 or resolution & (resolution - 1):
+            raise ValueError("Resolution must be a power of 2.")
+        self.sample_interval = sample_interval
+        self.n_samples = 0
+        self._levels = [_AdevLevel(2**k, max(1, 2**k // resolution))
+                        for k in range(max_octaves + 1)]
+        self._phase = 0.
+        self._reference = None  # type: float
+
+    def feed(self, frequencies: np.ndarray) -> None:
+        """Ingest the next block of equally spaced frequency samples."""
+        freqs = np.asarray(frequencies, dtype=float)
+        if not freqs.size:
+            return
+        if self._reference is None:
+            # ADEV doesn't depend on constant offsets.  Subtracting one keeps
+            # the accumulated phase small and thus precise.
+            self._reference = freqs[0]
+        phase = np.cumsum(freqs - self._reference)
+        phase *= self.sample_interval
+        phase += self._phase
+
+        # `phase` holds the phase points n + 1 ... n + len(freqs), with phase
+        # point 0 being zero by definition.
+        first_index = self.n_samples + 1
+        for level in self._levels:
+            lag = level.lag
+            offset = -first_index % level.stride
+            points = np.concatenate((level.tail, phase[offset::level.stride]))
+            if len(points) > 2 * lag:
+                diff = points[2 * lag:] - 2 * points[lag:-lag] + points[:-2 * lag]
+                level.sum += np.dot(diff, diff)
+                level.count += len(diff)
+            level.tail = points[-2 * lag:]
+        self._phase = phase[-1]
+        self.n_samples += len(freqs)
+
+    def adev(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The current deviation estimates.
+
+        :returns: Averaging times, deviations and the number of estimates each
+                    deviation is based on.  Only averaging times with at least
+                    one estimate are included.
+        """
+        levels = [l for l in self._levels if l.count]
+        taus = np.array([l.averaging_factor for l in levels]) * self.sample_interval
+        counts = np.array([l.count for l in levels])
+        sums = np.array([l.sum for l in levels])
+        return taus, np.sqrt(sums / (2 * taus**2 * counts)), counts
+
+
+def adev_from_counter_dat(filename: str, gate_time: float = None,
+                          chunk_size: int = 100000,
+                          **kwargs) -> AdevAccumulator:
+    """Evaluate Allan deviations of a counter file without loading it whole.
+
+    :param gate_time: Sample interval of the data.  Is taken from the first
+                two time stamps if omitted.
+    :param chunk_size: Read this many lines at a time.
+    :param kwargs: Are passed on to :class:`AdevAccumulator`.
+    """
+    accumulator = None  # type: AdevAccumulator
+    for times, freqs in iter_counter_dat(filename, chunk_size):
+        if accumulator is None:
+            accumulator = AdevAccumulator(
+                gate_time if gate_time else times[1] - times[0], **kwargs)
+        accumulator.feed(freqs)
+    return accumulator
+
+
+def iter_counter_dat(filename: str,
+                     chunk_size: int = 100000) -> Iterator[Tuple[np.ndarray,
+                                                                 np.ndarray]]:
+    """Read a counter file in chunks, as :func:`from_counter_dat` does.
+
+    :param chunk_size: Number of lines per chunk.
+    :returns: Iterator over (times, frequencies) tuples.
+    """
+    for chunk in _read_columns(filename, (1, 3), 2, chunk_size):
+        yield chunk[:, 0], chunk[:, 1]
+
+
+def load_columns(filename: str, usecols: Sequence[int], skiprows: int,
+                 use_cache: bool = True) -> np.ndarray:
+    """Read some columns of a large whitespace separated text file.
+
+    This returns the same as ``np.loadtxt(filename, usecols=usecols,
+    skiprows=skiprows, unpack=True)``, but uses a fast chunked parser.  The
+    result is cached in a binary file next to the source file.  The cache is
+    keyed by the parse options and the source file's hash, so it is refreshed
+    if the source changes.
+
+    :param use_cache: Use and create the cache file.  If the cache can't be
+                written, loading still succeeds.
+    :returns: Array of shape (len(usecols), n_rows).
+    """
+    if not use_cache:
+        return _parse_columns(filename, usecols, skiprows)
+    digest = _hash_file(filename)
+    cache_file = '{}.cols{}.skip{}.npz'.format(
+        filename, '-'.join(str(col) for col in usecols), skiprows)
+    try:
+        with np.load(cache_file) as cache:
+            if (str(cache['sha1']) == digest
+                    and list(cache['usecols']) == list(usecols)
+                    and int(cache['skiprows']) == skiprows):
+                return cache['data']
+        LOGGER.info("Cache %s is outdated.", cache_file)
+    except (OSError, KeyError, ValueError):
+        LOGGER.debug("No usable cache for %s.", filename)
+    data = _parse_columns(filename, usecols, skiprows)
+    try:
+        with open(cache_file, 'wb') as file:
+            np.savez(file, sha1=digest, usecols=usecols, skiprows=skiprows,
+                     data=data)
+    except OSError:
+        LOGGER.warning("Couldn't write cache file %s.", cache_file)
+        LOGGER.debug("Reason:", exc_info=True)
+    return data
+
+
+def _hash_file(filename: str, block_size: int = 2**20) -> str:
+    sha1 = hashlib.sha1()
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def _parse_columns(filename: str, usecols: Sequence[int], skiprows: int,
+                   chunk_size: int = 1000000) -> np.ndarray:
+    chunks = list(_read_columns(filename, usecols, skiprows, chunk_size))
+    if not chunks:
+        return np.empty((len(usecols), 0))
+    return np.concatenate(chunks).transpose()
+
+
+def _read_columns(filename: str, usecols: Sequence[int], skiprows: int,
+                  chunk_size: int) -> Iterator[np.ndarray]:
+    """Parse text columns chunk-wise, yielding (n, len(usecols)) arrays."""
+    reader = pd.read_csv(filename, sep=r'\s+', header=None, skiprows=skiprows,
+                         usecols=usecols, dtype=float, engine='c',
+                         chunksize=chunk_size)
+    for chunk in reader:
+        # pandas sorts selected columns by file position; restore given order.
+        yield chunk[list(usecols)].values
+
+
+def from_counter_dat(filename: str, use_cache: bool = True) -> Measurement:
+    times, freqs = load_columns(filename, (1, 3), 2, use_cache)
     msmnt = Measurement(times=times, frequencies=freqs)
     return msmnt
 
 
-def from_cnt91_txt(filename: str) -> Measurement:
-    times, freqs = np.loadtxt(filename, usecols=(0, 1), skiprows=1,
-                              unpack=True)
+def from_cnt91_txt(filename: str, use_cache: bool = True) -> Measurement:
+    times, freqs = load_columns(filename, (0, 1), 1, use_cache)
     msmnt = Measurement(times=times, frequencies=freqs)
     msmnt.gate_time = times[1] - times[0]
     return msmnt
@@ -2,10 +2,11 @@
 
 import ast
 import base64
+import functools
 import logging
-from typing import NamedTuple
+from typing import Dict, NamedTuple, Sequence, Tuple, Union  # pylint: disable=unused-import
 import numpy as np
-from scipy import signal
+from scipy import ndimage, signal
 
 from . import logs
 from .. import constants as cs
@@ -16,6 +17,51 @@ LOGGER = logging.getLogger('signals')
 SpecScan = NamedTuple('SpecScan', [
     ('ramp', np.ndarray), ('error', np.ndarray), ('trans', np.ndarray)])
 
+SavgolKernels = NamedTuple('SavgolKernels', [
+    ('centre', np.ndarray), ('left', np.ndarray), ('right', np.ndarray)])
+
+DOPPLER_LINE_DTYPE = np.dtype([('depth', float), ('distance', float)])
+"""Record layout of batched doppler line results, same order as DopplerLine.
+"""
+
+
+def decimate_minmax(data: np.ndarray, n_points: int,
+                    columns: Sequence[int] = None) -> np.ndarray:
+    """Reduce the rows of ``data`` to about ``n_points`` for display.
+
+    The rows are split into equally sized buckets and in each bucket only the
+    rows holding the minimum and maximum of the given columns are kept.  As
+    opposed to plain subsampling, this keeps narrow features such as dips
+    visible.
+
+    :param data: Array of shape (n, m), e.g. a raw DAQ scan.
+    :param n_points: Don't return more than this many rows.  Must be at least
+                twice the number of ``columns``.
+    :param columns: The columns whose extrema to keep.  Defaults to all but
+                the first, which is usually the ramp.
+    :returns: The kept rows, in their original order.  If ``data`` has
+                ``n_points`` rows or less, it is returned as is.
+    """
+    n_rows = data.shape[0]
+    if n_rows <= n_points:
+        return data
+    if columns is None:
+        columns = range(1, data.shape[1])
+    columns = list(columns)
+    n_buckets = n_points // (2 * len(columns))
+    if n_buckets < 1:
+        raise ValueError("Too few points to keep extrema of all columns.")
+    bucket_size = -(-n_rows // n_buckets)  # Ceiling division.
+    values = data[:, columns]
+    # Pad by repeating the last row, so that the data divides into buckets.
+    padded = np.pad(values, ((0, bucket_size * n_buckets - n_rows), (0, 0)),
+                    mode='edge').reshape(n_buckets, bucket_size, len(columns))
+    offsets = np.arange(n_buckets)[:, np.newaxis] * bucket_size
+    rows = np.concatenate((padded.argmin(axis=1) + offsets,
+                           padded.argmax(axis=1) + offsets), axis=1)
+    rows = np.unique(np.minimum(rows, n_rows - 1))
+    return data[rows]
+
 
 def decode_daq_scan(log_file: str, row: int = None) -> SpecScan:
     """Read the latest archived DAQ scan from the log file.
@@ -74,7 +120,7 @@ def locate_doppler_line(data: np.ndarray,
     """
     assert len(data.shape) == 2 and data.shape[0] == 3
     if preprocess_data:
-        data = format_daq_scan(trim_daq_scan(data))
+        data = format_daq_scan(trim_daq_scan(SpecScan(*data)))
     ramp = data[0]
     log = data[2]
     smooth = signal.savgol_filter(log, cs.DAQ_LOG_SIGNAL_SMOOTHING_WINDOW_WIDTH, 3)
@@ -85,6 +131,111 @@ def locate_doppler_line(data: np.ndarray,
     raise ValueError("Didn't find a dip.")
 
 
+def locate_doppler_lines(
+        scans: Union[np.ndarray, Sequence[np.ndarray]],
+        min_depth: float = cs.SPEC_MIN_LOG_DIP_DEPTH,
+        preprocess_data: bool = True) -> Tuple[np.recarray, np.ndarray]:
+    """Locate lines in a whole stack of scans at once.
+
+    This is the batched equivalent of :func:`locate_doppler_line`, yielding
+    the very same results.  Smoothing is done for all scans of equal length in
+    one go, using filter coefficients that are only computed once.
+
+    :param scans: Array of (N, 3, n) shape, holding N scans as they are passed
+                to :func:`locate_doppler_line`.  As trimming yields scans of
+                differing length, a sequence of N (3, n_i) arrays is accepted
+                as well.
+    :param min_depth: How deep has a dip in the "log" photodiode signal to be
+                to be considered valid?  In Volts.
+    :param preprocess_data: Expect raw data coming from DAQ and preprocess it.
+                If set to False, data must have been trimmed and formatted
+                before.
+    :returns: A record array of N (depth, distance) entries in
+                :data:`DOPPLER_LINE_DTYPE` layout and an array of N bools,
+                flagging the scans in which no line was found.  Depth and
+                distance are reported for failed scans as well, to allow for
+                evaluating different thresholds.  Scans too short for smoothing
+                are flagged as failed and reported as NaN.
+    """
+    if preprocess_data:
+        scans = [format_daq_scan(trim_daq_scan(SpecScan(*scan)))
+                 for scan in scans]
+    stack = scans if isinstance(scans, np.ndarray) else None
+    if stack is not None:
+        assert len(stack.shape) == 3 and stack.shape[1] == 3
+    lines = np.recarray(len(scans), dtype=DOPPLER_LINE_DTYPE)
+    lines.depth[:] = np.nan
+    lines.distance[:] = np.nan
+    failed = np.ones(len(scans), dtype=bool)
+
+    window = cs.DAQ_LOG_SIGNAL_SMOOTHING_WINDOW_WIDTH
+    kernels = savgol_kernels(window, 3)
+    lengths = np.array([len(scan[0]) for scan in scans], dtype=int)
+    for length in np.unique(lengths):
+        if length < window:
+            LOGGER.debug("Skipping %s scans of length %s.",
+                         np.count_nonzero(lengths == length), length)
+            continue
+        idx = np.flatnonzero(lengths == length)
+        if stack is not None:
+            ramps, logs = stack[idx, 0], stack[idx, 2]
+        else:
+            ramps = np.array([scans[i][0] for i in idx])
+            logs = np.array([scans[i][2] for i in idx])
+        smooth = smooth_savgol(logs, kernels)
+        rows = np.arange(len(idx))
+        argmin, argmax = smooth.argmin(axis=-1), smooth.argmax(axis=-1)
+        depth = smooth[rows, argmax] - smooth[rows, argmin]
+        lines.depth[idx] = depth
+        lines.distance[idx] = ramps[rows, argmin]
+        failed[idx] = ~(depth > min_depth)
+    return lines, failed
+
+
+@functools.lru_cache()
+def savgol_kernels(window: int, polyorder: int) -> SavgolKernels:
+    """Precompute the coefficients needed for Savitzky-Golay smoothing.
+
+    Besides the regular filter coefficients, this yields the projections used
+    for the edges of the data, where scipy's ``savgol_filter`` fits a
+    polynomial to the first and last ``window`` values (``mode='interp'``).
+
+    :param window: Filter window length, must be odd.
+    :param polyorder: Order of the fitted polynomials.
+    :returns: The filter kernel and the (window//2, window) edge projection
+                matrices.
+    """
+    half = window // 2
+    centre = signal.savgol_coeffs(window, polyorder, use='dot')
+    vander = np.vander(np.arange(window) - half, polyorder + 1)
+    projection = vander @ np.linalg.pinv(vander)
+    return SavgolKernels(centre, projection[:half], projection[window - half:])
+
+
+def smooth_savgol(data: np.ndarray, kernels: SavgolKernels,
+                  out: np.ndarray = None) -> np.ndarray:
+    """Savitzky-Golay filter the last axis of ``data``.
+
+    Equivalent to ``signal.savgol_filter(data, window, polyorder)``, but uses
+    coefficients from :func:`savgol_kernels` instead of recomputing them.
+
+    :param data: Array of shape (..., n) with n being at least the window
+                length.
+    :param kernels: Result of :func:`savgol_kernels`.
+    :param out: Optionally write the result to this preallocated array.
+    :returns: The smoothed data.
+    """
+    window = len(kernels.centre)
+    half = window // 2
+    if data.shape[-1] < window:
+        raise ValueError("Data is shorter than filter window.")
+    out = ndimage.correlate1d(data, kernels.centre, axis=-1, mode='constant',
+                              output=out)
+    out[..., :half] = data[..., :window] @ kernels.left.T
+    out[..., -half:] = data[..., -window:] @ kernels.right.T
+    return out
+
+
 def trim_daq_scan(scan: SpecScan, ignore_trans: bool = False) -> SpecScan:
     """Extract and return the reliable part of a full DAQ scan.
 
@@ -104,14 +255,28 @@ def trim_daq_scan(scan: SpecScan, ignore_trans: bool = False) -> SpecScan:
     :returns: Array in which all columns are equally stripped from the useless
                 values at the start and end.
     """
+    lower, upper = _find_trim_bounds(scan.ramp, -scan.ramp, ignore_trans)
+    return SpecScan(scan.ramp[lower:upper], scan.error[lower:upper],
+                    scan.trans[lower:upper])
+
+
+def _find_trim_bounds(ramp: np.ndarray, inverted_ramp: np.ndarray,
+                      ignore_trans: bool) -> Tuple[int, int]:
+    """Find the slice of a DAQ scan that is left after trimming.
 
+    :param ramp: The raw ramp monitor readings.
+    :param inverted_ramp: ``-ramp``, passed in to allow for reusing buffers.
+    :param ignore_trans: See :func:`trim_daq_scan`.
+    :raises ValueError: Ramp flanks couldn't be found.
+    :returns: Lower and upper index of the reliable part of the scan.
+    """
     # Due to the nature of the hack around the DAQ asynchronicity, time (read:
     # sample index) is an unsafe base to rely calculations on.  We use the
     # amplitude of the loopback-ed ramp instead.
     # First, we extract the full ramp from the data.
-    start = find_flank(scan.ramp, cs.DAQ_MIN_RAMP_AMPLITUDE)
-    stop = find_flank(-scan.ramp, cs.DAQ_MIN_RAMP_AMPLITUDE,
-                      start=len(scan.ramp) - 1, reverse=True)
+    start = find_flank(ramp, cs.DAQ_MIN_RAMP_AMPLITUDE)
+    stop = find_flank(inverted_ramp, cs.DAQ_MIN_RAMP_AMPLITUDE,
+                      start=len(ramp) - 1, reverse=True)
     span = stop - start
 
     # Then we further trim off values that _are_ actual readings but that we
@@ -121,9 +286,7 @@ def trim_daq_scan(scan: SpecScan, ignore_trans: bool = False) -> SpecScan:
                    else cs.DAQ_LOG_RAMP_TRIM_FACTORS)
     lower = int(start + (shave_marks[1] * span))
     upper = int(stop - (shave_marks[0] * span))
-
-    return SpecScan(scan.ramp[lower:upper], scan.error[lower:upper],
-                    scan.trans[lower:upper])
+    return lower, upper
 
 
 def find_flank(series: np.ndarray, min_height: float, start: int = 0,
@@ -176,3 +339,119 @@ def find_flank(series: np.ndarray, min_height: float, start: int = 0,
         if series[j] < last_max - trigger_level * (last_max - last_min):
             return j
     raise ValueError("No flank was found.")
+
+
+class ScanPipeline:
+    """Preprocess raw DAQ scans without allocating new memory for each scan.
+
+    This does the same as ``format_daq_scan(trim_daq_scan(...))`` and
+    :func:`locate_doppler_line`, but works on buffers that are allocated once
+    for the largest possible scan.  As the ramp shape rarely changes between
+    scans, the permutation sorting a scan by ramp value is reused as long as it
+    still does the job.
+
+    .. CAUTION::
+        The returned scans are views into the pipeline's buffers and will be
+        overwritten by the next call to :meth:`process`.  Copy them if you need
+        to keep them.
+    """
+
+    def __init__(self, capacity: int = cs.DAQ_MAX_AOUT_SAMPLES,
+                 ignore_trans: bool = False) -> None:
+        """
+        :param capacity: Maximum number of samples per scan.
+        :param ignore_trans: Trim scans as :func:`trim_daq_scan` does.
+        """
+        self.ignore_trans = ignore_trans
+        self._capacity = capacity
+        self._raw = np.empty((3, capacity))
+        self._inverted_ramp = np.empty(capacity)
+        self._scan = np.empty((3, capacity))
+        self._ramp_steps = np.empty(capacity)
+        self._smooth = np.empty(capacity)
+        self._permutation = np.empty(capacity, dtype=np.intp)
+        self._permutation_len = 0
+        self._kernels = {}  # type: Dict[int, SavgolKernels]
+        """Smoothing kernels by number of raw samples per scan."""
+
+    def process(self, raw_scan: np.ndarray) -> SpecScan:
+        """Trim, scale and sort a scan as received from the DAQ.
+
+        :param raw_scan: Raw uint16 DAQ readings of shape (n, 3), as delivered
+                    by ``fetch_scan()``.
+        :raises ValueError: Scan is too long or ramp flanks couldn't be found.
+        :returns: The processed scan; see the caution note above.
+        """
+        n_samples = raw_scan.shape[0]
+        if n_samples > self._capacity:
+            raise ValueError("Scan exceeds pipeline capacity of {}.".format(
+                self._capacity))
+        raw = self._raw[:, :n_samples]
+        np.copyto(raw, raw_scan.T)
+        inverted_ramp = np.negative(raw[0], out=self._inverted_ramp[:n_samples])
+        lower, upper = _find_trim_bounds(raw[0], inverted_ramp,
+                                         self.ignore_trans)
+        raw = raw[:, lower:upper]
+
+        # Convert counts to volts and, for the ramp, further to MHz.
+        mhz_per_volt = cs.LOCKBOX_MHz_mV * cs.LOCK_SFG_FACTOR * 1000
+        for row, (span, offset) in enumerate(
+                ((20 * mhz_per_volt, -10 * mhz_per_volt), (2, -1), (10, -5))):
+            np.multiply(raw[row], span / 2**16, out=raw[row])
+            np.add(raw[row], offset, out=raw[row])
+
+        length = upper - lower
+        permutation = self._permutation[:length]
+        scan = self._scan[:, :length]
+        if not (self._permutation_len == length
+                and self._is_sorted_by(raw[0], permutation, scan[0])):
+            LOGGER.debug("Ramp shape changed, sorting anew.")
+            permutation[:] = raw[0].argsort()
+            self._permutation_len = length
+        for row in range(3):
+            np.take(raw[row], permutation, out=scan[row])
+        return SpecScan(scan[0], scan[1], scan[2])
+
+    def locate_doppler_line(
+            self, raw_scan: np.ndarray,
+            min_depth: float = cs.SPEC_MIN_LOG_DIP_DEPTH) -> cs.DopplerLine:
+        """Process a raw scan and search it for a line.
+
+        See :func:`locate_doppler_line` for details.
+
+        Coarser scans are smoothed with a proportionally narrower window, so
+        that it always spans the same frequency range.
+
+        :param raw_scan: Raw uint16 DAQ readings of shape (n, 3).
+        :raises ValueError: Didn't find a line.
+        """
+        scan = self.process(raw_scan)
+        kernels = self._get_kernels(raw_scan.shape[0])
+        if len(scan.trans) < len(kernels.centre):
+            raise ValueError("Scan is too short to search for a dip.")
+        smooth = smooth_savgol(scan.trans, kernels,
+                               out=self._smooth[:len(scan.trans)])
+        argmin, argmax = np.argmin(smooth), np.argmax(smooth)
+        depth = smooth[argmax] - smooth[argmin]
+        if depth > min_depth:
+            return cs.DopplerLine(distance=cs.SpecMhz(scan.ramp[argmin]),
+                                  depth=depth)
+        raise ValueError("Didn't find a dip.")
+
+    def _get_kernels(self, n_samples: int) -> SavgolKernels:
+        """The smoothing kernels for scans of ``n_samples`` raw samples."""
+        kernels = self._kernels.get(n_samples)
+        if kernels is None:
+            window = cs.DAQ_LOG_SIGNAL_SMOOTHING_WINDOW_WIDTH
+            if n_samples < cs.DAQ_MAX_AOUT_SAMPLES:
+                window = max(5, int(round(window * n_samples
+                                          / cs.DAQ_MAX_AOUT_SAMPLES)) | 1)
+            kernels = self._kernels[n_samples] = savgol_kernels(window, 3)
+        return kernels
+
+    def _is_sorted_by(self, ramp: np.ndarray, permutation: np.ndarray,
+                      out: np.ndarray) -> bool:
+        """Does ``permutation`` still sort ``ramp`` in ascending order?"""
+        np.take(ramp, permutation, out=out)
+        steps = np.subtract(out[1:], out[:-1], out=self._ramp_steps[:len(out) - 1])
+        return len(steps) == 0 or steps.min() >= 0
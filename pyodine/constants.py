@@ -32,6 +32,13 @@ class LaserMhz(float):
 DopplerLine = typing.NamedTuple('DopplerLine',
                                 [('depth', float), ('distance', SpecMhz)])
 
+ScanResolution = typing.NamedTuple('ScanResolution', [('n_samples', int),
+                                                      ('time', float),
+                                                      ('oversampling', int)])
+"""How to acquire a frequency scan: Number of ramp steps, duration in seconds
+and the number of input readings averaged per ramp step.
+"""
+
 ##################
 # Base Constants #  Those are not tied to others in a direct, arithmetical way.
 ##################
@@ -44,6 +51,14 @@ DAQ_ALLOWABLE_BLOCKING_TIME = 2
 """The DAQ may be blocked this many seconds before we assume that something has
 gone wrong.
 """
+DAQ_MAX_AOUT_SAMPLES = 2560
+"""Max. number of samples per ramp the DAQ's analog output can play, which
+also bounds the number of samples per scan.
+"""
+DAQ_MAX_INPUT_RATE = 500e3
+"""Max. aggregate analog input rate of the USB-1608GX-2AO in samples per second
+(all channels).
+"""
 DAQ_MAX_SCAN_AMPLITUDE = 19
 """Maximum allowable peak-peak amplitude in volts when doing DAQ signal scans.
 
@@ -80,6 +95,28 @@ DAQ_MAX_SPEC_SCAN_BYTES = int(100e3)
 DAQ_SCAN_TIME = 0.5
 """The time to take for a frequency scan in seconds."""
 
+DAQ_SCAN_RESOLUTION = ScanResolution(n_samples=2560, time=DAQ_SCAN_TIME,
+                                     oversampling=1)
+"""Default resolution of frequency scans."""
+
+DAQ_SIMULATED = False
+"""Use a simulated DAQ instead of the real device.  See ``simulated_daq``."""
+
+DAQ_STREAM_BLOCK_SIZE = 100
+"""An acquisition stream delivers this many samples per channel at once."""
+
+DAQ_STREAM_FREQUENCY = 1000.
+"""Sample rate in Hz of the DAQ acquisition stream."""
+
+DAQ_STREAM_N_BLOCKS = 32
+"""Ring buffer size of the DAQ acquisition stream in blocks."""
+
+DAQ_STREAM_SENSORS = False
+"""Keep the DAQ streaming the photodiode and temperature channels.
+
+Those readings are then served from memory instead of triggering a scan each.
+"""
+
 MENLO_MINIMUM_WAIT = .2
 """The Menlo stack interface roundtrip time in seconds.
 
@@ -228,6 +265,16 @@ PRELOCK_TUNING_ATTEMPTS = 10  # Guesswork.
 
 If we have to jump more often than this, we're probably lost anyway (due to
 drifts or another system problem)."""
+PRELOCK_CENTERING_RESOLUTION = ScanResolution(n_samples=2560, time=.5,
+                                              oversampling=4)
+"""Scans used for centering a doppler line.  Averaging quadruply oversampled
+readings cuts noise in half at the cost of USB transfer time.
+"""
+PRELOCK_SEARCH_RESOLUTION = ScanResolution(n_samples=640, time=.125,
+                                           oversampling=1)
+"""Scans used for searching doppler lines.  A coarse, fast scan suffices to
+tell if there is a line and roughly where.
+"""
 PRELOCK_DIST_SWEET_SPOT_TO_DIP = (635 + 440) / 2  # Measured in rev. 5c0ea6
 """The distance between the absorption dip minimum and the "sweet spot" halfway
 between a_1 and a_2 from where the lock can reliably be engaged.
@@ -243,9 +290,65 @@ PRELOCK_STEP_SIZE = SpecMhz(800)
 PRELOCK_TUNER_SPEED_CONSTRAINT = 5
 """Don't use tuners slower than this during prelock.  In seconds."""
 
+READINGS_KEYFRAME_INTERVAL = 20
+"""Readings are published as deltas to what the respective client already got.
+Every ~th publication is a full keyframe nevertheless.
+"""
+
+RS232_BANDWIDTH_SHARES = {'texus': .3, 'readings': .3, 'setup': .1,
+                          'aux_temps': .1, 'signal': .1}
+"""Fraction of the RS232 link's throughput reserved for each message type.
+Unused shares are not lost: The link is never left idle while there is
+something to send.
+"""
+RS232_BURST_WINDOW = 30.
+"""Message types may save up ~ seconds worth of their bandwidth share.  This is
+also the largest message they may send at once; larger ones get downsampled or
+skipped.
+"""
+RS232_COMPRESSION = False
+"""Compress all messages sent via RS232 as one continuous stream.  The receiving
+relay must be able to decompress it, see ``transport.link_compression``.
+"""
+RS232_COMPRESSION_DICTIONARY = None
+"""File holding a preset dictionary for RS232 compression, as created by
+``link_compression.train_dictionary()``.  Both ends of the link must use the
+same.  If None, a builtin minimal dictionary is used.
+"""
+RS232_COMPRESSION_RESET_INTERVAL = 50
+"""Restart the compressed RS232 stream every ~ messages.  A transmission error
+breaks the stream until then.
+"""
+RS232_DEFAULT_BANDWIDTH_SHARE = .1
+"""Bandwidth share of message types not in ``RS232_BANDWIDTH_SHARES``."""
+
+RS232_MAX_AGES = {'signal': 5., 'aux_temps': 30.}
+"""Don't send messages of those types via RS232 if they are older than ~ s by
+the time the link is free.  Types not mentioned never expire.
+"""
 RS232_MAX_MESSAGE_BYTES = 102400  # 100kiB
 """Maximum message size in bytes the RS232 relay has to expect from pyodine."""
 
+RS232_PRIORITIES = {'texus': 3, 'setup': 2, 'readings': 1, 'signal': -1}
+"""Queued messages of higher priority types are sent via RS232 first.  Types not
+mentioned have priority 0.  Keeps the slow link from holding back status
+updates while it is busy with bulky signal data.
+"""
+
+RS232_RECORDING_FILE = None
+"""Append every (uncompressed) message sent via RS232 to this file.  Such
+recordings can be replayed by ``test/link_compression_benchmark.py`` or used to
+train a compression dictionary.  None disables recording.
+"""
+
+RS232_SIGNAL_POINTS = 500
+"""Decimate error signals to ~ samples before sending them via RS232."""
+
+RS232_USE_BINARY_FRAMES = False
+"""Send binary frames instead of JSON messages via RS232.  As there is no
+handshake on the serial link, the receiving relay must be able to decode them.
+"""
+
 RUNLEVEL_PURSUE_KICKOFF_TIMEOUT = 15.
 """None of the group of pursue...() methods in the runlevel mechanism shall
 take longer than this many seconds.  This is important to not block the
@@ -314,6 +417,16 @@ TEXUS_WIRE_POLLING_INTERVAL =  .63
 VHBG_WORKING_TEMP = 27.02
 """Working point temperature of volume-holometric bragg grating in °C"""
 
+WS_COMPRESS_FRAMES_ABOVE = 4096
+"""Binary frames and JSON messages longer than ~ bytes are compressed before
+being sent to websocket clients.  This happens once per message, regardless of
+the number of clients.  Set to None to disable compression.
+"""
+WS_SIGNAL_POINTS = 5000
+"""Decimate error signals to ~ samples before sending them to websocket
+clients.
+"""
+
 ##########################
 # Transitional Constants #  Those are only used to calculate other constants.
 ##########################
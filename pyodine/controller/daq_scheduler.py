@@ -0,0 +1,171 @@
+"""Serialize and prioritize all requests to the DAQ.
+
+The DAQ can only do one acquisition at a time.  Instead of letting concurrent
+callers race for ``MccDaq``'s lock (and fail with ``BlockingIOError``), all
+requests are queued here and executed one after another by a single worker,
+most important first.  Pending ``sample_channels()`` requests are merged into
+one multi-channel acquisition, saving USB round trips.
+"""
+import asyncio
+import enum
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Callable, Dict, List, Tuple  # pylint: disable=unused-import
+
+import numpy as np
+
+from ..drivers import mccdaq
+
+LOGGER = logging.getLogger('pyodine.controller.daq_scheduler')
+
+Channels = List[Tuple[mccdaq.DaqChannel, mccdaq.InputRange]]
+
+
+class DaqPriority(enum.IntEnum):
+    """Who goes first if several requests are waiting?"""
+    PHOTODIODES = 0
+    TEMPERATURES = 1
+    LOCK_MONITOR = 2
+    PRELOCK = 3
+
+
+class _Request:  # pylint: disable=too-few-public-methods
+    def __init__(self, priority: DaqPriority, args: tuple,
+                 channels: Channels = None) -> None:
+        self.priority = priority
+        self.args = args
+        self.channels = channels
+        """Set for sample requests only.  Those can be merged."""
+        self.queued = time.monotonic()
+        self.future = asyncio.get_event_loop().create_future()  # type: asyncio.Future
+
+
+class DaqScheduler:
+    """Runs DAQ requests one at a time, by priority.
+
+    Caller must be calling from a running asyncio loop.
+    """
+
+    def __init__(self, get_daq: Callable[[], mccdaq.MccDaq]) -> None:
+        """
+        :param get_daq: Returns the DAQ to use or None if there is none.  The
+                    DAQ may be replaced at any time.
+        """
+        self._get_daq = get_daq
+        self._pending = []  # type: List[Tuple[int, int, _Request]]
+        self._counter = itertools.count()
+        self._worker = None  # type: asyncio.Task
+        self.n_acquisitions = 0
+        self._stats = {p: {'n_requests': 0, 'wait_time': 0., 'max_wait_time': 0.}
+                       for p in DaqPriority}  # type: Dict[DaqPriority, Dict[str, Any]]
+
+    async def fetch_scan(self, amplitude: float, duration: float,
+                         channels: Channels, shape: mccdaq.RampShape,
+                         priority: DaqPriority = DaqPriority.PRELOCK,
+                         back_to_back: bool = False,
+                         n_samples: int = mccdaq.MAX_AOUT_SAMPLES,
+                         oversampling: int = 1) -> np.ndarray:
+        """Queue a ``MccDaq.fetch_scan()``.
+
+        :raises ConnectionError: There is no DAQ or it failed.
+        :raises BlockingIOError: The DAQ is busy streaming.
+        """
+        return await self._submit(
+            _Request(priority, (amplitude, duration, channels, shape,
+                                back_to_back, n_samples, oversampling)))
+
+    async def sample_channels(self, channels: Channels, priority: DaqPriority,
+                              n_samples: int = 1) -> np.ndarray:
+        """Queue a ``MccDaq.sample_channels()``.
+
+        It is executed along with all other sample requests (of the same
+        ``n_samples``) pending at that time.
+
+        :raises ConnectionError: There is no DAQ or it failed.
+        """
+        return await self._submit(_Request(priority, (n_samples,),
+                                           [tuple(c) for c in channels]))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Number of requests and the time they waited in the queue, by
+        priority.  The number of actual acquisitions is lower, if requests
+        were merged.
+        """
+        return {'n_acquisitions': self.n_acquisitions,
+                'n_pending': len(self._pending),
+                'priorities': {p.name: dict(s, mean_wait_time=(
+                    s['wait_time'] / s['n_requests'] if s['n_requests'] else 0.))
+                               for p, s in self._stats.items()}}
+
+    async def _submit(self, request: _Request) -> Any:
+        heapq.heappush(self._pending,
+                       (-request.priority, next(self._counter), request))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._work())
+        return await request.future
+
+    async def _work(self) -> None:
+        loop = asyncio.get_event_loop()
+        while self._pending:
+            _, _, request = heapq.heappop(self._pending)
+            batch = [request]
+            if request.channels is not None:
+                batch += self._take_mergeable(request)
+            batch = [r for r in batch if not r.future.done()]  # cancelled
+            if not batch:
+                continue
+            now = time.monotonic()
+            for req in batch:
+                stats = self._stats[req.priority]
+                stats['n_requests'] += 1
+                stats['wait_time'] += now - req.queued
+                stats['max_wait_time'] = max(stats['max_wait_time'],
+                                             now - req.queued)
+            self.n_acquisitions += 1
+            try:
+                if request.channels is None:
+                    results = [await loop.run_in_executor(None, self._scan,
+                                                          request)]
+                else:
+                    results = await self._sample(batch)
+            except Exception as err:  # Pass on to callers. # pylint: disable=broad-except
+                for req in batch:
+                    if not req.future.done():
+                        req.future.set_exception(err)
+                continue
+            for req, result in zip(batch, results):
+                if not req.future.done():  # It may have been cancelled.
+                    req.future.set_result(result)
+
+    def _take_mergeable(self, request: _Request) -> List[_Request]:
+        """Remove and return the pending sample requests matching
+        ``request``.
+        """
+        merge = [r for _, _, r in self._pending if r.channels is not None
+                 and r.args == request.args]
+        if merge:
+            self._pending = [e for e in self._pending if e[2] not in merge]
+            heapq.heapify(self._pending)
+            LOGGER.debug("Merging %s DAQ sample requests.", len(merge) + 1)
+        return merge
+
+    async def _sample(self, batch: List[_Request]) -> List[np.ndarray]:
+        channels = []  # type: Channels
+        for req in batch:
+            channels += [c for c in req.channels if c not in channels]
+        daq = self._daq()
+        readings = await asyncio.get_event_loop().run_in_executor(
+            None, daq.sample_channels, channels, batch[0].args[0])
+        return [readings[:, [channels.index(c) for c in req.channels]]
+                for req in batch]
+
+    def _scan(self, request: _Request) -> np.ndarray:
+        return self._daq().fetch_scan(*request.args)
+
+    def _daq(self) -> mccdaq.MccDaq:
+        daq = self._get_daq()
+        if not daq:
+            raise ConnectionError("DAQ not initialized.")
+        return daq
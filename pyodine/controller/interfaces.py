@@ -4,7 +4,6 @@ It may set up downlinks to clients, regularly send data to them and deal with
 control requests they might transmit.
 """
 import asyncio
-import base64
 from functools import partial
 import logging
 import time
@@ -13,18 +12,20 @@ from typing import Any, Awaitable, Callable, Dict, List, Optional, Union  # pyli
 import numpy as np
 
 from .. import constants as cs
+from ..analysis import signals
 from ..pyodine_globals import (GLOBALS as GL, REQUEST)
 from . import daemons, lock_buddy, runlevels, subsystems
 from ..transport.websocket_server import WebsocketServer
 from ..transport.queueing_serial_server import QueueingSerialServer
 from ..transport import texus_relay
 from ..transport import packer
+from ..transport.delta_encoder import (Delta, DeltaEncoder, is_empty,
+                                       signature, to_payload)
 from ..util import asyncio_tools
 
 LOGGER = logging.getLogger("pyodine.controller.interfaces")
 # LOGGER.setLevel(logging.DEBUG)
 WS_PORT = 56320
-MAX_SIGNAL_SAMPLES = 5000
 
 class Interfaces:
     """This is how to talk to Pyodine.
@@ -51,8 +52,9 @@ class Interfaces:
         self._timer_callback = lambda *_: None  # type: Callable[[texus_relay.TimerState], Optional[Awaitable[None]]]  # pylint: disable=line-too-long
         """If set, this handles timer change events."""
 
-        # Keep track of when we sent the prev. publication to the clients.
-        self._readings_published_at = None  # type: float
+        # Keep track of which readings were sent to which client.
+        self._ws_readings = {}  # type: Dict[Any, DeltaEncoder]
+        self._rs232_readings = DeltaEncoder(subsystems.READINGS_STATE_KEYS)
 
     async def init_async(self) -> None:
         """The class instance is ready to use only after I was awaited."""
@@ -61,7 +63,8 @@ class Interfaces:
         if self._use_ws:
             self._ws = WebsocketServer(
                 port=WS_PORT, on_msg_receive=self._parse_reply,
-                on_client_connect=self._on_client_connect)
+                on_client_connect=self._on_client_connect,
+                on_client_disconnect=self._on_client_disconnect)
             await self._ws.async_init()
 
         # Serial server
@@ -168,24 +171,19 @@ class Interfaces:
         """Publish the most recently acquired error signal.
 
         As we need to be considerate about bandwidth and the data is only
-        intended for display and backup logging, we might apply some
-        compression.
+        intended for display and backup logging, it is decimated to the point
+        budget of each link.  Dips and peaks are kept.
         """
-        # Drop some values before publishing if this was a high-res scan.
-        while signal.shape[0] > MAX_SIGNAL_SAMPLES:
-            # Delete one third of the samples. That's not a very elegant way to
-            # do it but it gets the job done in OK time.
-            signal = np.delete(signal, np.arange(1, signal.size, 3), axis=0)
-
-        LOGGER.debug("Sending %s uint16 values.", signal.size)
-
-        # Use base64 encoding, as it is common with browsers and saves a lot of
-        # bandwidth when compared to plaintext encoding.
-        encoded_string = base64.b64encode(signal.tobytes()).decode()
-        payload = {'data': encoded_string, 'shape': signal.shape}
-
-        await self._publish_message(packer.create_message(payload, 'signal'),
-                                    'signal')
+        # JSON messages use base64 encoding for the array, as it is common
+        # with browsers and saves a lot of bandwidth when compared to plaintext
+        # encoding.  Binary frames carry the raw array.
+        payload = self._wrap_signal(signal, cs.WS_SIGNAL_POINTS)
+        LOGGER.debug("Sending %s uint16 values.", payload['data'].size)
+        rs232_payload = (self._wrap_signal(signal, cs.RS232_SIGNAL_POINTS)
+                         if self._use_rs232 else None)
+        await self._publish_message(
+            payload, 'signal', rs232_payload=rs232_payload,
+            shrink_rs232=partial(self._shrink_signal, signal))
         LOGGER.debug("Published error signal.")
 
     async def publish_flags(self) -> None:
@@ -212,27 +210,64 @@ class Interfaces:
                 data['requested_level'] = int(REQUEST.level)
             else:
                 data['requested_level'] = None
-            await self._publish_message(packer.create_message(data, 'texus'),
-                                        'texus')
+            await self._publish_message(data, 'texus')
         except Exception:
             LOGGER.error("Failed to publish flags.")
             LOGGER.debug("Reason:", exc_info=True)
 
     async def publish_readings(self) -> None:
-        """Publish recent readings as received from subsystem controller."""
+        """Publish recent readings as received from subsystem controller.
 
-        # We need to use a transitional variable here to make sure that we
-        # don't claim to have published newer readings than we actually did.
-        prev = self._readings_published_at
-        data = await self._subs.get_full_set_of_readings(since=prev)
-        await self._publish_message(packer.create_message(data, 'readings'), 'readings')
-        self._readings_published_at = time.time()
+        Every client only gets sent what's new to them, see ``DeltaEncoder``.
+        """
+        encoders = list(self._ws_readings.values())
+        if self._use_rs232:
+            encoders.append(self._rs232_readings)
+        if not encoders:
+            return
+        # Fetch everything that at least one of the clients hasn't seen yet.
+        cutoffs = [e.since for e in encoders if e.since is not None]
+        fetched_at = time.time()
+        data = await self._subs.get_full_set_of_readings(
+            since=min(cutoffs) if cutoffs else None)
+
+        if self._use_ws and self._ws_readings:
+            # Clients that are in sync get the same delta.  Don't encode it
+            # more than once.
+            groups = {}  # type: Dict[Any, List[Any]]
+            deltas = {}  # type: Dict[Any, Delta]
+            for client, encoder in list(self._ws_readings.items()):
+                delta = encoder.encode(data, fetched_at)
+                key = (delta.is_keyframe, signature(delta))
+                groups.setdefault(key, []).append(client)
+                deltas.setdefault(key, delta)
+            for key, clients in groups.items():
+                if not is_empty(deltas[key]):
+                    # Only commit what was actually sent.  A delta replaced in
+                    # a client's queue is then covered by the next delta.
+                    await self._ws.publish_message(
+                        to_payload(deltas[key]), 'readings', clients,
+                        on_sent=partial(self._commit_ws_readings, deltas[key]))
+                else:
+                    for client in clients:
+                        self._commit_ws_readings(deltas[key], client)
+        if self._use_rs232:
+            delta = self._rs232_readings.encode(data, fetched_at)
+            if not is_empty(delta):
+                # Only commit what was actually sent.  Deltas replaced in the
+                # queue are then covered by the next delta.
+                message = self._encode_for_rs232(to_payload(delta), 'readings')
+                self._rs232.queue_for_publication(
+                    message, 'readings',
+                    on_sent=partial(self._rs232_readings.commit, delta))
+            else:
+                self._rs232_readings.commit(delta)
 
     async def publish_setup_parameters(self) -> None:
         """Publish all setup parameters over all open connections once."""
         LOGGER.debug("Scheduling setup parameter publication.")
         data = self._subs.get_setup_parameters()
-        await self._publish_message(packer.create_message(data, 'setup'), 'setup')
+        await self._publish_message(data, 'setup')
 
     async def publish_aux_temps(self) -> None:
         """Acquire and publish DAQ temperature readings.
@@ -248,8 +283,7 @@ class Interfaces:
         human_readable = {sensor.name: aux_temps[sensor]
                           for sensor in subsystems.AuxTemp}
         human_readable['time'] = time.time()
-        await self._publish_message(packer.create_message(human_readable, 'aux_temps'),
-                                    'aux_temps')
+        await self._publish_message(human_readable, 'aux_temps')
 
     async def publish_light_levels(self, do_publish: bool = True) -> None:
         """Acquire and publish photodiode levels in arbitrary units.
@@ -261,8 +295,7 @@ class Interfaces:
         if do_publish:
             asdict = levels._asdict()
             asdict['time'] = time.time()
-            await self._publish_message(
-                packer.create_message(asdict, 'light_levels'), 'light_levels')
+            await self._publish_message(asdict, 'light_levels')
 
 
     def set_flag(self, entity_id: str, value: bool) -> None:
@@ -295,7 +328,16 @@ class Interfaces:
         LOGGER.debug("Acquired error signal...")
         return data
 
-    async def _publish_message(self, message: str, species: Any) -> None:
+    async def _publish_message(
+            self, payload: Dict[str, Any], msg_type: str,
+            rs232_payload: Dict[str, Any] = None,
+            shrink_rs232: Callable[[int], Union[str, bytes, None]] = None) -> None:
+        """Publish a message via all available channels.
+
+        :param rs232_payload: Send this instead of ``payload`` via RS232.
+        :param shrink_rs232: Creates a downsampled message that fits into the
+                    given number of bytes, see ``queue_for_publication()``.
+        """
         # The vastly different throughput of RS232 vs. Ethernet connections
         # calls for a nontrivial approach in publication scheduling.
         # With Ethernet/Websocket being the fastest available channel, we will
@@ -306,22 +348,76 @@ class Interfaces:
         # need a means to prioritize, which is where QueueingSerialServer comes
         # into play.
         if self._use_rs232:
-            self._rs232.queue_for_publication(message, species)
+            message = self._encode_for_rs232(
+                payload if rs232_payload is None else rs232_payload, msg_type)
+            if message:
+                self._rs232.queue_for_publication(message, msg_type,
+                                                  shrink=shrink_rs232)
         if self._use_ws:
-            await self._ws.publish(message)
+            await self._ws.publish_message(payload, msg_type)
+
+    @staticmethod
+    def _encode_for_rs232(payload: Dict[str, Any],
+                          msg_type: str) -> Union[str, bytes]:
+        if cs.RS232_USE_BINARY_FRAMES:
+            return packer.create_frame(payload, msg_type)
+        return packer.create_message(payload, msg_type)
+
+    def _shrink_signal(self, signal: cs.SpecScan,
+                       max_bytes: int) -> Union[str, bytes, None]:
+        """Decimate ``signal`` until its RS232 message fits into ``max_bytes``.
+        """
+        n_points = cs.RS232_SIGNAL_POINTS
+        while n_points >= 2 * (signal.shape[1] - 1):
+            message = self._encode_for_rs232(
+                self._wrap_signal(signal, n_points), 'signal')
+            if len(message) <= max_bytes:
+                LOGGER.debug("Decimated signal to %s points for RS232.", n_points)
+                return message
+            n_points = min(int(n_points * max_bytes / len(message)),
+                           n_points - 1)
+        return None
+
+    @staticmethod
+    def _wrap_signal(signal: cs.SpecScan, n_points: int) -> Dict[str, Any]:
+        decimated = np.ascontiguousarray(
+            signals.decimate_minmax(signal, n_points))
+        return {'data': decimated, 'shape': decimated.shape}
 
     def _parse_reply(self, message: str) -> None:
         self._loop.create_task(
             asyncio_tools.safe_async_call(self._rcv_callback, message))
 
-    def _on_client_connect(self) -> None:
+    def _on_client_connect(self, client: Any) -> None:
         """Is called everytime a new client connects to the TCP/IP interface.
 
         Attention: As there might be RS232 clients as well, this might not get
         called at all."""
+        self._ws_readings[client] = DeltaEncoder(subsystems.READINGS_STATE_KEYS)
+        self._loop.create_task(self._publish_readings_snapshot(client))
         self._loop.create_task(self.publish_setup_parameters())
         self._loop.create_task(self.publish_flags())
 
+    def _on_client_disconnect(self, client: Any) -> None:
+        self._ws_readings.pop(client, None)
+
+    async def _publish_readings_snapshot(self, client: Any) -> None:
+        """Send a full set of the latest readings to a single client."""
+        fetched_at = time.time()
+        data = await self._subs.get_full_set_of_readings()
+        encoder = self._ws_readings.get(client)
+        if encoder is None:
+            return  # Client is gone already.
+        delta = encoder.encode(data, fetched_at, keyframe=True)
+        await self._ws.publish_message(
+            to_payload(delta), 'readings', [client],
+            on_sent=partial(self._commit_ws_readings, delta))
+
+    def _commit_ws_readings(self, delta: Delta, client: Any) -> None:
+        encoder = self._ws_readings.get(client)
+        if encoder is not None:
+            encoder.commit(delta)
+
     async def _try_publishing_error_signal(self) -> None:
         try:
             level = await runlevels.get_level()
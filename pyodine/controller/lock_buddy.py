@@ -165,7 +165,7 @@ class LockBuddy:
     def __init__(self, lock: Callable[[], Awaitable[None]],
                  unlock: Callable[[], Awaitable[None]],
                  locked: Callable[[], Union[LockboxState, Awaitable[LockboxState]]],
-                 scanner: Callable[[float], Awaitable[cs.SpecScan]],
+                 scanner: Callable[..., Awaitable[cs.SpecScan]],
                  scanner_range: LaserMhz,
                  lockbox: Tuner,
                  on_new_signal: Callable[
@@ -183,6 +183,8 @@ class LockBuddy:
                     - m: number of readings per sample; must be >= 2 with the
                       first column containing the x values (tunable quantity!)
                       and all following columngs readings plotted against that
+                    Callers asking for a specific resolution pass a
+                    ``cs.ScanResolution`` as second parameter.
         :param scanner_range: How much quantity units does a call to
                     ``scanner(1.)`` span? Has to be a coroutine, as it will
                     always take considerable time to fetch a signal.
@@ -210,15 +212,18 @@ class LockBuddy:
         self._locked = locked
         self._loop = asyncio.get_event_loop()  # type: asyncio.AbstractEventLoop
         self._on_new_signal = on_new_signal
-        self._scanner = scanner  # type: Callable[[float], Awaitable[cs.SpecScan]]
+        self._scan_pipeline = signals.ScanPipeline()
+        self._scanner = scanner  # type: Callable[..., Awaitable[cs.SpecScan]]
         self._scanner_range = scanner_range
         self._unlock = unlock
 
-    async def acquire_signal(self, rel_range: float = None) -> cs.SpecScan:
+    async def acquire_signal(self, rel_range: float = None,
+                             resolution: cs.ScanResolution = None) -> cs.SpecScan:
         """Run one scan and store the result. Lock must be disengaged.
 
         :param rel_range: The scan amplitude in ]0, 1]. The last used amplitude
                     is used again if `None` is given.
+        :param resolution: Leave it to the scanner if `None` is given.
         :raises InvalidStateError: Lock was not disengaged before.
         :raises ConnectionError: Callback didn't provide readings.
         :raises ValueError: Range is out of ]0, 1].
@@ -235,7 +240,12 @@ class LockBuddy:
         else:
             self.range = rel_range
 
-        self.recent_signal = await tools.safe_async_call(self._scanner, rel_range)
+        if resolution:
+            self.recent_signal = await tools.safe_async_call(
+                self._scanner, rel_range, resolution)
+        else:
+            self.recent_signal = await tools.safe_async_call(self._scanner,
+                                                             rel_range)
 
         if not self.recent_signal.any():
             raise ConnectionError("Didn't get readings from callback.")
@@ -268,15 +278,17 @@ class LockBuddy:
         LOGGER.info("Balancing lock by %s units.", distance)
         await self.tune(SpecMhz(cs.LOCK_SFG_FACTOR * distance), tuner)
 
-    async def doppler_sweep(self) -> Optional[cs.DopplerLine]:
+    async def doppler_sweep(
+            self, resolution: cs.ScanResolution = None) -> Optional[cs.DopplerLine]:
         """Do one scan and see if there's a doppler line nearby.
 
+        :param resolution: See ``acquire_signal()``.
         :returns: Distance to doppler line and its depth if there is a line,
                     None otherwise.
         """
-        signal = await self.acquire_signal()
+        signal = await self.acquire_signal(resolution=resolution)
         try:
-            return signals.locate_doppler_line(signal.transpose())
+            return self._scan_pipeline.locate_doppler_line(signal)
         except ValueError:
             LOGGER.debug("Didn't find a line.")
             return None
@@ -329,7 +341,7 @@ class LockBuddy:
         relative_position = SpecMhz(0) # distance to origin
         sign = +1              # zig or zag?
         counter = 1            # how far to jump with next zig resp. zag
-        dip = await self.doppler_sweep()  # type: DopplerLine
+        dip = await self.doppler_sweep(cs.PRELOCK_SEARCH_RESOLUTION)  # type: DopplerLine
         step = step_size
         old_tuner_state = await tuner.get()
         while True:
@@ -360,7 +372,7 @@ class LockBuddy:
                     LOGGER.warning("Exiting single-sided mode. No match at all.")
                     break
             LOGGER.info("Searching at %s.", relative_position)
-            dip = await self.doppler_sweep()
+            dip = await self.doppler_sweep(cs.PRELOCK_SEARCH_RESOLUTION)
             if alternate:
                 counter += 1
                 sign *= -1
@@ -430,7 +442,8 @@ class LockBuddy:
         :raises DriftError: Unable to center the dip well enough for
                     measurement.  We're possibly experiencing heavy drifts.
         """
-        dip = hint if hint else await self.doppler_sweep()
+        dip = (hint if hint else
+               await self.doppler_sweep(cs.PRELOCK_CENTERING_RESOLUTION))
         if not dip:
             raise SnowblindError("There is no line nearby.")
         state_before = await tuner.get()
@@ -440,7 +453,7 @@ class LockBuddy:
                     LOGGER.info("Took %s attempts to center dip.", attempt)
                     break
                 await self.tune(dip.distance, tuner)
-                dip = await self.doppler_sweep()
+                dip = await self.doppler_sweep(cs.PRELOCK_CENTERING_RESOLUTION)
             else:
                 raise DriftError("Unable to center doppler line.")
         finally:
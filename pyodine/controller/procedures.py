@@ -412,7 +412,7 @@ async def prelock(prelock_tuner: lock_buddy.Tuner) -> PrelockResult:
         if is_shaky():
             raise lock_buddy.DriftError("Aborting prelock, as system is shaky.")
         await GL.locker.tune(error, prelock_tuner)
-        dip = await GL.locker.doppler_sweep()
+        dip = await GL.locker.doppler_sweep(cs.PRELOCK_CENTERING_RESOLUTION)
     else:
         raise lock_buddy.DriftError("Unable to center doppler line.")
     return PrelockResult(time=time.time(), signal=dip)
@@ -0,0 +1,89 @@
+"""Keep the readings published to clients ready to go.
+
+Assembling the full set of readings used to call one Menlo getter per key on
+every publication, each of them resolving node ids and converting the whole
+window of readings all over again.  Instead, ``ReadingsAggregator`` keeps a
+converted series per key.  On every snapshot, it picks up the points the Menlo
+stack received since the last one, converts just those and appends them.  State
+keys only ever convert their latest point.
+
+Points are picked up when needed instead of having the stack call back on every
+value received, as that would slow down receiving for points that might never
+be published.
+"""
+import collections
+import logging
+from typing import Dict, Iterable  # pylint: disable=unused-import
+
+from ..drivers import menlo_stack
+
+LOGGER = logging.getLogger('pyodine.controller.readings_aggregator')
+
+
+class ReadingsAggregator:  # pylint: disable=too-few-public-methods
+    """Converted series of Menlo readings, kept up to date incrementally."""
+
+    def __init__(self, menlo: menlo_stack.MenloStack,
+                 sources: Dict[str, menlo_stack.Source],
+                 state_keys: Iterable[str],
+                 maxlen: int = menlo_stack.ROTATE_N) -> None:
+        """
+        :param sources: Where to take the series from, by readings key.  See
+                    ``MenloStack.get_source()``.
+        :param state_keys: Keys of those readings that only ever hold the latest
+                    point.
+        :param maxlen: Keep this many points per series, like ``menlo`` does.
+        """
+        self._menlo = menlo
+        self._sources = dict(sources)
+        self._state_keys = frozenset(state_keys)
+        self._series = {
+            key: collections.deque(maxlen=1 if key in self._state_keys else maxlen)
+            for key in sources}  # type: Dict[str, collections.deque]
+        self._last = {key: None for key in sources}  # type: Dict[str, menlo_stack.DataPoint]
+        """The latest raw point picked up, by key."""
+
+    def snapshot(self, since: float = None) -> Dict[str, menlo_stack.Buffer]:
+        """The readings, as returned by the respective Menlo getters.
+
+        :param since: Include all points of series since then.  If not given,
+                    only the latest point of every series is included.
+        """
+        if not isinstance(since, float):
+            since = None
+        data = {}  # type: Dict[str, menlo_stack.Buffer]
+        for key, series in self._series.items():
+            self._update(key, series)
+            if not series:
+                data[key] = []
+            elif since is None or key in self._state_keys:
+                data[key] = [series[-1]]
+            else:
+                # Series are sorted oldest first, so only the new points are
+                # looked at.
+                points = []
+                for point in reversed(series):
+                    if point[0] < since:
+                        break
+                    points.append(point)
+                points.reverse()
+                data[key] = points
+        return data
+
+    def _update(self, key: str, series: collections.deque) -> None:
+        """Convert and append the points received since the last update."""
+        source = self._sources[key]
+        new = self._menlo.get_new_points(source, self._last[key])
+        if not new:
+            return
+        self._last[key] = new[-1]
+        if len(new) > series.maxlen:
+            new = new[-series.maxlen:]  # Would be dropped right away.
+        if source.convert is None:
+            series.extend(new)
+            return
+        try:
+            series.extend([(time, source.convert(value)) for time, value in new])
+        except ValueError:
+            LOGGER.warning("Couldn't convert %s readings.", key)
+            LOGGER.debug("Reason:", exc_info=True)
@@ -12,11 +12,14 @@ import enum
 from functools import partial
 import logging
 import time
-from typing import Dict, List, Tuple, Union
+from typing import Any, Dict, List, Tuple, Union
 
 from . import lock_buddy  # for type annotations  # pylint: disable=unused-import
+from .daq_scheduler import DaqPriority, DaqScheduler
+from .readings_aggregator import ReadingsAggregator
 from .temperature_ramp import TemperatureRamp
-from ..drivers import ecdl_mopa, dds9_control, menlo_stack, mccdaq, ms_ntc
+from ..drivers import ecdl_mopa, dds9_async, menlo_stack, mccdaq, ms_ntc
+from ..drivers import simulated_daq
 from ..util import asyncio_tools as tools
 from .. import logger
 from .. import constants as cs
@@ -30,6 +33,16 @@ TEC_CONTROLLERS = {'miob': 1, 'vhbg': 2, 'shgb': 3, 'shga': 4}
 LOCKBOX_ID = 2
 DDS_PORT = '/dev/ttyUSB2'
 
+READINGS_STATE_KEYS = frozenset(
+    [ld + suffix for ld in ('mo', 'pa') for suffix in ('_enabled', '_current_set')]
+    + [tec + suffix for tec in TEC_CONTROLLERS
+       for suffix in ('_tec_enabled', '_temp_raw_set', '_temp_set', '_temp_ok')]
+    + ['nu_lock_enabled', 'nu_i1_enabled', 'nu_i2_enabled', 'nu_ramp_enabled',
+       'nu_prop', 'nu_offset'])
+"""Those keys of `get_full_set_of_readings()` only ever hold the latest point.
+Keep this synchronized with `get_readings_sources()`!
+"""
+
 # Define some custom types.
 # pylint: disable=invalid-name
 MenloUnit = Union[float, int]
@@ -93,6 +106,20 @@ LIGHT_SENSOR_CHANNELS = LightSensors(DaqInput.PD_MIOB, DaqInput.PD_AUX,
                                      DaqInput.DETECTOR_PUMP, DaqInput.DETECTOR_LOG)
 LIGHT_SENSOR_GAINS = LightSensors(mccdaq.InputRange.PM_2V, mccdaq.InputRange.PM_2V,
                                   mccdaq.InputRange.PM_5V, mccdaq.InputRange.PM_5V)
+SIMULATED_DAQ_WIRING = {
+    DaqInput.RAMP_MONITOR: simulated_daq.SimSignal.RAMP,
+    DaqInput.ERR_SIGNAL: simulated_daq.SimSignal.ERROR,
+    DaqInput.DETECTOR_LOG: simulated_daq.SimSignal.LOG}
+
+# Keep this synchronized with `AuxTemp`!
+AUX_TEMP_CHANNELS = [(DaqInput.NTC_CELL, mccdaq.InputRange.PM_5V),
+                     (DaqInput.NTC_MO, mccdaq.InputRange.PM_5V),
+                     (DaqInput.NTC_PA, mccdaq.InputRange.PM_5V),
+                     (DaqInput.NTC_SHG, mccdaq.InputRange.PM_5V),
+                     (DaqInput.NTC_MENLO, mccdaq.InputRange.PM_5V),
+                     (DaqInput.NTC_AOM_AMP, mccdaq.InputRange.PM_5V),
+                     (DaqInput.NTC_HEATSINK_A, mccdaq.InputRange.PM_5V),
+                     (DaqInput.NTC_HEATSINK_B, mccdaq.InputRange.PM_5V)]
 
 class Tuners:  # pylint: disable=too-few-public-methods
     """The usable tuners exposed by the system.
@@ -124,6 +151,55 @@ class SubsystemError(RuntimeError):
     pass
 
 
+def get_readings_sources(
+        menlo: menlo_stack.MenloStack) -> Dict[str, menlo_stack.Source]:
+    """Where the Menlo readings of `get_full_set_of_readings()` come from."""
+    sources = {}  # type: Dict[str, menlo_stack.Source]
+
+    # ADC readings
+    for channel in range(8):
+        sources['adc' + str(channel)] = menlo.get_source(menlo.get_adc_voltage,
+                                                         channel)
+
+    # LD current drivers
+    for name, unit in [('mo', LdDriver.MASTER_OSCILLATOR),
+                       ('pa', LdDriver.POWER_AMPLIFIER)]:
+        sources[name + '_enabled'] = menlo.get_source(
+            menlo.is_current_driver_enabled, unit)
+        sources[name + '_current'] = menlo.get_source(
+            menlo.get_diode_current, _LD_CARDS[unit])
+        sources[name + '_current_set'] = menlo.get_source(
+            menlo.get_diode_current_setpoint, _LD_CARDS[unit])
+
+    # TEC controllers
+    for name, unit2 in TEC_CONTROLLERS.items():  # unit != unit2 (typing)
+        unt = TecUnit(unit2)
+        sources[name + '_tec_enabled'] = menlo.get_source(menlo.is_tec_enabled,
+                                                          unt)
+        sources[name + '_temp'] = menlo.get_source(menlo.get_temperature, unt)
+        sources[name + '_temp_raw_set'] = menlo.get_source(
+            menlo.get_temp_setpoint, unt)
+        sources[name + '_temp_ok'] = menlo.get_source(menlo.is_temp_ok, unt)
+        sources[name + '_tec_current'] = menlo.get_source(
+            menlo.get_tec_current, unt)
+
+    # PII Controller
+    sources['nu_lock_enabled'] = menlo.get_source(menlo.is_lock_enabled,
+                                                  LOCKBOX_ID)
+    sources['nu_i1_enabled'] = menlo.get_source(menlo.is_integrator_enabled,
+                                                LOCKBOX_ID, 1)
+    sources['nu_i2_enabled'] = menlo.get_source(menlo.is_integrator_enabled,
+                                                LOCKBOX_ID, 2)
+    sources['nu_ramp_enabled'] = menlo.get_source(menlo.is_ramp_enabled,
+                                                  LOCKBOX_ID)
+    sources['nu_prop'] = menlo.get_source(menlo.get_error_scale, LOCKBOX_ID)
+    sources['nu_offset'] = menlo.get_source(menlo.get_error_offset, LOCKBOX_ID)
+    sources['nu_p_monitor'] = menlo.get_source(menlo.get_pii_monitor,
+                                               LOCKBOX_ID, True)
+    sources['nu_monitor'] = menlo.get_source(menlo.get_pii_monitor, LOCKBOX_ID)
+    return sources
+
+
 class Subsystems:
     """Provides a wrapper for all connected subsystems.
 
@@ -135,6 +211,8 @@ class Subsystems:
         # Wait for Menlo to show up and initialize laser control as soon as
         # they arrive.
         self._menlo = None  # type: menlo_stack.MenloStack
+        self._readings = None  # type: ReadingsAggregator
+        """Keeps the Menlo readings ready for publication."""
         self.laser = None  # type: ecdl_mopa.EcdlMopa
         self._loop = asyncio.get_event_loop()  # type: asyncio.AbstractEventLoop
         """The event loop all our tasks will run in."""
@@ -147,13 +225,14 @@ class Subsystems:
         # Initialize the DDS connection and monitor it for connection problems.
         # We keep the poller alive to monitor the RS232 connection which got
         # stuck sometimes during testing.
-        self._dds = None  # type: dds9_control.Dds9Control
+        self._dds = None  # type: dds9_async.AsyncDds9Control
         dds_poller = tools.poll_resource(
             self.dds_alive, 15, self.reset_dds, continuous=True, name="DDS")
         self._dds_poller = self._loop.create_task(dds_poller)  # type: asyncio.Task
 
         # The DAQ connection will be established and monitored through polling.
         self._daq = None  # type: mccdaq.MccDaq
+        self._daq_scheduler = DaqScheduler(lambda: self._daq)
         asyncio.ensure_future(tools.poll_resource(
             self.daq_alive, 3.7, self.reset_daq, name="DAQ"))
 
@@ -172,13 +251,21 @@ class Subsystems:
             return True
         return False
 
-    def dds_alive(self) -> bool:
+    def get_daq_stats(self) -> Dict[str, Any]:
+        """Queue wait times and merged requests of the DAQ, see
+        ``DaqScheduler.get_stats()``.
+        """
+        return self._daq_scheduler.get_stats()
+
+    async def dds_alive(self) -> bool:
         """The DDS is connected and healthy."""
-        if self._dds and self._dds.ping():
+        if self._dds and await self._dds.ping():
             return True
         return False
 
-    async def fetch_scan(self, amplitude: float = 1) -> cs.SpecScan:
+    async def fetch_scan(self, amplitude: float = 1,
+                         resolution: cs.ScanResolution = cs.DAQ_SCAN_RESOLUTION,
+                         priority: DaqPriority = DaqPriority.PRELOCK) -> cs.SpecScan:
         """Scan the frequency once and return the readings acquired.
 
         This is the main method used by the `lock_buddy` module to perform
@@ -187,19 +274,23 @@ class Subsystems:
         :param amplitude: The peak-to-peak amplitude to use for scanning,
                     ranging [0, 1]. 1 corresponds to
                     `constants.DAQ_MAX_SCAN_AMPLITUDE`.
+        :param resolution: Number of samples, duration and oversampling of
+                    the scan.
+        :param priority: Relative to other pending DAQ requests.
         :returns: Numpy array of fetched data. There are three columns: "ramp
                     monitor", "error signal" and "logarithmic port".
         :raises ConnectionError: DAQ is unavailable.
         """
-        blocking_fetch = lambda: self._daq.fetch_scan(
-            amplitude * cs.DAQ_MAX_SCAN_AMPLITUDE,
-            cs.DAQ_SCAN_TIME,
-            [(DaqInput.RAMP_MONITOR, mccdaq.InputRange.PM_10V),
-             (DaqInput.ERR_SIGNAL, mccdaq.InputRange.PM_1V),
-             (DaqInput.DETECTOR_LOG, mccdaq.InputRange.PM_5V)],
-            mccdaq.RampShape.DESCENT)
         try:
-            return await asyncio.get_event_loop().run_in_executor(None, blocking_fetch)
+            return await self._daq_scheduler.fetch_scan(
+                amplitude * cs.DAQ_MAX_SCAN_AMPLITUDE,
+                resolution.time,
+                [(DaqInput.RAMP_MONITOR, mccdaq.InputRange.PM_10V),
+                 (DaqInput.ERR_SIGNAL, mccdaq.InputRange.PM_1V),
+                 (DaqInput.DETECTOR_LOG, mccdaq.InputRange.PM_5V)],
+                mccdaq.RampShape.DESCENT, priority,
+                n_samples=resolution.n_samples,
+                oversampling=resolution.oversampling)
         except (AttributeError, ConnectionError) as err:
             raise ConnectionError(
                 "Couldn't fetch signal as DAQ is unavailable.") from err
@@ -222,20 +313,9 @@ class Subsystems:
             return cache['value']
 
         LOGGER.debug("Actually measuring temperatures.")
-        # Keep this synchronized with `AuxTemp`!
-        channels = [(DaqInput.NTC_CELL, mccdaq.InputRange.PM_5V),
-                    (DaqInput.NTC_MO, mccdaq.InputRange.PM_5V),
-                    (DaqInput.NTC_PA, mccdaq.InputRange.PM_5V),
-                    (DaqInput.NTC_SHG, mccdaq.InputRange.PM_5V),
-                    (DaqInput.NTC_MENLO, mccdaq.InputRange.PM_5V),
-                    (DaqInput.NTC_AOM_AMP, mccdaq.InputRange.PM_5V),
-                    (DaqInput.NTC_HEATSINK_A, mccdaq.InputRange.PM_5V),
-                    (DaqInput.NTC_HEATSINK_B, mccdaq.InputRange.PM_5V)]
-        def fetch_readings() -> List[int]:
-            return self._daq.sample_channels(channels).tolist()[0]  # may raise!
-
-        temps = ms_ntc.to_temperatures(
-            await asyncio.get_event_loop().run_in_executor(None, fetch_readings))
+        readings = await self._daq_scheduler.sample_channels(  # may raise!
+            AUX_TEMP_CHANNELS, DaqPriority.TEMPERATURES)
+        temps = ms_ntc.to_temperatures(readings.tolist()[0])
         if not dont_log:
             logger.log_quantity('daq_temps', '\t'.join([str(t) for t in temps]))
         cache['value'] = temps
@@ -246,45 +326,13 @@ class Subsystems:
         """Return a dict of all readings, ready to be sent to the client."""
         data = {}  # type: Dict[str, Union[Buffer, Dict]]
 
-        if self._menlo is None:
+        if self._menlo is None or self._readings is None:
             return data
 
-        # ADC readings
-        for channel in range(8):
-            data['adc' + str(channel)] = self._menlo.get_adc_voltage(channel,
-                                                                     since)
-
-        # LD current drivers
-        for name, unit in [('mo', LdDriver.MASTER_OSCILLATOR),
-                           ('pa', LdDriver.POWER_AMPLIFIER)]:
-            data[name + '_enabled'] = self._menlo.is_current_driver_enabled(unit)
-            data[name + '_current'] = self._menlo.get_diode_current(_LD_CARDS[unit], since)
-            data[name + '_current_set'] = self._menlo.get_diode_current_setpoint(_LD_CARDS[unit])
-
-        # TEC controllers
-        for name, unit2 in TEC_CONTROLLERS.items():  # unit != unit2 (typing)
-            unt = TecUnit(unit2)
-            data[name + '_tec_enabled'] = self._menlo.is_tec_enabled(unt)
-            data[name + '_temp'] = self._menlo.get_temperature(unt, since)
-            data[name + '_temp_raw_set'] = self._menlo.get_temp_setpoint(unt)
+        data.update(self._readings.snapshot(since))
+        for name, unit in TEC_CONTROLLERS.items():
             data[name + '_temp_set'] = self._wrap_into_buffer(
-                self._temp_ramps[unt].target_temperature)
-            data[name + '_temp_ok'] = self._menlo.is_temp_ok(unt)
-            data[name + '_tec_current'] = self._menlo.get_tec_current(unt, since)
-
-        # PII Controller
-        data['nu_lock_enabled'] = self._menlo.is_lock_enabled(LOCKBOX_ID)
-        data['nu_i1_enabled'] = \
-            self._menlo.is_integrator_enabled(LOCKBOX_ID, 1)
-        data['nu_i2_enabled'] = \
-            self._menlo.is_integrator_enabled(LOCKBOX_ID, 2)
-        data['nu_ramp_enabled'] = self._menlo.is_ramp_enabled(LOCKBOX_ID)
-        data['nu_prop'] = self._menlo.get_error_scale(LOCKBOX_ID)
-        data['nu_offset'] = self._menlo.get_error_offset(LOCKBOX_ID)
-        data['nu_p_monitor'] = self._menlo.get_pii_monitor(
-            LOCKBOX_ID, p_only=True, since=since)
-        data['nu_monitor'] = self._menlo.get_pii_monitor(LOCKBOX_ID,
-                                                         since=since)
+                self._temp_ramps[TecUnit(unit)].target_temperature)
         return data
 
     def get_ld_current_setpt(self, unit: LdDriver) -> float:
@@ -310,10 +358,9 @@ class Subsystems:
         channels = [(getattr(LIGHT_SENSOR_CHANNELS, key),
                      getattr(LIGHT_SENSOR_GAINS, key))
                     for key in LightSensors._fields]
-        def fetch_readings() -> List[int]:
-            return self._daq.sample_channels(channels).tolist()[0]  # may raise!
-        readings = await self._loop.run_in_executor(None, fetch_readings)
-        levels = [counts / 2**15 - 1 for counts in readings]
+        readings = await self._daq_scheduler.sample_channels(  # may raise!
+            channels, DaqPriority.PHOTODIODES)
+        levels = [counts / 2**15 - 1 for counts in readings.tolist()[0]]
         logger.log_quantity('light_levels', '\t'.join([str(l) for l in levels]))
         return LightSensors._make(levels)
 
@@ -472,16 +519,26 @@ class Subsystems:
         """
         # For lack of better understanding of the object destruction mechanism,
         # we del here before we set it to None.
+        if self._daq:
+            self._daq.stop_stream()
         del self._daq
         self._daq = None
         try:
-            attempt = mccdaq.MccDaq(lock_timeout=cs.DAQ_ALLOWABLE_BLOCKING_TIME)
+            if cs.DAQ_SIMULATED:
+                attempt = simulated_daq.SimulatedDaq(
+                    lock_timeout=cs.DAQ_ALLOWABLE_BLOCKING_TIME,
+                    wiring=SIMULATED_DAQ_WIRING)
+            else:
+                attempt = mccdaq.MccDaq(
+                    lock_timeout=cs.DAQ_ALLOWABLE_BLOCKING_TIME)
         except ConnectionError:
             LOGGER.error("Couldn't reset DAQ, as the connection failed.")
             LOGGER.debug("Reason:", exc_info=True)
         else:
             LOGGER.info("Successfully (re-)set DAQ.")
             self._daq = attempt
+            if cs.DAQ_STREAM_SENSORS:
+                self._start_sensor_stream()
 
     async def reset_dds(self) -> None:
         """Reset the connection to the Menlo subsystem.
@@ -489,16 +546,12 @@ class Subsystems:
         This will not raise anything on failure. Use dds_alive() to check
         success.
         """
-        # For lack of better understanding of the object destruction mechanism,
-        # we del here before we set it to None.
-        del self._dds
+        if self._dds:
+            self._dds.close()
         self._dds = None
+        attempt = dds9_async.AsyncDds9Control(DDS_PORT)
         try:
-            # The DDS class is written in synchronous style although it
-            # contains lots of blocking calls.  Initialization is the heaviest
-            # of them all and is thus run in a thread pool executor.
-            attempt = await self._loop.run_in_executor(
-                None, partial(dds9_control.Dds9Control, DDS_PORT))
+            await attempt.init_async()
         except ConnectionError:
             LOGGER.error("Couldn't connect to DDS.")
             LOGGER.debug("Couldn't connect to DDS.", exc_info=True)
@@ -510,6 +563,7 @@ class Subsystems:
         """Reset the connection to the Menlo subsystem."""
         # For lack of better understanding of the object destruction mechanism,
         # we del here before we set it to None.
+        self._readings = None
         del self._menlo
         self._menlo = None
         attempt = menlo_stack.MenloStack()
@@ -520,27 +574,29 @@ class Subsystems:
             LOGGER.debug("Reason:", exc_info=True)
         else:
             LOGGER.info("Successfully reset Menlo stack.")
+            self._readings = ReadingsAggregator(
+                attempt, get_readings_sources(attempt), READINGS_STATE_KEYS)
             self._menlo = attempt
 
-    def set_aom_amplitude(self, amplitude: float) -> None:
+    async def set_aom_amplitude(self, amplitude: float) -> None:
         """Set the acousto-optic modulator driver amplitude betw. 0 and 1."""
         if not isinstance(amplitude, (float, int)) or amplitude < 0:
             LOGGER.error("Provide valid amplitude for AOM.")
             return
         try:
-            self._dds.set_amplitude(amplitude, int(DdsChannel.AOM))
+            await self._dds.set_amplitude(amplitude, int(DdsChannel.AOM))
         except (AttributeError, ConnectionError):
             LOGGER.error("DDS offline.")
         else:
             LOGGER.info("Set AOM amplitude to %s %%.", amplitude * 100)
 
-    def set_aom_frequency(self, freq: float) -> None:
+    async def set_aom_frequency(self, freq: float) -> None:
         """Set the acousto-optic modulator driver frequency in MHz."""
         if not isinstance(freq, (float, int)) or not freq > 0:
             LOGGER.error("Provide valid frequency (float) for AOM.")
             return
         try:
-            self._dds.set_frequency(freq, int(DdsChannel.AOM))
+            await self._dds.set_frequency(freq, int(DdsChannel.AOM))
         except (AttributeError, ConnectionError):
             LOGGER.error("DDS offline.")
         else:
@@ -565,25 +621,25 @@ class Subsystems:
             raise SubsystemError("Critical error in osc. sup. unit!") from err
         LOGGER.info("Set diode current of unit %s to %s mA", unit, milliamps)
 
-    def set_eom_amplitude(self, amplitude: float) -> None:
+    async def set_eom_amplitude(self, amplitude: float) -> None:
         """Set the electro-optic modulator driver amplitude betw. 0 and 1."""
         if not isinstance(amplitude, (float, int)) or amplitude < 0:
             LOGGER.error("Provide valid amplitude for EOM.")
             return
         try:
-            self._dds.set_amplitude(amplitude, int(DdsChannel.EOM))
+            await self._dds.set_amplitude(amplitude, int(DdsChannel.EOM))
         except (AttributeError, ConnectionError):
             LOGGER.error("DDS offline.")
         else:
             LOGGER.info("Set EOM amplitude to %s %%.", amplitude * 100)
 
-    def set_eom_frequency(self, freq: float) -> None:
+    async def set_eom_frequency(self, freq: float) -> None:
         """Set the EOM and mixer frequency in MHz."""
         if not isinstance(freq, (float, int)) or not freq > 0:
             LOGGER.error("Provide valid frequency (float) for EOM.")
             return
         try:
-            self._dds.set_frequency(freq, int(DdsChannel.EOM))
+            await self._dds.set_frequency(freq, int(DdsChannel.EOM))
         except (AttributeError, ConnectionError):
             LOGGER.error("DDS offline.")
         else:
@@ -609,31 +665,31 @@ class Subsystems:
             return
         self._menlo.set_error_scale(LOCKBOX_ID, factor)
 
-    def set_mixer_amplitude(self, amplitude: float) -> None:
+    async def set_mixer_amplitude(self, amplitude: float) -> None:
         """Set the mixer driver amplitude betw. 0 and 1."""
         if not isinstance(amplitude, (float, int)) or amplitude < 0:
             LOGGER.error("Provide valid amplitude for mixer.")
             return
         try:
-            self._dds.set_amplitude(amplitude, int(DdsChannel.MIXER))
+            await self._dds.set_amplitude(amplitude, int(DdsChannel.MIXER))
         except (AttributeError, ConnectionError):
             LOGGER.error("DDS offline.")
         else:
             LOGGER.info("Set mixer amplitude to %s %%.", amplitude * 100)
 
-    def set_mixer_frequency(self, freq: float) -> None:
+    async def set_mixer_frequency(self, freq: float) -> None:
         """Set the Mixer frequency in MHz. Will usually be identical to EOM."""
         if not isinstance(freq, (float, int)) or not freq > 0:
             LOGGER.error("Provide valid frequency (float) for Mixer.")
             return
         try:
-            self._dds.set_frequency(freq, int(DdsChannel.MIXER))
+            await self._dds.set_frequency(freq, int(DdsChannel.MIXER))
         except (AttributeError, ConnectionError):
             LOGGER.error("DDS offline.")
         else:
             LOGGER.info("Set mixer frequency to %s MHz.", freq)
 
-    def set_mixer_phase(self, degrees: float) -> None:
+    async def set_mixer_phase(self, degrees: float) -> None:
         """Set the phase offset between EOM and mixer drivers in degrees."""
         if not isinstance(degrees, (float, int)):
             LOGGER.error("Provide a mixer phase in degrees (%s given).", degrees)
@@ -641,8 +697,9 @@ class Subsystems:
 
         try:
             # To set the phase difference, we need to set phases of both channels.
-            self._dds.set_phase(0, int(DdsChannel.EOM))
-            self._dds.set_phase(degrees, int(DdsChannel.MIXER))
+            await asyncio.gather(
+                self._dds.set_phase(0, int(DdsChannel.EOM)),
+                self._dds.set_phase(degrees, int(DdsChannel.MIXER)))
         except (AttributeError, ConnectionError):
             LOGGER.error("Can't set phase as DDS is offline")
         else:
@@ -672,7 +729,7 @@ class Subsystems:
                 ramp = self._temp_ramps[unit]
                 ramp.target_temperature = temp
 
-    def switch_rf_clock_source(self, which: str) -> None:
+    async def switch_rf_clock_source(self, which: str) -> None:
         """Pass "external" or "internal" to switch RF clock source."""
         if which not in ['external', 'internal']:
             LOGGER.error('Can only switch to "external" or "internal" '
@@ -680,9 +737,9 @@ class Subsystems:
             return
         try:
             if which == 'external':
-                self._dds.switch_to_ext_reference()
+                await self._dds.switch_to_ext_reference()
             else:  # str == 'internal'
-                self._dds.switch_to_int_reference()
+                await self._dds.switch_to_int_reference()
         except (AttributeError, ConnectionError):
             LOGGER.error("DDS offline.")
         else:
@@ -863,6 +920,20 @@ class Subsystems:
         self._temp_ramps[TecUnit.SHGA].maximum_gradient = 1/5
         self._temp_ramps[TecUnit.SHGB].maximum_gradient = 1/5
 
+    def _start_sensor_stream(self) -> None:
+        """Stream all photodiode and temperature channels from the DAQ.
+
+        ``get_light_levels()`` and ``get_aux_temps()`` read from the stream
+        then.  This will not raise anything on failure.
+        """
+        channels = list(zip(LIGHT_SENSOR_CHANNELS, LIGHT_SENSOR_GAINS))
+        channels += [c for c in AUX_TEMP_CHANNELS if c not in channels]
+        try:
+            self._daq.start_stream(channels)
+        except (BlockingIOError, ConnectionError):
+            LOGGER.error("Couldn't start DAQ sensor stream.")
+            LOGGER.debug("Reason:", exc_info=True)
+
     def _is_tec_unit(self, name: str) -> bool:
         if self._menlo is None:
             return False
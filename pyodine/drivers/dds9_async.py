@@ -0,0 +1,431 @@
+"""An asyncio-native driver for the DDS9m frequency generator.
+
+``AsyncDds9Control`` offers what ``dds9_control.Dds9Control`` does, but never
+blocks the event loop:  Commands are queued and written to the serial port
+without waiting for the previous command's response, up to ``PIPELINE_DEPTH``
+commands at a time.  Responses are read as they arrive, through
+``transport.serial_transport.SerialTransport``.  A setting that is superseded
+before it was sent, e.g. by a GUI slider, is not sent at all; its caller is
+notified once the newer setting was confirmed instead.
+
+Once echoing is disabled, the DDS9m terminates every response with a line
+reading "OK" or "?n", with n being an error code.  Other lines, like the
+channel states returned by "QUE", precede that.  This is how responses are
+told apart.
+
+As with ``Dds9Control``, frequencies, amplitudes and phases are read from a
+copy of the device state that is kept up to date by the setters.  The device
+is queried again if it refused a command and on every ``ping()``.
+"""
+import asyncio
+import collections
+import copy
+import logging
+from typing import Dict, List, Tuple, Union  # pylint: disable=unused-import
+
+from . import dds9_control
+from .dds9_control import DEFAULT_TO_EXT_SOURCE, Dds9Setting, SetupParameters
+from ..transport.serial_transport import SerialTransport
+
+LOGGER = logging.getLogger('pyodine.drivers.dds9_async')
+
+PIPELINE_DEPTH = 4
+"""Send up to ~ commands before the first of them was answered.  The DDS9m's
+input buffer is small, so don't overdo it.
+"""
+
+
+class _Command:  # pylint: disable=too-few-public-methods
+    def __init__(self, text: str, register: Tuple[str, int, int] = None) -> None:
+        self.text = text
+        self.register = register
+        """Command letter, channel and register value of setter commands."""
+        self.lines = []  # type: List[str]
+        self.futures = [asyncio.get_event_loop().create_future()]  # type: List[asyncio.Future]
+        self.timeout = None  # type: asyncio.Handle
+
+
+class AsyncDds9Control:
+    """A stateful controller for the DDS9m frequency generator.
+
+    Caller must be calling from a running asyncio loop.  Make sure to await
+    ``init_async()`` before using an instance.
+
+    .. CAUTION::
+        Initializing may change some of the running device's parameters, see
+        ``Dds9Control``.
+    """
+
+    def __init__(self, port: str) -> None:
+        """This does not do anything. Make sure to await the init_async() coro!
+
+        :param str port: Where to probe for device (e.g. '/dev/tty0')
+        """
+        self._settings = SetupParameters()
+        self._settings.port = str(port)
+        self._paused_amplitudes = None  # type: List[float]
+        self._ref_clock = ''  # See Dds9Control.
+        self._freq_scale_factor = None  # type: float
+        self._state = None  # type: Dds9Setting
+        self._update = None  # type: asyncio.Future
+
+        self._transport = None  # type: SerialTransport
+        self._received = b''  # Incomplete line.
+        self._queue = collections.deque()  # type: collections.deque
+        self._unsent = {}  # type: Dict[Tuple[str, int], _Command]
+        """Queued setter commands that may still be superseded."""
+        self._in_flight = collections.deque()  # type: collections.deque
+        self.n_superseded = 0
+        """Settings that were never sent, as a newer one came in."""
+
+    async def init_async(self) -> None:
+        """Set the device connection up and set some basic device parameters.
+
+        :raises ConnectionError: Couldn't connect to a sane DDS9.
+        """
+        self._transport = SerialTransport(self._settings.port,
+                                          self._settings.baudrate,
+                                          on_receive=self._on_receive)
+        self._transport.start_reading()
+        try:
+            # See Dds9Control._initialize_device() for what those do.
+            for command in ('I a', 'I p', 'Vs 1', 'E d', 'M a'):
+                await self._send_command(command)
+            await self._update_state()
+            if DEFAULT_TO_EXT_SOURCE:
+                await self.switch_to_ext_reference(adjust_frequencies=False)
+            else:
+                await self.switch_to_int_reference(adjust_frequencies=False)
+            if not await self.ping():
+                raise ConnectionError("Unexpected DDS9 behaviour.")
+        except ConnectionError:
+            self.close()
+            raise
+        LOGGER.info("Connection to DDS9m established.")
+
+    def close(self) -> None:
+        """Close the port.  Pending commands fail."""
+        if self._transport is not None:
+            self._transport.close()
+        self._fail_all(ConnectionError("DDS connection was closed."))
+
+    async def set_frequency(self, freq: float, channel: int = -1) -> None:
+        """Set frequency in MHz for one or all (-1) channels.
+
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        encoded_value, register_value = dds9_control.encode_frequency(
+            freq, self._freq_scale_factor, self._settings.max_freq_value)
+        await self._set_registers('F', channel, encoded_value, register_value)
+
+    @property
+    def frequencies(self) -> List[float]:
+        """Returns the frequency of each channel in MHz."""
+        return [f / self._freq_scale_factor * 1e-7 for f in self._state.freqs]
+
+    async def set_amplitude(self, ampl: float, channel: int = -1) -> None:
+        """Set amplitude (float in [0, 1]) for one or all (-1) channels.
+
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        encoded_value = dds9_control.encode_amplitude(ampl)
+        await self._set_registers('V', channel, str(encoded_value),
+                                  encoded_value)
+
+    @property
+    def amplitudes(self) -> List[float]:
+        """Returns a list of relative amplitudes in [0, 1] for all channels."""
+        return [a/1023. for a in self._state.ampls]
+
+    async def set_phase(self, phase: float, channel: int = -1) -> None:
+        """Set phase in degrees <360 for one or all (-1) channels.
+
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        encoded_value = dds9_control.encode_phase(phase)
+        await self._set_registers('P', channel, str(encoded_value),
+                                  encoded_value)
+
+    @property
+    def phases(self) -> List[float]:
+        """The relative phases of all four channels in degrees."""
+        return [p*360/16384 for p in self._state.phases]
+
+    @property
+    def runs_on_ext_clock_source(self) -> Union[bool, None]:
+        """Is the external clock source in use? Returns None if unknown."""
+        if self._ref_clock == 'ext':
+            return True
+        if self._ref_clock == 'int':
+            return False
+        return None
+
+    def get_settings(self) -> SetupParameters:
+        """Returns a copy of the general setup parameters."""
+        return copy.deepcopy(self._settings)
+
+    async def ping(self) -> bool:
+        """Device is accessible and in non-zero state."""
+        try:
+            await self._update_state()
+        except ConnectionError:
+            return False
+        return not self._state.is_zero()
+
+    async def verify(self) -> bool:
+        """Query the device state and compare it to what we expect.
+
+        See ``Dds9Control.verify()``.
+
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        expected = self._state
+        await self._update_state()
+        if expected is None:
+            return False
+        return all(
+            all(abs(a - b) <= 1 for a, b in zip(mine, theirs))
+            for mine, theirs in ((expected.freqs, self._state.freqs),
+                                 (expected.phases, self._state.phases),
+                                 (expected.ampls, self._state.ampls)))
+
+    async def pause(self) -> None:
+        """Temporarily sets all outputs to zero voltage.
+
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        self._paused_amplitudes = self.amplitudes
+        await self.set_amplitude(0)
+
+    async def resume(self) -> None:
+        """Resume frequency generation with previously used amplitudes.
+
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        if isinstance(self._paused_amplitudes, list):
+            await asyncio.gather(*[self.set_amplitude(ampl, channel) for
+                                   channel, ampl in enumerate(self._paused_amplitudes)])
+        else:
+            LOGGER.error("Can't resume as device wasn't pause()d before.")
+
+    async def switch_to_ext_reference(self, adjust_frequencies: bool = True) -> None:
+        """Base generated frequencies on external clock source.
+
+        See ``Dds9Control.switch_to_ext_reference()``.
+
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        if self._ref_clock == 'ext':
+            LOGGER.info("Already set to use ext. clock reference. "
+                        "Doing nothing.")
+            return
+        former_freqs = self.frequencies if adjust_frequencies else None
+        await self._send_command(
+            'Kp ' + self._settings.ext_clock_multiplier_setting)
+        await asyncio.sleep(0.2)
+        await self._send_command('C E')
+        self._freq_scale_factor = (
+            self._settings.int_clock / self._settings.ext_clock)
+        await asyncio.sleep(0.2)
+        if former_freqs:
+            await asyncio.gather(*[self.set_frequency(freq, channel)
+                                   for channel, freq in enumerate(former_freqs)])
+        self._ref_clock = 'ext'
+
+    async def switch_to_int_reference(self, adjust_frequencies: bool = True) -> None:
+        """Base generated frequencies on internal clock source.
+
+        See ``Dds9Control.switch_to_int_reference()``.
+
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        if self._ref_clock == 'int':
+            LOGGER.info("Already set to use int. clock reference. "
+                        "Doing nothing.")
+            return
+        former_freqs = self.frequencies if adjust_frequencies else None
+        await self._send_command('Kp 0f')
+        await asyncio.sleep(0.2)
+        await self._send_command('C I')
+        self._freq_scale_factor = 1
+        self._ref_clock = 'int'
+        await asyncio.sleep(0.2)
+        if former_freqs:
+            await asyncio.gather(*[self.set_frequency(freq, channel)
+                                   for channel, freq in enumerate(former_freqs)])
+
+    async def save(self) -> None:
+        """Save current device configuration to EEPROM.
+
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        await self._send_command('S')
+        await asyncio.sleep(.5)
+
+    async def reset(self) -> None:
+        """Reset DDS9 to state saved in ROM and set to default clock source.
+
+        See ``Dds9Control.reset()``.
+
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        await self._send_command('R')
+        self._ref_clock = ''
+        await asyncio.sleep(0.5)
+        if DEFAULT_TO_EXT_SOURCE:
+            await self.switch_to_ext_reference(adjust_frequencies=False)
+        else:
+            await self.switch_to_int_reference(adjust_frequencies=False)
+        await self._update_state()
+
+    async def reset_to_factory_default(self) -> None:
+        """Deletes ALL device config and restores to factory default.
+
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        await self._send_command('CLR')
+        await asyncio.sleep(2)
+        await self._update_state()
+
+    # private methods
+
+    async def _set_registers(self, command: str, channel: int,
+                             encoded_value: str, register_value: int) -> None:
+        if type(channel) is not int:  # pylint: disable=unidiomatic-typecheck
+            LOGGER.error('"channel" must be an actual int.')
+            return
+        if channel in range(4):
+            channels = [channel]
+        elif channel == -1:
+            channels = list(range(4))
+        else:
+            LOGGER.error("Provide channel in [0, 1, 2, 3].")
+            return
+        LOGGER.debug("Setting %s of channel(s) %s to %s.", command, channels,
+                     encoded_value)
+        await asyncio.gather(*[
+            self._send_command(command + str(chan) + ' ' + encoded_value,
+                               (command, chan, register_value))
+            for chan in channels])
+
+    async def _update_state(self) -> None:
+        """Queries the device for its internal state and updates _state."""
+        response = await self._send_command('QUE')
+        state = dds9_control.Dds9Control._parse_query_result(response)  # pylint: disable=protected-access
+        self._state = state
+        if state.is_zero():
+            LOGGER.warning("Device was in zero state.")
+
+    def _request_update(self) -> None:
+        """Query the device state in the background, as our copy is in doubt."""
+        if self._update is not None and not self._update.done():
+            return
+
+        def log_failure(update: asyncio.Future) -> None:
+            if not update.cancelled() and update.exception():
+                LOGGER.warning("Couldn't update DDS9 state.")
+
+        self._update = asyncio.ensure_future(self._update_state())
+        self._update.add_done_callback(log_failure)
+
+    async def _send_command(self, text: str,
+                            register: Tuple[str, int, int] = None) -> str:
+        """Queue a command and wait for its response.
+
+        :param register: Setter commands may be superseded while queued.
+        :returns: The full response, including the "OK" or "?n" line.
+        :raises ConnectionError: The device didn't respond in time.
+        """
+        if self._transport is None:
+            raise ConnectionError("DDS is not connected.")
+        key = register[:2] if register else None
+        queued = self._unsent.get(key) if key else None
+        if queued is not None:
+            # Supersede the queued setting, but keep its place in the queue.
+            queued.text = text
+            queued.register = register
+            future = self._loop().create_future()  # type: asyncio.Future
+            queued.futures.append(future)
+            self.n_superseded += 1
+        else:
+            command = _Command(text, register)
+            future = command.futures[0]
+            self._queue.append(command)
+            if key:
+                self._unsent[key] = command
+            else:
+                # Don't move settings across other commands.
+                self._unsent.clear()
+            self._send_more()
+        return await asyncio.shield(future)
+
+    def _send_more(self) -> None:
+        while self._queue and len(self._in_flight) < PIPELINE_DEPTH:
+            command = self._queue.popleft()
+            if command.register and self._unsent.get(command.register[:2]) is command:
+                del self._unsent[command.register[:2]]
+            # Prepend a newline to make sure DDS9 takes commands well.
+            self._transport.write(('\n' + command.text + '\n').encode())
+            command.timeout = self._loop().call_later(
+                self._settings.timeout, self._time_out, command)
+            self._in_flight.append(command)
+
+    def _on_receive(self, data: bytes) -> None:
+        *lines, self._received = (self._received + data).split(b'\n')
+        for raw_line in lines:
+            line = raw_line.decode(errors='ignore').strip()
+            if not line:
+                continue
+            if not self._in_flight:
+                LOGGER.debug("Ignoring unexpected response %s.", line)
+                continue
+            command = self._in_flight[0]
+            command.lines.append(line)
+            if line == 'OK' or line.startswith('?'):
+                self._in_flight.popleft()
+                self._complete(command, line == 'OK')
+        self._send_more()
+
+    def _complete(self, command: _Command, is_ok: bool) -> None:
+        command.timeout.cancel()
+        LOGGER.debug("Sent %s, got %s back.", command.text, command.lines)
+        if command.register:
+            if is_ok and self._state is not None:
+                letter, channel, value = command.register
+                registers = {'F': self._state.freqs, 'V': self._state.ampls,
+                             'P': self._state.phases}[letter]
+                registers[channel] = value
+            else:
+                LOGGER.warning("DDS9 refused %s (%s).", command.text,
+                               command.lines[-1])
+                self._request_update()
+        response = '\r\n'.join(command.lines) + '\r\n'
+        for future in command.futures:
+            if not future.done():
+                future.set_result(response)
+
+    def _time_out(self, command: _Command) -> None:
+        if command not in self._in_flight:
+            return
+        LOGGER.warning("DDS9 didn't answer %s in time.", command.text)
+        self._fail_all(ConnectionError("DDS didn't respond."), queued=False)
+        self._send_more()
+
+    def _fail_all(self, err: Exception, queued: bool = True) -> None:
+        """Fail the commands in flight and, optionally, the queued ones."""
+        commands = list(self._in_flight)
+        self._in_flight.clear()
+        if queued:
+            commands += self._queue
+            self._queue.clear()
+            self._unsent.clear()
+        for command in commands:
+            if command.timeout is not None:
+                command.timeout.cancel()
+            for future in command.futures:
+                if not future.done():
+                    future.set_exception(err)
+
+    @staticmethod
+    def _loop() -> asyncio.AbstractEventLoop:
+        return asyncio.get_event_loop()
@@ -16,7 +16,7 @@ To set up a connection to a DDS9 locally connected via serial connection
 import copy
 import logging
 import time
-from typing import List, Union
+from typing import List, Tuple, Union
 import serial  # serial port communication
 
 __author__ = 'Franz Gutsch'
@@ -25,6 +25,64 @@ LOGGER = logging.getLogger('pyodine.drivers.dds9_control')
 
 DEFAULT_TO_EXT_SOURCE = True
 
+STATE_MAX_AGE = 60
+"""Query the device for its state if our copy is older than ~ seconds.  Setter
+commands update the copy directly, so this only matters if someone else
+talks to the device.
+"""
+
+
+def encode_frequency(freq: float, scale_factor: float,
+                     max_value: float) -> Tuple[str, int]:
+    """Convert a frequency in MHz for a DDS9 "F" command.
+
+    :param scale_factor: Depends on the clock source, see ``Dds9Control``.
+    :param max_value: Cap the scaled frequency to this.
+    :returns: The command argument and the resulting register value as
+                reported by "QUE".
+    """
+    scaled_freq = float(freq) * scale_factor
+
+    # The internal freq. generation chip only stores freq. values up to 171
+    # MHz.
+    if scaled_freq > max_value:
+        LOGGER.error("Capping requested frequency to %s MHz.",
+                     max_value/scale_factor)
+        scaled_freq = max_value
+
+    # The frequency register counts in units of 0.1Hz.
+    return '{0:.7f}'.format(scaled_freq), int(round(scaled_freq * 1e7))
+
+
+def encode_amplitude(ampl: float) -> int:
+    """Convert an amplitude in [0, 1] for a DDS9 "V" command."""
+    encoded_value = int(float(ampl) * 1023)
+    if encoded_value > 1023:
+        LOGGER.warning("Amplitude capped to 1")
+        encoded_value = 1023
+    if encoded_value < 0:
+        LOGGER.warning("Can't set amplitude < 0, resetting to 0.")
+        encoded_value = 0
+    return encoded_value
+
+
+def encode_phase(phase: float) -> int:
+    """Convert a phase in degrees for a DDS9 "P" command."""
+    # Note that the modulo automatically shifts any float into legal range.
+    try:
+        return int(float(phase % 360) * 16383/360)
+    except (ValueError, TypeError):
+        LOGGER.error("Invalid phase value received. Setting phase to 0.")
+        return 0
+
+
+def _is_complete(response: bytes) -> bool:
+    """Does ``response`` end with a line reading "OK" or "?n"?"""
+    if not response.endswith(b'\n'):
+        return False
+    last_line = response.splitlines()[-1].strip()
+    return last_line == b'OK' or last_line.startswith(b'?')
+
 
 class Dds9Setting:
     """A complete set of internal state variables received from DDS9.
@@ -145,6 +203,8 @@ class Dds9Control:
         self._freq_scale_factor = None  # type: float
 
         self._state = None  # type: Dds9Setting
+        self._state_time = None  # type: float
+        """When `_state` was last queried. None if it's outdated."""
         self._conn = None  # type: serial.Serial
 
         # Initialize device.
@@ -172,20 +232,10 @@ class Dds9Control:
             return
 
         def set_channel(channel: int, encoded_value: str) -> None:
-            command_string = 'F' + str(channel) + ' ' + str(encoded_value)
-            self._send_command(command_string)
+            self._set_register('F', channel, encoded_value, register_value)
 
-        scaled_freq = float(freq) * self._freq_scale_factor
-
-        # The internal freq. generation chip only stores freq. values up to 171
-        # MHz.
-        max_value = self._settings.max_freq_value
-        if scaled_freq > max_value:
-            LOGGER.error("Capping requested frequency to %s MHz.",
-                         max_value/self._freq_scale_factor)
-            scaled_freq = max_value
-
-        encoded_value = '{0:.7f}'.format(scaled_freq)
+        encoded_value, register_value = encode_frequency(
+            freq, self._freq_scale_factor, self._settings.max_freq_value)
 
         if channel in range(4):
             LOGGER.debug("Setting frequency of channel %s to %s MHz.",
@@ -197,14 +247,14 @@ class Dds9Control:
                 set_channel(chan, encoded_value)
         else:
             LOGGER.error("Provide channel in [0, 1, 2, 3].")
-        self._update_state()
 
     @property
     def frequencies(self) -> List[float]:
         """Returns the frequency of each channel in MHz."""
 
         # The frequency is returned in units of 0.1Hz, but requested in MHz.
-        return [f / self._freq_scale_factor * 1e-7 for f in self._state.freqs]
+        return [f / self._freq_scale_factor * 1e-7
+                for f in self._get_state().freqs]
 
     def set_amplitude(self, ampl: float, channel: int = -1) -> None:
         """Set amplitude (float in [0, 1]) for one or all channels.
@@ -214,16 +264,9 @@ class Dds9Control:
         :raises ConnectionError: The connection just broke or is broken.
         """
         def set_channel(channel: int, encoded_value: int) -> None:
-            command_string = 'V' + str(channel) + ' ' + str(encoded_value)
-            self._send_command(command_string)
+            self._set_register('V', channel, str(encoded_value), encoded_value)
 
-        encoded_value = int(float(ampl) * 1023)
-        if encoded_value > 1023:
-            LOGGER.warning("Amplitude capped to 1")
-            encoded_value = 1023
-        if encoded_value < 0:
-            LOGGER.warning("Can't set amplitude < 0, resetting to 0.")
-            encoded_value = 0
+        encoded_value = encode_amplitude(ampl)
 
         if channel > 3:
             LOGGER.warning("set_amplitude: Only channels 0-3 may be specified."
@@ -233,7 +276,6 @@ class Dds9Control:
         else:
             for chan in range(4):
                 set_channel(chan, encoded_value)
-        self._update_state()
 
     @property
     def amplitudes(self) -> List[float]:
@@ -241,7 +283,7 @@ class Dds9Control:
 
         The amplitudes are returned as a list of floats in [0,1].
         """
-        return [a/1023. for a in self._state.ampls]
+        return [a/1023. for a in self._get_state().ampls]
 
     def set_phase(self, phase: float, channel: int = -1) -> None:
         """Set phase in degrees <360 for one or all channels.
@@ -256,17 +298,11 @@ class Dds9Control:
             return
 
         def set_channel(channel: int, encoded_value: int) -> None:
-            command_string = 'P' + str(channel) + ' ' + str(encoded_value)
-            self._send_command(command_string)
+            self._set_register('P', channel, str(encoded_value), encoded_value)
 
         LOGGER.debug("Setting phase to %s°.", phase)
 
-        # Note that the modulo automatically shifts any float into legal range.
-        try:
-            encoded_value = int(float(phase % 360) * 16383/360)
-        except (ValueError, TypeError):
-            LOGGER.error("Invalid phase value received. Setting phase to 0.")
-            encoded_value = 0
+        encoded_value = encode_phase(phase)
 
         if channel > 3:
             LOGGER.warning("set_phase: Only channels 0-3 may be specified. "
@@ -276,12 +312,11 @@ class Dds9Control:
         else:
             for chan in range(4):
                 set_channel(chan, encoded_value)
-        self._update_state()
 
     @property
     def phases(self) -> List[float]:
         """The relative phases of all four channels in degrees."""
-        return [p*360/16384 for p in self._state.phases]
+        return [p*360/16384 for p in self._get_state().phases]
 
     @property
     def runs_on_ext_clock_source(self) -> Union[bool, None]:
@@ -296,6 +331,26 @@ class Dds9Control:
         """Returns a copy of the general setup parameters."""
         return copy.deepcopy(self._settings)
 
+    def verify(self) -> bool:
+        """Query the device state and compare it to what we expect.
+
+        Our copy of the device state is replaced by the queried one in any
+        case.
+
+        :returns: Device state matches the settings sent.
+        :raises ConnectionError: The connection just broke or is broken.
+        """
+        expected = self._state
+        self._update_state()
+        if expected is None:
+            return False
+        # Allow for rounding of the last digit.
+        return all(
+            all(abs(a - b) <= 1 for a, b in zip(mine, theirs))
+            for mine, theirs in ((expected.freqs, self._state.freqs),
+                                 (expected.phases, self._state.phases),
+                                 (expected.ampls, self._state.ampls)))
+
     def ping(self) -> bool:
         """Device is accessible and in non-zero state."""
         try:
@@ -419,6 +474,7 @@ class Dds9Control:
         :raises ConnectionError: The connection just broke or is broken.
         """
         self._send_command('R')
+        self._ref_clock = ''  # Whatever it was, it's the saved one now.
 
         # If we don't let DDS9 rest after a reset, it gives all garbled values.
         time.sleep(0.5)
@@ -439,15 +495,44 @@ class Dds9Control:
         :raises ConnectionError: The connection just broke or is broken.
         """
         self._send_command('CLR')
+        self._state_time = None
         time.sleep(2)  # Allow some generous 2 secs to recover.
 
     # private methods
 
+    def _get_state(self) -> Dds9Setting:
+        """The device state, queried only if our copy is outdated."""
+        if (self._state_time is None
+                or time.monotonic() - self._state_time > STATE_MAX_AGE):
+            self._update_state()
+        return self._state
+
+    def _set_register(self, command: str, channel: int, encoded_value: str,
+                      register_value: int) -> None:
+        """Send a setter command and update our copy of the device state.
+
+        :param command: 'F', 'V' or 'P' for frequency, amplitude or phase.
+        :param encoded_value: As sent to the device.
+        :param register_value: As the device will report it when queried.
+        """
+        response = self._send_command(
+            command + str(channel) + ' ' + encoded_value)
+        if '?' in response or self._state is None:
+            # The device refused, or we don't know what else it holds.
+            LOGGER.debug("Command %s%s not confirmed. Will query state.",
+                         command, channel)
+            self._state_time = None
+            return
+        registers = {'F': self._state.freqs, 'V': self._state.ampls,
+                     'P': self._state.phases}[command]
+        registers[channel] = register_value
+
     def _update_state(self) -> None:
         """Queries the device for its internal state and updates _state."""
         response = self._send_command('QUE')
         state = self._parse_query_result(response)
         self._state = state
+        self._state_time = time.monotonic()
         if state.is_zero():
             LOGGER.warning("Device was in zero state.")
             return
@@ -457,11 +542,18 @@ class Dds9Control:
         # Prepare a command string and send it to the device.
 
         def read_response() -> str:
-            """Gets response from device through serial connection."""
-
-            # recommended way of reading response, as of pySerial developer
-            data = self._conn.read(1)
-            data += self._conn.read(self._conn.inWaiting())
+            """Gets response from device through serial connection.
+
+            Longer responses arrive in several pieces.  Read until the
+            terminating "OK" or "?n" line came in or the port timed out.
+            """
+            data = b''
+            while not _is_complete(data):
+                # recommended way of reading response, as of pySerial developer
+                byte = self._conn.read(1)
+                if not byte:  # timed out
+                    break
+                data += byte + self._conn.read(self._conn.inWaiting())
             self._conn.reset_output_buffer()
 
             # decode byte string to Unicode
@@ -543,7 +635,11 @@ class Dds9Control:
         # Data was grouped into channels before, now we sort by physical
         # quantity first and then by channel:
         params = list(zip(*channels))  # transpose
-        frequencies = [int(f, 16) for f in params[0]]
-        phases = [int(f, 16) for f in params[1]]
-        amplitudes = [int(f, 16) for f in params[2]]
+        try:
+            frequencies = [int(f, 16) for f in params[0]]
+            phases = [int(f, 16) for f in params[1]]
+            amplitudes = [int(f, 16) for f in params[2]]
+        except (IndexError, ValueError):  # Garbled response.
+            LOGGER.debug("Invalid values in QUE response: %s", relevant_lines)
+            return Dds9Setting([0] * 4, [0] * 4, [0] * 4)
         return Dds9Setting(frequencies, phases, amplitudes)
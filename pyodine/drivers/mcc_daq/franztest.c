@@ -36,6 +36,7 @@ int main() {
       19.99,
       .2,
       n_samples,
+      1,
       channels,
       gains,
       n_channels,
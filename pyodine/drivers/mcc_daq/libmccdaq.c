@@ -15,37 +15,135 @@ static const uint16_t kMaxAmplitude = 65535;  // 2^16-1
 
 static libusb_device_handle *dev = NULL;
 
+// Scans are usually repeated with identical parameters, e.g. during doppler
+// search.  Thus the generated output waveforms are kept for reuse.
+#define kWaveformCacheSize 4
+typedef struct Waveform {
+  SignalType type;
+  double amplitude;
+  double offset;
+  uint n_samples;
+  uint16_t samples[LIBMCCDAQ_BULK_TRANSFER_SIZE / 2];
+} Waveform;
+static Waveform waveform_cache[kWaveformCacheSize];
+static uint n_generated_waveforms = 0;  // Oldest entry gets replaced.
+
+// State of back-to-back scans, see StartScans().  `waveform` is NULL if
+// there are none running.
+static struct {
+  const uint16_t *waveform;
+  uint n_samples;
+  uint oversampling;
+  uint n_chan;
+  double duration;
+} scans = {NULL, 0, 1, 0, 0.};
+
 // For documentation of methods see libmccdaq.h.
 
+// Get the requested waveform from cache or generate it.
+static const uint16_t *GetWaveform(const SignalType type, const uint n_samples,
+                                   const double amplitude, const double offset,
+                                   Error *error) {
+  uint n_cached = n_generated_waveforms < kWaveformCacheSize
+                  ? n_generated_waveforms : kWaveformCacheSize;
+  for (uint i = 0; i < n_cached; i++) {
+    Waveform *cached = &waveform_cache[i];
+    if (cached->type == type && cached->n_samples == n_samples
+        && cached->amplitude == amplitude && cached->offset == offset) {
+      *error = kSuccess;
+      return cached->samples;
+    }
+  }
+  if (n_samples > LIBMCCDAQ_BULK_TRANSFER_SIZE / 2) {
+    puts("Won't generate more samples than the DAQ can take");
+    *error = kValueError;
+    return NULL;
+  }
+  Waveform *entry = &waveform_cache[n_generated_waveforms % kWaveformCacheSize];
+  *error = GenerateSignal(type, n_samples, 100, amplitude, offset,
+                          entry->samples);
+  if (*error != kSuccess) {
+    return NULL;
+  }
+  entry->type = type;
+  entry->n_samples = n_samples;
+  entry->amplitude = amplitude;
+  entry->offset = offset;
+  n_generated_waveforms++;
+  return entry->samples;
+}
+
+// Average every `factor` consecutive scans of `n_chan` channels in
+// `readings`.  The `n_samples` results are stored at the start of
+// `readings`, which needs to hold n_samples * factor scans.
+static void BlockAverage(uint16_t *readings, const uint n_samples,
+                         const uint n_chan, const uint factor) {
+  if (factor <= 1) {
+    return;
+  }
+  // Results are never stored behind the values still to be read.
+  for (uint i = 0; i < n_samples; i++) {
+    for (uint c = 0; c < n_chan; c++) {
+      uint32_t sum = 0;
+      for (uint k = 0; k < factor; k++) {
+        sum += readings[(i * factor + k) * n_chan + c];
+      }
+      readings[i * n_chan + c] = (uint16_t) ((sum + factor / 2) / factor);
+    }
+  }
+}
+
+// Append `samples` to the analog output FIFO.
+static Error TransferWaveform(const uint16_t *samples, const uint n_samples) {
+  // The samples for the 16-bit output stage are 2-byte unsigned integers. As
+  // the USB transfer only accepts single bytes ("char"), we send double the
+  // amount of bytes as we have samples.
+  int n_transferred_bytes;
+  int ret = libusb_bulk_transfer(dev, LIBUSB_ENDPOINT_OUT|2,
+      (unsigned char *) samples, 2 * (int) n_samples,
+      &n_transferred_bytes, kUsbTimeout);
+  if (2 * (int) n_samples != n_transferred_bytes || ret != 0) {
+    puts("Error transferring data to device.");
+    return kConnectionError;
+  }
+  return kSuccess;
+}
+
 Error FetchScan(
     const double offset,
     const double amplitude,
     const double duration,
     const uint n_samples,
+    const uint oversampling,
     const uint8_t * channels,
     const uint8_t * gains,
     const uint n_chan,
     const SignalType type,
     uint16_t *readings) {
   const double sample_rate = n_samples / duration;
+  scans.waveform = NULL;  // Output is going to be replaced.
+  if (oversampling < 1) {
+    puts("Oversampling factor must be at least 1.");
+    return kValueError;
+  }
 
-  // Generate a signal and send it to the device.
-
-  uint16_t *signal = calloc(n_samples, sizeof(uint16_t)); 
-  Error ret = GenerateSignal(type, n_samples, 100, amplitude, offset, signal);
+  // Generate a signal (or reuse it) and send it to the device.
+  Error ret;
+  const uint16_t *signal = GetWaveform(type, n_samples, amplitude, offset, &ret);
   if (ret != 0) {
     puts("Error generating signal.");
     return ret;
   }
   ret = OutputSignal(signal, n_samples, sample_rate);
-  free(signal);
   if (ret != 0) {
     puts("Error sending signal.");
     return ret;
   }
 
   // Output is running. Now start reading ASAP.
-  ret = SampleChannels(n_samples, sample_rate, channels, gains, n_chan, readings); 
+  ret = SampleChannels(n_samples * oversampling, sample_rate * oversampling,
+                       channels, gains, n_chan, readings);
+  BlockAverage(readings, n_samples, n_chan, oversampling);
   return ret;
 }
 
@@ -139,7 +237,34 @@ Error OpenConnection(void) {
   }
 }
 
-Error OutputSignal(uint16_t *samples, uint n_samples, double sample_rate) {
+Error NextScan(uint16_t *readings) {
+  if (scans.waveform == NULL) {
+    puts("There are no back-to-back scans running.");
+    return kValueError;
+  }
+
+  // Queue the following period before reading the current one, so that the
+  // output never runs dry.
+  Error ret = TransferWaveform(scans.waveform, scans.n_samples);
+  if (ret != kSuccess) {
+    scans.waveform = NULL;
+    return ret;
+  }
+  uint n_scans = scans.n_samples * scans.oversampling;
+  uint timeout = (uint) (2000 * scans.duration) + kUsbTimeout;
+  int n_read = usbAInScanRead_USB1608G(dev, (int) n_scans, (int) scans.n_chan,
+                                       readings, timeout, CONTINUOUS);
+  if (n_read != (int) (sizeof(uint16_t) * scans.n_chan * n_scans)) {
+    fprintf(stderr, "Error (NextScan): Number bytes read = %d  (should be %d)\n",
+            n_read, 2 * scans.n_chan * n_scans);
+    scans.waveform = NULL;
+    return kConnectionError;
+  }
+  BlockAverage(readings, scans.n_samples, scans.n_chan, scans.oversampling);
+  return kSuccess;
+}
+
+Error OutputSignal(const uint16_t *samples, uint n_samples, double sample_rate) {
   if (2 * n_samples > LIBMCCDAQ_BULK_TRANSFER_SIZE) {
     puts("Too much data to send it at once.");
     return kValueError; 
@@ -159,17 +284,9 @@ Error OutputSignal(uint16_t *samples, uint n_samples, double sample_rate) {
   // single period of data in it. This usually buys us enougth time to start
   // filling up the FIFO after the scan started.
   usbAOutScanClearFIFO_USB1608GX_2AO(dev);
-
-  // The samples for the 16-bit output stage are 2-byte unsigned integers. As
-  // the USB transfer only accepts single bytes ("char"), we send double the
-  // amount of bytes as we have samples.
-  int n_transferred_bytes;
-  int ret = libusb_bulk_transfer(dev, LIBUSB_ENDPOINT_OUT|2,
-      (unsigned char *) samples, 2 * (int) n_samples,
-      &n_transferred_bytes, kUsbTimeout);
-  if (2 * (int) n_samples != n_transferred_bytes || ret != 0) {
-    puts("Error transferring data to device.");
-    return kConnectionError;
+  Error ret = TransferWaveform(samples, n_samples);
+  if (ret != kSuccess) {
+    return ret;
   }
   usbAOutScanStart_USB1608GX_2AO(dev,
       // total # of samples to produce before stopping scan automatically
@@ -194,19 +311,10 @@ int Ping() {
   return 1;
 }
 
-Error SampleChannels(
-    const uint n_samples,
-    const double frequency,
-    const uint8_t *channels,
-    const uint8_t gains[],
-    const uint n_channels,
-    uint16_t * results) {
-
-  usbAInScanStop_USB1608G(dev);
-  usbAInScanClearFIFO_USB1608G(dev);
-
-  // Create a channel configuration for the analog input scan and save it to the
-  // device.
+// Save the analog input channel configuration to the device.  There must not
+// be an input scan running.
+static void ConfigureInputs(const uint8_t *channels, const uint8_t gains[],
+                            const uint n_channels) {
   ScanList list[n_channels];
   // As gain settings are defined as hex values in usb-1608G.h, we need this
   // bulky translator here:
@@ -229,12 +337,44 @@ Error SampleChannels(
   }
   list[n_channels-1].mode |= LAST_CHANNEL;
   usbAInConfig_USB1608G(dev, list);
+}
+
+Error ReadStream(
+    const uint n_samples,
+    const uint n_channels,
+    uint16_t *readings,
+    const uint timeout) {
+  int ret = usbAInScanRead_USB1608G(dev, (int) n_samples, (int) n_channels,
+                                    readings, timeout, CONTINUOUS);
+  if (ret != (int) (sizeof(uint16_t) * n_channels * n_samples)) {
+    fprintf(stderr, "Error (ReadStream): Number bytes read = %d  (should be %d)\n",
+            ret, 2 * n_channels * n_samples);
+    return kConnectionError;
+  }
+  return kSuccess;
+}
+
+Error SampleChannels(
+    const uint n_samples,
+    const double frequency,
+    const uint8_t *channels,
+    const uint8_t gains[],
+    const uint n_channels,
+    uint16_t * results) {
+
+  scans.waveform = NULL;  // Input is going to be reconfigured.
+  usbAInScanStop_USB1608G(dev);
+  usbAInScanClearFIFO_USB1608G(dev);
+
+  // Create a channel configuration for the analog input scan and save it to the
+  // device.
+  ConfigureInputs(channels, gains, n_channels);
 
-  // Receive data from the device.
+  // Receive data from the device.  The raw readings are exactly what we
+  // return, so they are read into the caller's buffer directly.
   usbAInScanStart_USB1608G(dev, n_samples, 0, frequency, 0x0);
-  uint16_t *rcv_data = calloc(n_channels*n_samples, 2);
   int ret = usbAInScanRead_USB1608G(dev, (int) n_samples, (int) n_channels,
-                                    rcv_data, 20000, 0);
+                                    results, 20000, 0);
 
   // Return error if USB connection failed.
   if (ret != (int) (sizeof(uint16_t) * n_channels * n_samples)) {
@@ -243,15 +383,94 @@ Error SampleChannels(
             ret,
             2 * n_channels * n_samples);
   }
+  return kSuccess;
+}
 
-  // Convert to voltages and return them.
-  for (uint i = 0; i < n_channels * n_samples; i++) {
-    results[i] = rcv_data[i];
+Error StartScans(
+    const double offset,
+    const double amplitude,
+    const double duration,
+    const uint n_samples,
+    const uint oversampling,
+    const uint8_t * channels,
+    const uint8_t * gains,
+    const uint n_chan,
+    const SignalType type) {
+  scans.waveform = NULL;
+  if (!(duration > 0.)) {
+    puts("Provide scan duration in seconds.");
+    return kValueError;
+  }
+  if (oversampling < 1) {
+    puts("Oversampling factor must be at least 1.");
+    return kValueError;
   }
-  free(rcv_data);
+  Error ret;
+  const uint16_t *waveform = GetWaveform(type, n_samples, amplitude, offset,
+                                         &ret);
+  if (ret != kSuccess) {
+    puts("Error generating signal.");
+    return ret;
+  }
+  const double sample_rate = n_samples / duration;
+
+  // Prime the output FIFO with the first period.  NextScan() adds the
+  // following ones.
+  usbAOutScanStop_USB1608GX_2AO(dev);
+  usbAOutScanClearFIFO_USB1608GX_2AO(dev);
+  ret = TransferWaveform(waveform, n_samples);
+  if (ret != kSuccess) {
+    return ret;
+  }
+  usbAInScanStop_USB1608G(dev);
+  usbAInScanClearFIFO_USB1608G(dev);
+  ConfigureInputs(channels, gains, n_chan);
+
+  // Both scans run until stopped explicitly.  As their clock rates are
+  // multiples of each other, every output period corresponds to
+  // `n_samples * oversampling` input scans.
+  usbAOutScanStart_USB1608GX_2AO(dev, 0, 0, sample_rate, AO_CHAN0);
+  usbAInScanStart_USB1608G(dev, 0, 0, sample_rate * oversampling, CONTINUOUS);
+  scans.waveform = waveform;
+  scans.n_samples = n_samples;
+  scans.oversampling = oversampling;
+  scans.n_chan = n_chan;
+  scans.duration = duration;
   return kSuccess;
 }
 
+void StopScans(void) {
+  scans.waveform = NULL;
+  usbAOutScanStop_USB1608GX_2AO(dev);
+  usbAOutScanClearFIFO_USB1608GX_2AO(dev);
+  usbAInScanStop_USB1608G(dev);
+  usbAInScanClearFIFO_USB1608G(dev);
+}
+
+Error StartStream(
+    const double frequency,
+    const uint8_t *channels,
+    const uint8_t gains[],
+    const uint n_channels) {
+  if (!(frequency > 0.)) {
+    puts("Provide sample rate in Hz.");
+    return kValueError;
+  }
+  scans.waveform = NULL;
+  usbAInScanStop_USB1608G(dev);
+  usbAInScanClearFIFO_USB1608G(dev);
+  ConfigureInputs(channels, gains, n_channels);
+
+  // A count of zero makes the scan run until it is stopped explicitly.
+  usbAInScanStart_USB1608G(dev, 0, 0, frequency, CONTINUOUS);
+  return kSuccess;
+}
+
+void StopStream(void) {
+  usbAInScanStop_USB1608G(dev);
+  usbAInScanClearFIFO_USB1608G(dev);
+}
+
 int Sleep(const uint n_seconds) {
   sleep(n_seconds);
   return 0;
@@ -22,12 +22,18 @@ typedef enum Error {
     kOSError = 5              // error loading a library or using a system call
 } Error;
 
-// Generate a signal and read input channels while it is produced.
+// Generate a signal and read input channels while it is produced.  Generated
+// signals are cached, so repeating a scan doesn't generate it anew.
+//
+// The inputs are read `oversampling` times as often as the output is set.
+// Those readings are averaged, so `readings` receives `n_samples` scans.  It
+// needs to hold n_samples * oversampling * n_chan values though.
 Error FetchScan(
     const double offset,
     const double amplitude,
     const double duration,
     const uint n_samples,
+    const uint oversampling,
     const uint8_t * channels,
     const uint8_t * gains,
     const uint n_chan,
@@ -50,10 +56,16 @@ void GenerateTriangleSignal(uint length, double min_volts, double max_volts,
 Error IntegerSlope(uint16_t start, uint16_t stop, uint n_samples,
                    uint16_t *samples);
 
+// Read the inputs during the next period of back-to-back scans started by
+// StartScans().  Blocks until the period is over.  `readings` must hold
+// n_samples * oversampling * n_chan values, see FetchScan().  Call this before the previous period ended, or
+// the output runs dry and the scans need to be restarted.
+Error NextScan(uint16_t *readings);
+
 Error OpenConnection(void);
 
 // Generate an actual signal at the device output port.
-Error OutputSignal(uint16_t *samples, uint n_samples, double sample_rate);
+Error OutputSignal(const uint16_t *samples, uint n_samples, double sample_rate);
 
 // 0: The DAQ connection is alive and DAQ seems healthy
 // 1: Something is wrong. Reset is advised.
@@ -62,6 +74,14 @@ Error OutputSignal(uint16_t *samples, uint n_samples, double sample_rate);
 // CAUTION: This obviously needs to be changed when using a different unit.
 int Ping(void);
 
+// Read the next `n_samples` scans of a stream started by StartStream() into
+// `readings`.  Blocks until they are available or `timeout` ms passed.
+Error ReadStream(
+    const uint n_samples,
+    const uint n_channels,
+    uint16_t *readings,
+    const uint timeout);
+
 // Sample one or more analog outputs for the given number of samples at the
 // given frequency.
 Error SampleChannels(
@@ -75,6 +95,36 @@ Error SampleChannels(
 // Sleep `n_seconds` seconds. For debugging of locking behaviour.
 int Sleep(const uint n_seconds);
 
+// Like FetchScan(), but keep repeating the output signal and reading the
+// inputs until StopScans() is called.  Fetch the readings of every period
+// using NextScan().  Any other analog input or output operation ends the
+// scans.
+Error StartScans(
+    const double offset,
+    const double amplitude,
+    const double duration,
+    const uint n_samples,
+    const uint oversampling,
+    const uint8_t * channels,
+    const uint8_t * gains,
+    const uint n_chan,
+    const SignalType type);
+
+// Start a continuous analog input scan.  Read the data using ReadStream() fast
+// enough to not overrun the device's FIFO.  Any other analog input operation
+// ends the stream.
+Error StartStream(
+    const double frequency,
+    const uint8_t *channels,
+    const uint8_t gains[],
+    const uint n_channels);
+
+// End back-to-back scans started by StartScans().
+void StopScans(void);
+
+// End a stream started by StartStream().
+void StopStream(void);
+
 // Generate continuous triangle signal using full 20 volt range.
 void Triangle(void);
 
@@ -1,18 +1,44 @@
 """A python wrapper for the MCC linux driver."""
 
+import asyncio
 import ctypes as ct
 from enum import IntEnum
 import logging
 import threading
-from typing import List, Tuple
+import time as timing
+from typing import Dict, List, NamedTuple, Tuple, Union  # pylint: disable=unused-import
 
 import numpy as np
 
 from .. import constants as cs
 
-MAX_AOUT_SAMPLES = 2560
+MAX_AOUT_SAMPLES = cs.DAQ_MAX_AOUT_SAMPLES
+MIN_AOUT_SAMPLES = 200
+"""Ramps start after a prefix of 100 samples, which must not dominate."""
+PLAN_CACHE_SIZE = 32
+"""Keep ~ acquisition plans for channel lists passed to ``MccDaq``."""
 LOGGER = logging.getLogger('pyodine.drivers.mccdaq')
 
+_U8_P = ct.POINTER(ct.c_uint8)
+_U16_P = ct.POINTER(ct.c_uint16)
+SIGNATURES = {
+    'FetchScan': ([ct.c_double, ct.c_double, ct.c_double, ct.c_uint, ct.c_uint,
+                   _U8_P, _U8_P, ct.c_uint, ct.c_int, _U16_P], ct.c_int),
+    'NextScan': ([_U16_P], ct.c_int),
+    'OpenConnection': ([], ct.c_int),
+    'Ping': ([], ct.c_int),
+    'ReadStream': ([ct.c_uint, ct.c_uint, _U16_P, ct.c_uint], ct.c_int),
+    'SampleChannels': ([ct.c_uint, ct.c_double, _U8_P, _U8_P, ct.c_uint,
+                        _U16_P], ct.c_int),
+    'StartScans': ([ct.c_double, ct.c_double, ct.c_double, ct.c_uint, ct.c_uint,
+                    _U8_P, _U8_P, ct.c_uint, ct.c_int], ct.c_int),
+    'StartStream': ([ct.c_double, _U8_P, _U8_P, ct.c_uint], ct.c_int),
+    'StopScans': ([], None),
+    'StopStream': ([], None)}
+"""Argument and return types of the libmccdaq functions we use.  Declaring them
+lets ctypes convert plain python numbers without further ado.
+"""
+
 class DaqChannel(IntEnum):
     """The DAQ features 16 analog input channels in single-ended mode."""
     C_0 = 0
@@ -46,6 +72,214 @@ class InputRange(IntEnum):
     PM_10V = 10  # +/- 10 volt (= 20V max. amplitude)
 
 
+StreamBlock = NamedTuple('StreamBlock', [('seq', int),
+                                         ('time', float),
+                                         ('data', np.ndarray)])
+"""A block of consecutive samples from an ``AcquisitionStream``.
+
+``data`` is a view into the stream's ring buffer of shape (samples, channels).
+``time`` is when the last sample was received.
+"""
+
+
+class AcquisitionPlan:
+    """Channels and an output buffer, prepared for being passed to libmccdaq
+    over and over.
+
+    Pass this to ``MccDaq.sample_channels()`` or ``MccDaq.fetch_scan()``
+    instead of a list of channels, to skip validating and converting the list
+    on every call.
+
+    .. CAUTION::
+        Acquisitions using a plan return views into its ``readings`` buffer,
+        which will be overwritten by the next acquisition using that plan.
+    """
+
+    def __init__(self, channels: List[Tuple[DaqChannel, InputRange]],
+                 n_samples: int = 1, oversampling: int = 1) -> None:
+        """
+        :param n_samples: Number of samples to acquire per channel.
+        :param oversampling: Only used for scans, see ``MccDaq.fetch_scan()``.
+        :raises ValueError: Invalid channel, gain or number of samples.
+        """
+        if not n_samples >= 1 or not oversampling >= 1:
+            raise ValueError("Need to acquire at least one sample.")
+        self.channels = [(DaqChannel(c), InputRange(g)) for c, g in channels]
+        if not self.channels:
+            raise ValueError("No channels given.")
+        self.n_samples = n_samples
+        self.oversampling = oversampling
+        self.readings = np.empty([n_samples * oversampling, len(self.channels)],
+                                 dtype=np.uint16)
+        """Output buffer.  Holds the raw readings before averaging."""
+
+        # CAUTION: The pointers below don't keep the arrays alive.  Python
+        # would free their memory and the C library would write to wherever.
+        self._chan = np.array([c[0] for c in self.channels], dtype='uint8')
+        self._gain = np.array([c[1] for c in self.channels], dtype='uint8')
+        self.chan_p = self._chan.ctypes.data_as(_U8_P)
+        self.gain_p = self._gain.ctypes.data_as(_U8_P)
+        self.readings_p = self.readings.ctypes.data_as(_U16_P)
+
+    @property
+    def result(self) -> np.ndarray:
+        """The (averaged) readings of the last acquisition."""
+        return self.readings[:self.n_samples]
+
+    def matches(self, n_samples: int, oversampling: int = 1) -> bool:
+        return n_samples == self.n_samples and oversampling == self.oversampling
+
+
+class AcquisitionStream:
+    """Keep an analog input scan running and collect its data in the background.
+
+    A dedicated thread reads fixed-size blocks of samples into a ring of
+    preallocated blocks.  Completed blocks are handed to asyncio consumers (see
+    ``subscribe()``) and the most recent samples are available through
+    ``latest()`` without touching the device.
+
+    Don't create this directly, use ``MccDaq.start_stream()``.
+    """
+
+    def __init__(self, daq: 'MccDaq',
+                 channels: List[Tuple[DaqChannel, InputRange]],
+                 frequency: float, block_size: int, n_blocks: int) -> None:
+        if not frequency > 0:
+            raise ValueError("Frequency {} not in ]0, inf[.".format(frequency))
+        if not n_blocks >= 3:
+            raise ValueError("Need at least three blocks for the ring buffer.")
+        self.channels = list(channels)
+        self.frequency = frequency
+        self.n_dropped = 0
+        """Blocks a subscriber didn't pick up in time."""
+        self.n_errors = 0
+        """Failed reads from the device."""
+        self._daq = daq
+        self._ring = np.empty([n_blocks, block_size, len(self.channels)],
+                              dtype=np.uint16)
+        self._n_done = 0  # Number of completed blocks.
+        self._subscribers = []  # type: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='MccDaqStream',
+                                        daemon=True)
+
+        self._plan = AcquisitionPlan(self.channels)
+        self._slots = [self._ring[i].ctypes.data_as(_U16_P)
+                       for i in range(n_blocks)]
+
+    @property
+    def block_size(self) -> int:
+        return self._ring.shape[1]
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def covers(self, channels: List[Tuple[DaqChannel, InputRange]]) -> bool:
+        """Are all of the given channels sampled with the given gains?"""
+        return all(tuple(c) in self.channels for c in channels)
+
+    def subscribe(self, maxsize: int = None) -> asyncio.Queue:
+        """Get all blocks completed from now on through the returned queue.
+
+        Needs to be called from a running asyncio loop.  If the queue is full,
+        its oldest block is dropped.  As blocks are views into the ring buffer,
+        consumers need to process or copy them in time, see ``is_current()``.
+
+        :param maxsize: Defaults to a bit less than the ring size.
+        """
+        queue = asyncio.Queue(maxsize=(len(self._ring) - 2 if maxsize is None
+                                       else maxsize))  # type: asyncio.Queue
+        self._subscribers.append((asyncio.get_event_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers = [s for s in self._subscribers if s[1] is not queue]
+
+    def is_current(self, block: StreamBlock) -> bool:
+        """Is ``block.data`` still intact, or was it overwritten already?"""
+        return block.seq > self._n_done - len(self._ring)
+
+    def latest(self, n_samples: int = 1,
+               channels: List[Tuple[DaqChannel, InputRange]] = None) -> np.ndarray:
+        """The most recent samples, oldest first.
+
+        :param channels: Which of the stream's channels to return.  Defaults to
+                    all of them.
+        :returns: A copy of shape (n_samples, channels).
+        :raises BlockingIOError: Not enough data acquired yet.
+        :raises ValueError: Requested more than the ring holds.
+        """
+        n_blocks = -(-n_samples // self.block_size)
+        # Keep clear of the block being written and the one after it.
+        if n_blocks > len(self._ring) - 2:
+            raise ValueError("Stream only holds {} samples.".format(
+                (len(self._ring) - 2) * self.block_size))
+        n_done = self._n_done
+        if n_done * self.block_size < n_samples:
+            raise BlockingIOError("Stream didn't acquire enough data yet.")
+        columns = (slice(None) if channels is None
+                   else [self.channels.index(tuple(c)) for c in channels])
+        slots = [i % len(self._ring)
+                 for i in range(max(0, n_done - n_blocks), n_done)]
+        return np.concatenate(self._ring[slots][:, :, columns])[-n_samples:]
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the acquisition thread and wait for it to finish."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def restart_scan(self) -> None:
+        """(Re-)start the device's input scan.  Caller must hold the DAQ lock.
+
+        :raises ConnectionError: Couldn't start the scan.
+        """
+        ret = self._daq._daq.StartStream(  # pylint: disable=protected-access
+            self.frequency, self._plan.chan_p, self._plan.gain_p,
+            len(self.channels))
+        if ret != 0:
+            raise ConnectionError("Failed to start stream. `StartStream()` "
+                                  "returned {}".format(ret))
+
+    def _run(self) -> None:
+        timeout = int(2000 * self.block_size / self.frequency) + 1000
+        while not self._stop.is_set():
+            index = self._n_done % len(self._ring)
+            with self._daq._lock:  # pylint: disable=protected-access
+                ret = self._daq._daq.ReadStream(  # pylint: disable=protected-access
+                    self.block_size, len(self.channels), self._slots[index],
+                    timeout)
+                if ret != 0 and not self._stop.is_set():
+                    # Most likely the FIFO overran.  Start over.
+                    self.n_errors += 1
+                    LOGGER.warning("Reading DAQ stream failed. Restarting.")
+                    try:
+                        self.restart_scan()
+                    except ConnectionError:
+                        LOGGER.error("Couldn't restart DAQ stream.")
+                        LOGGER.debug("Reason:", exc_info=True)
+            if ret != 0:
+                self._stop.wait(timeout / 1000)
+                continue
+            block = StreamBlock(self._n_done, timing.time(), self._ring[index])
+            self._n_done += 1
+            for loop, queue in self._subscribers:
+                try:
+                    loop.call_soon_threadsafe(self._deliver, queue, block)
+                except RuntimeError:  # The loop was closed.
+                    self.unsubscribe(queue)
+
+    def _deliver(self, queue: asyncio.Queue, block: StreamBlock) -> None:
+        if queue.full():
+            queue.get_nowait()
+            self.n_dropped += 1
+        queue.put_nowait(block)
+
+
 class MccDaq:
     """A stateful wrapper around the MCC DAQ device."""
 
@@ -71,6 +305,10 @@ class MccDaq:
         -1 means wait forever.
         """
         self._daq = ct.CDLL('pyodine/drivers/mcc_daq/libmccdaq.so')
+        for name, (argtypes, restype) in SIGNATURES.items():
+            function = getattr(self._daq, name)
+            function.argtypes = argtypes
+            function.restype = restype
         state = self._daq.OpenConnection()
         if state == 1:  # 'kConnectionError in error types enum in C'
             raise ConnectionError("Couldn't connect to DAQ.")
@@ -84,6 +322,12 @@ class MccDaq:
         # lock for the device.
         self._lock = threading.Lock()
 
+        self._stream = None  # type: AcquisitionStream
+        self._scans = None  # type: tuple
+        """Parameters of the running back-to-back scans, if any."""
+        self._scans_due = 0.  # Next back-to-back scan must start before.
+        self._plans = {}  # type: Dict[tuple, AcquisitionPlan]
+
     @property
     def ramp_offset(self) -> float:
         return self._offset
@@ -111,9 +355,63 @@ class MccDaq:
             return False
         return True
 
+    @property
+    def stream(self) -> AcquisitionStream:
+        """The running acquisition stream, if any."""
+        return self._stream
+
+    def start_stream(self, channels: List[Tuple[DaqChannel, InputRange]],
+                     frequency: float = cs.DAQ_STREAM_FREQUENCY,
+                     block_size: int = cs.DAQ_STREAM_BLOCK_SIZE,
+                     n_blocks: int = cs.DAQ_STREAM_N_BLOCKS) -> AcquisitionStream:
+        """Continuously sample ``channels`` in the background.
+
+        While the stream is running, ``sample_channels()`` is served from it for
+        the channels it covers.  Other analog input operations interrupt the
+        stream and restart it afterwards.  Any running stream is replaced.
+
+        :param block_size: Samples per block delivered to subscribers.
+        :param n_blocks: Size of the ring buffer in blocks.
+        :raises BlockingIOError: The DAQ is currently busy.
+        :raises ConnectionError: Couldn't start the scan.
+        """
+        self.stop_stream()
+        self._scans = None
+        stream = AcquisitionStream(self, channels, frequency, block_size, n_blocks)
+        if self.is_too_busy:
+            raise BlockingIOError("DAQ is too busy to start a stream.")
+        with self._lock:
+            stream.restart_scan()
+        stream.start()
+        self._stream = stream
+        return stream
+
+    def prepare(self, channels: List[Tuple[DaqChannel, InputRange]],
+                n_samples: int = 1, oversampling: int = 1) -> AcquisitionPlan:
+        """Validate and convert an acquisition for repeated use.
+
+        See ``AcquisitionPlan``.
+
+        :raises ValueError: Invalid channel, gain or number of samples.
+        """
+        return AcquisitionPlan(channels, n_samples, oversampling)
+
+    def stop_stream(self) -> None:
+        """Stop the acquisition stream, if there is one."""
+        if self._stream is None:
+            return
+        stream, self._stream = self._stream, None
+        stream.stop()
+        with self._lock:
+            self._daq.StopStream()
+
     def fetch_scan(self, amplitude: float, time: float,
-                   channels: List[Tuple[DaqChannel, InputRange]],
-                   shape: RampShape = RampShape.DESCENT) -> np.ndarray:
+                   channels: Union[List[Tuple[DaqChannel, InputRange]],
+                                   AcquisitionPlan],
+                   shape: RampShape = RampShape.DESCENT,
+                   back_to_back: bool = False,
+                   n_samples: int = MAX_AOUT_SAMPLES,
+                   oversampling: int = 1) -> np.ndarray:
         """Scan the output voltage once and read the inputs during that time.
 
         The ramp will center around the current `offset` voltage, thus only an
@@ -121,84 +419,89 @@ class MccDaq:
 
         :param amplitude: Peak-peak amplitude of the generated ramp.
         :param time: Approx time it takes from ramp maximum to ramp minimum.
-        :param channels: Which output channels to log during sweep?
+        :param channels: Which output channels to log during sweep?  Pass an
+                    ``AcquisitionPlan`` to save the conversion.  The result
+                    is a view into its buffer then.
+        :param back_to_back: Keep the ramp running after this scan.  If the
+                    next scan uses the same parameters and is requested in
+                    time, it is read from the running ramp without any setup.
+                    Call `stop_scans()` when done, as the output keeps ramping
+                    for another period otherwise.  Ignored while streaming.
+        :param n_samples: Number of ramp steps and thus rows returned.
+        :param oversampling: Read the inputs ~ times per ramp step and
+                    return the average.
         :returns: A two-dimensional array of values read. Those are raw uint16,
                     as received from the device's 16-bit ADC chip.
         :raises BlockingIOError: The DAQ is currently busy.
+        :raises ValueError: Invalid parameters or plan not matching them.
         """
-        # TODO:
-        # - Try reading at higher sample rate than writing
-        # - Validate `channels`
-        if not amplitude <= cs.DAQ_MAX_SCAN_AMPLITUDE or not amplitude > 0:
-            raise ValueError("Passed amplitude {} not in ]0, {}].".format(
-                amplitude, cs.DAQ_MAX_SCAN_AMPLITUDE))
-        if not time > 0:
-            raise ValueError("Passed time {} not in ]0, inf[.".format(time))
-        if not isinstance(shape, RampShape):
-            raise TypeError("Invalid ramp shape passed. Use provided enum.")
+        plan = self._get_plan(channels, n_samples, oversampling)
+        self._validate_scan(amplitude, time, shape, n_samples, oversampling,
+                            len(plan.channels))
         if self.is_too_busy:
             raise BlockingIOError("DAQ is too busy to fetch a scan.")
-        n_samples = MAX_AOUT_SAMPLES
-
-        # Allocate some memory for the C library to save it's result in.
-        response = np.empty([n_samples, len(channels)], dtype=np.uint16)
 
-        # CAUTION: Beware of the python optimizer/garbage collector!  When
-        # inlining the two variables below, Python clears the memory before
-        # the C library starts to access it, leading to unexpected
-        # behaviour of the C code.
-        chan = np.array([c[0] for c in channels], dtype='uint8')
-        gain = np.array([c[1] for c in channels], dtype='uint8')
         with self._lock:
-            ret = self._daq.FetchScan(
-                ct.c_double(float(self._offset)),
-                ct.c_double(amplitude),
-                ct.c_double(time),
-                ct.c_uint(n_samples),
-                chan.ctypes.data,  # channels; See note above!
-                gain.ctypes.data,  # gains; See note above!
-                ct.c_uint(len(channels)),
-                ct.c_int(int(shape)),
-                response.ctypes.data)
+            if back_to_back and self._stream is None:
+                ret = self._next_scan(amplitude, time, shape, plan)
+            else:
+                self._scans = None
+                ret = self._daq.FetchScan(
+                    self._offset, amplitude, time, n_samples, oversampling,
+                    plan.chan_p, plan.gain_p, len(plan.channels), shape,
+                    plan.readings_p)
+                self._resume_stream()
+            if ret == 0 and plan is not channels:
+                return plan.result.copy()
         if ret != 0:
             raise ConnectionError(
                 "Failed to fetch scan. `FetchScan()` returned {}".format(ret))
-        return response
+        return plan.result
 
-    def sample_channels(self, channels: List[Tuple[DaqChannel, InputRange]],
-                        n_samples: int = 1, frequency: float = 1000) -> np.ndarray:
+    def sample_channels(self, channels: Union[List[Tuple[DaqChannel, InputRange]],
+                                              AcquisitionPlan],
+                        n_samples: int = None, frequency: float = 1000) -> np.ndarray:
         """Sample analog input channels.
 
-        :param channels: Which output channels to log during sweep?
+        :param channels: Which output channels to log during sweep?  Pass an
+                    ``AcquisitionPlan`` to save the conversion.  The result
+                    is a view into its buffer then.
+        :param n_samples: Defaults to the plan's or 1.
         :returns: A two-dimensional array of values read. Those are raw uint16,
                     as received from the device's 16-bit ADC chip.
         :raises BlockingIOError: The device is currently blocked.
         :raises ConnectionError: DAQ's playing tricks...
+        :raises ValueError: Invalid channels or plan not matching `n_samples`.
         """
+        if n_samples is None:
+            n_samples = (channels.n_samples
+                         if isinstance(channels, AcquisitionPlan) else 1)
+        plan = self._get_plan(channels, n_samples)
+        stream = self._stream
+        if stream is not None and stream.covers(plan.channels):
+            return stream.latest(n_samples, plan.channels)
         if self.is_too_busy:
             raise BlockingIOError("DAQ is too busy to sample channels.")
 
-        # Allocate some memory for the C library to save it's result in.
-        response = np.empty([n_samples, len(channels)], dtype=np.uint16)
-
-        # CAUTION: Beware of the python optimizer/garbage collector! When
-        # inlining the two variables below, Python clears the memory before the
-        # C library starts to access it, leading to unexpected behaviour of the
-        # C code.
-        chan = np.array([c[0] for c in channels], dtype='uint8')
-        gain = np.array([c[1] for c in channels], dtype='uint8')
         with self._lock:
+            self._scans = None
             ret = self._daq.SampleChannels(
-                ct.c_uint(n_samples),
-                ct.c_double(frequency),
-                chan.ctypes.data,  # channels; See note above!
-                gain.ctypes.data,  # gains; See note above!
-                ct.c_uint(len(channels)),
-                response.ctypes.data)
+                n_samples, frequency, plan.chan_p, plan.gain_p,
+                len(plan.channels), plan.readings_p)
+            self._resume_stream()
+            if ret == 0 and plan is not channels:
+                return plan.readings.copy()
         if ret != 0:
             raise ConnectionError("Failed to sample channels. "
                                   "`SampleChannels()` returned {}".format(ret))
-        return response
+        return plan.readings
+
+    def stop_scans(self) -> None:
+        """End back-to-back scans, see `fetch_scan()`."""
+        with self._lock:
+            if self._scans is not None:
+                self._daq.StopScans()
+                self._scans = None
 
     def ping(self) -> bool:
         """The DAQ talks to us and seems healthy."""
@@ -208,3 +511,86 @@ class MccDaq:
         except:  # Who knows what it might raise... # pylint: disable=bare-except
             LOGGER.exception("DAQ got sick.")
         return False
+
+    @staticmethod
+    def _validate_scan(amplitude: float, time: float, shape: RampShape,
+                       n_samples: int = MAX_AOUT_SAMPLES, oversampling: int = 1,
+                       n_channels: int = 1) -> None:
+        """Check the arguments passed to `fetch_scan()`.
+
+        :raises ValueError: Amplitude, time, sample count or resulting input
+                    rate out of bounds.
+        :raises TypeError: Invalid ramp shape.
+        """
+        if not amplitude <= cs.DAQ_MAX_SCAN_AMPLITUDE or not amplitude > 0:
+            raise ValueError("Passed amplitude {} not in ]0, {}].".format(
+                amplitude, cs.DAQ_MAX_SCAN_AMPLITUDE))
+        if not time > 0:
+            raise ValueError("Passed time {} not in ]0, inf[.".format(time))
+        if not isinstance(shape, RampShape):
+            raise TypeError("Invalid ramp shape passed. Use provided enum.")
+        if not MIN_AOUT_SAMPLES <= n_samples <= MAX_AOUT_SAMPLES:
+            raise ValueError("Passed sample count {} not in [{}, {}].".format(
+                n_samples, MIN_AOUT_SAMPLES, MAX_AOUT_SAMPLES))
+        if not oversampling >= 1:
+            raise ValueError("Oversampling factor must be at least 1.")
+        if n_samples * oversampling * n_channels / time > cs.DAQ_MAX_INPUT_RATE:
+            raise ValueError("Input rate would exceed {} samples/s.".format(
+                cs.DAQ_MAX_INPUT_RATE))
+
+    def _get_plan(self, channels: Union[List[Tuple[DaqChannel, InputRange]],
+                                        AcquisitionPlan],
+                  n_samples: int, oversampling: int = 1) -> AcquisitionPlan:
+        """The given plan or the one cached for the given channels.
+
+        :raises ValueError: Invalid channels or plan not matching parameters.
+        """
+        if isinstance(channels, AcquisitionPlan):
+            if not channels.matches(n_samples, oversampling):
+                raise ValueError("Plan was prepared for {} x {} samples.".format(
+                    channels.n_samples, channels.oversampling))
+            return channels
+        key = (tuple(tuple(c) for c in channels), n_samples, oversampling)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = AcquisitionPlan(channels, n_samples, oversampling)
+            if len(self._plans) >= PLAN_CACHE_SIZE:
+                self._plans.clear()
+            self._plans[key] = plan
+        return plan
+
+    def _next_scan(self, amplitude: float, time: float, shape: RampShape,
+                   plan: AcquisitionPlan) -> int:
+        """Read the next of a series of back-to-back scans, (re-)starting them
+        if necessary.  Caller must hold the lock.
+        """
+        params = (self._offset, amplitude, time, plan.channels, shape,
+                  plan.n_samples, plan.oversampling)
+        if self._scans != params or timing.monotonic() > self._scans_due:
+            ret = self._daq.StartScans(
+                self._offset, amplitude, time, plan.n_samples,
+                plan.oversampling, plan.chan_p, plan.gain_p,
+                len(plan.channels), shape)
+            if ret != 0:
+                self._scans = None
+                return ret
+            self._scans = params
+        ret = self._daq.NextScan(plan.readings_p)
+        if ret != 0:
+            self._scans = None
+        # The ramp was already extended by one more period.  The next scan
+        # must be requested before that ends, leaving some slack for USB.
+        self._scans_due = timing.monotonic() + .9 * time
+        return ret
+
+    def _resume_stream(self) -> None:
+        """Restart the stream's scan after it was ended by another analog input
+        operation.  Caller must hold the lock.
+        """
+        if self._stream is None:
+            return
+        try:
+            self._stream.restart_scan()
+        except ConnectionError:
+            LOGGER.error("Couldn't resume DAQ stream.")
+            LOGGER.debug("Reason:", exc_info=True)
@@ -12,7 +12,7 @@ import asyncio
 import enum
 import logging
 import time        # To keep track of when replies came in.
-from typing import Dict, List, Tuple, Union
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple, Union  # pylint: disable=unused-import
 
 import websockets
 
@@ -149,6 +149,12 @@ Buffers = Dict[int, Dict[int, Buffer]]  # Node -> Service -> Buffer
 Time = float  # Unix timestamp, as returned by time.time()
 # pylint: enable=invalid-name,unsubscriptable-object
 
+Source = NamedTuple('Source', [('node', int), ('service', int),
+                               ('convert', Callable[[MenloUnit], MenloUnit])])
+"""Where a getter takes its readings from and how it converts each of them.
+``convert`` is None if the raw values are used as they are.
+"""
+
 
 class Calibration:  # This won't be instanciated. # pylint: disable=too-few-public-methods
     """Static Menlo stack calibration data."""
@@ -191,6 +197,10 @@ class MenloStack:
         # Takes care of converting thermistor resistance to temperature and
         # vice versa.
         self._standard_ntc = ntc_temp.NtcTemp(use_celsius=True)
+        self._temperatures = {}  # type: Dict[Tuple[int, bool], float]
+        """Converted temperatures by counts.  Those are bounded by the ADC and
+        DAC ranges, and so is this cache.
+        """
 
     async def init_async(self, url: str = DEFAULT_URL) -> None:
         """This replaces the default constructor.
@@ -294,8 +304,7 @@ class MenloStack:
     def is_lock_enabled(self, unit_number: int) -> Buffer:
         """Is the closed-loop lock currently engaged? Returns a Buffer!"""
         readings = self._get_pii_prop(unit_number, 304)
-        return [(time, 1 if reading == 0 else 0)
-                for (time, reading) in readings]
+        return [(time, _invert(reading)) for (time, reading) in readings]
 
     def is_integrator_enabled(self, unit_number: int, stage: int) -> Buffer:
         """Is the given unit's integrator stage "stage" enabled?
@@ -310,8 +319,7 @@ class MenloStack:
 
         # There is a logic inversion here, as the firmware actually reports if
         # the stage is *disabled*.
-        return [(time, 1 if reading == 0 else 0)
-                for (time, reading) in readings]
+        return [(time, _invert(reading)) for (time, reading) in readings]
 
     def is_ramp_enabled(self, unit_number: int) -> Buffer:
         """Is the externally provided ramp passed through or ignored?"""
@@ -319,8 +327,7 @@ class MenloStack:
 
         # There is a logic inversion here, as the firmware actually reports if
         # the stage is *disabled*.
-        return [(time, 1 if reading == 0 else 0)
-                for (time, reading) in readings]
+        return [(time, _invert(reading)) for (time, reading) in readings]
 
     def get_pii_monitor(self, unit_number: int, p_only: bool = False,
                         since: Time = None) -> Buffer:
@@ -331,12 +338,10 @@ class MenloStack:
 
     def get_temperature(self, unit: Union[int, OscCard], since: Time = None) -> Buffer:
         """Buffer of temp. readings in °C of given unit since `since`."""
-        return [(time, self._to_temperature(int(val)))
-                for (time, val) in self._get_osc_prop(unit, 272, since)]
+        return self.read(self.get_source(self.get_temperature, unit), since)
 
     def get_temp_setpoint(self, unit: Union[int, OscCard]) -> Buffer:
-        return [(time, self._to_temperature(int(val), is_setpoint=True))
-                for (time, val) in self._get_osc_prop(unit, 256)]
+        return self.read(self.get_source(self.get_temp_setpoint, unit))
 
     def get_temp_rth(self, unit_number: int, since: Time = None) -> Buffer:
         """Get the object thermistor resistance of given TEC unit."""
@@ -351,27 +356,17 @@ class MenloStack:
     def get_diode_current(self, unit: Union[OscCard, int], since: Time = None) -> Buffer:
         """Get actual measured diode current, applying calibration if present.
         """
-        raw = self._get_osc_prop(unit, 275, since)
-        try:  # Use calibration.
-            return [(time, Calibration.LD_CURRENT_GETTER[OscCard(unit)](val))
-                    for (time, val) in raw]
-        except (KeyError, ValueError):  # No calibration present.
-            return raw
+        return self.read(self.get_source(self.get_diode_current, unit), since)
 
     def get_diode_current_setpoint(self, unit: OscCard,
                                    since: Time = None) -> Buffer:
         """The currently set current setpoint of given card."""
-        raw = self._get_osc_prop(unit, 257, since)
-        try:  # Use calibration.
-            return [(time, Calibration.LD_CURRENT_SETPOINT_GETTER[OscCard(unit)](val / 8.))
-                    for (time, val) in raw]
-        except (KeyError, ValueError):  # No calibration present.
-            return [(time, val / 8.) for (time, val) in raw]
+        return self.read(self.get_source(self.get_diode_current_setpoint, unit),
+                         since)
 
     def get_tec_current(self, unit_number: int, since: Time = None) -> Buffer:
-        return [(time, val - self._tec_current_offsets[unit_number])
-                for (time, val)
-                in self._get_osc_prop(unit_number, 274, since=since)]
+        return self.read(self.get_source(self.get_tec_current, unit_number),
+                         since)
 
     def set_temp(self, unit_number: int, temp: float) -> None:
         """Set temperature setpoint of given oscillator supply unit in °C.
@@ -568,6 +563,76 @@ class MenloStack:
         """The error signal input stage offset compensation in percent."""
         return self._get_pii_prop(unit, 256)
 
+    def get_source(self, getter: Callable[..., Buffer], *args: Any) -> Source:
+        """Where ``getter(*args)`` takes its readings from and how it converts
+        them.
+
+        Together with ``get_new_points()``, this allows for following a
+        quantity without calling its getter over and over again.
+
+        :param getter: One of this instance's getters of received readings.
+        :raises ValueError: There is no such unit or channel.
+        :raises KeyError: ``getter`` is not supported.
+        """
+        name = getter.__name__
+        if name == 'get_adc_voltage':
+            if args[0] not in ADC_SVC_GET:
+                raise ValueError("No such ADC channel.")
+            return Source(ADC_NODE, args[0], None)
+        if name in _PII_SERVICES:
+            if args[0] not in PII_NODES:
+                raise ValueError("No such PII unit.")
+            service, convert = _PII_SERVICES[name]
+            if name == 'is_integrator_enabled' and args[1] != 1:
+                service = 306
+            elif name == 'get_pii_monitor' and len(args) > 1 and args[1]:
+                service = 273  # p_only
+            return Source(args[0], service, convert)
+
+        node = self._get_osc_node_id(args[0])  # may raise ValueError
+        unit = args[0]
+        convert = None  # type: Callable[[MenloUnit], MenloUnit]
+        if name == 'get_temperature':
+            convert = lambda val: self._to_temperature(int(val))
+        elif name == 'get_temp_setpoint':
+            convert = lambda val: self._to_temperature(int(val), is_setpoint=True)
+        elif name == 'get_diode_current':
+            try:  # Use calibration.
+                convert = Calibration.LD_CURRENT_GETTER[OscCard(unit)]
+            except (KeyError, ValueError):  # No calibration present.
+                pass
+        elif name == 'get_diode_current_setpoint':
+            try:  # Use calibration.
+                calibration = Calibration.LD_CURRENT_SETPOINT_GETTER[OscCard(unit)]
+            except (KeyError, ValueError):  # No calibration present.
+                calibration = lambda val: val
+            convert = lambda val: calibration(val / 8.)
+        elif name == 'get_tec_current':
+            # Look the offset up on conversion, as it changes on calibration.
+            convert = lambda val: val - self._tec_current_offsets[unit]
+        return Source(node, _OSC_SERVICES[name], convert)
+
+    def read(self, source: Source, since: Time = None) -> Buffer:
+        """Converted readings of ``source``, like its getter returns them."""
+        readings = self._get_latest(self._buffers[source.node][source.service],
+                                    since)
+        if source.convert is None:
+            return readings
+        return [(time, source.convert(val)) for (time, val) in readings]
+
+    def get_new_points(self, source: Source, last: DataPoint = None) -> Buffer:
+        """Raw readings of ``source`` received after ``last``, oldest first.
+
+        :param last: The latest point returned before.  All buffered points
+                    are returned if it is None or was rotated out already.
+        """
+        buffer = self._buffers[source.node][source.service]
+        try:
+            end = buffer.index(last)
+        except ValueError:
+            end = len(buffer)
+        return buffer[end - 1::-1] if end else []
+
     ###################
     # Private Methods #
     ###################
@@ -655,7 +720,7 @@ class MenloStack:
                     val = float(value)
                 except ValueError:
                     raise ValueError("Couldn't convert {} to either int or float.".format(value))
-            self._rotate_log(self._buffers[node][service], val)
+            self._rotate_log(buffer, val)
 
             # Log untouched data to disk.
             if LOG_QUANTITIES:
@@ -796,8 +861,14 @@ class MenloStack:
     def _to_temperature(self, counts: int, is_setpoint: bool = False) -> float:
         """Take a menlo DAC reading and convert it to ° Celsius.
         """
+        try:
+            return self._temperatures[(counts, is_setpoint)]
+        except KeyError:
+            pass
         ohms = self._to_ntc_resistance(counts, is_setpoint)
-        return self._standard_ntc.to_temp(ohms)
+        temperature = self._standard_ntc.to_temp(ohms)
+        self._temperatures[(counts, is_setpoint)] = temperature
+        return temperature
 
     @staticmethod
     def _get_osc_node_id(unit: Union[int, OscCard]) -> int:
@@ -819,3 +890,30 @@ class MenloStack:
             return True
         LOGGER.error("There is no PII unit %s", unit_number)
         return False
+
+
+def _invert(reading: MenloUnit) -> int:
+    # The firmware reports if things are *disabled*.
+    return 1 if reading == 0 else 0
+
+
+_OSC_SERVICES = {
+    'is_current_driver_enabled': 305,
+    'is_tec_enabled': 304,
+    'is_temp_ok': 288,
+    'get_temperature': 272,
+    'get_temp_setpoint': 256,
+    'get_diode_current': 275,
+    'get_diode_current_setpoint': 257,
+    'get_tec_current': 274}
+"""Services read by the oscillator supply getters."""
+_PII_SERVICES = {
+    'is_lock_enabled': (304, _invert),
+    'is_integrator_enabled': (305, _invert),
+    'is_ramp_enabled': (307, _invert),
+    'get_pii_monitor': (272, None),
+    'get_ramp_amplitude': (258, None),
+    'get_error_scale': (257, None),
+    'get_error_offset': (256, None)
+}  # type: Dict[str, Tuple[int, Callable[[MenloUnit], MenloUnit]]]
+"""Services read by the PII getters and their conversions."""
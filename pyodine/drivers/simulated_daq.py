@@ -0,0 +1,252 @@
+"""A stand-in for the MCC DAQ, synthesizing signals instead of measuring them.
+
+``SimulatedDaq`` offers the API of ``mccdaq.MccDaq`` without needing the
+driver library or any hardware.  The readings mimic the spectroscopy setup:
+The analog output ramp is looped back to the ramp monitor, the error signal is
+taken from the analytic reference spectrum and the logarithmic photodiode shows
+the doppler-broadened line.  Where the laser is in relation to that spectrum is
+described by a ``LaserModel``, which can be tuned just like the real thing.
+
+Acquisitions take about as long as they would on the real device, unless
+disabled.  That allows for benchmarking procedures like the prelock end to end.
+"""
+import enum
+import logging
+import os
+import threading
+import time as timing
+from typing import Dict, List, Tuple, Union  # pylint: disable=unused-import
+
+import numpy as np
+
+from .mccdaq import (AcquisitionPlan, DaqChannel, InputRange, MccDaq, RampShape,
+                     MAX_AOUT_SAMPLES)
+from .. import constants as cs
+
+LOGGER = logging.getLogger('pyodine.drivers.simulated_daq')
+
+REFERENCE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'test',
+                              'data', 'Analytic Spectrum (KD)_100kHz.bin')
+REFERENCE_STEP = 0.1
+"""Spacing of the reference spectrum's samples in SpecMhz."""
+N_RAMP_PREFIX = 100
+"""The ramp waits at the offset voltage this many samples before starting, as
+in libmccdaq's ``GenerateSignal()``.
+"""
+
+
+class SimSignal(enum.Enum):
+    """What is connected to a simulated input channel?"""
+    RAMP = 1   # Loopback of the analog output.
+    ERROR = 2  # Lockbox error signal.
+    LOG = 3    # Logarithmic photodiode.
+
+
+class LaserModel:
+    """Position of the simulated laser relative to the spectrum.
+
+    Positions are given in SpecMhz, relative to the center of the doppler
+    line, which is also the center of the reference spectrum.
+    """
+
+    def __init__(self, detuning: float = 0., drift: float = 0.,
+                 line_width: float = 200., line_depth: float = .25,
+                 log_level: float = 2., error_gain: float = .25,
+                 noise: float = .005, seed: int = None) -> None:
+        """
+        :param detuning: Initial position of the laser.
+        :param drift: The laser drifts by ~ SpecMhz per second.
+        :param line_width: Standard deviation of the doppler line (SpecMhz).
+        :param line_depth: Depth of the doppler line in the log signal (volts).
+        :param log_level: Log photodiode output off the line (volts).
+        :param error_gain: Error signal volts per reference spectrum unit.
+        :param noise: Standard deviation of the noise on all inputs (volts).
+        """
+        self.detuning = detuning
+        self.drift = drift
+        self.line_width = line_width
+        self.line_depth = line_depth
+        self.log_level = log_level
+        self.error_gain = error_gain
+        self.noise = noise
+        self.random = np.random.RandomState(seed)
+        self._since = timing.monotonic()
+        self._reference = None  # type: np.ndarray
+
+    def position(self, when: np.ndarray) -> np.ndarray:
+        """Position of the laser at the given ``time.monotonic()`` times."""
+        return self.detuning + self.drift * (when - self._since)
+
+    def tune(self, distance: float) -> None:
+        """Move the laser by ``distance`` SpecMhz."""
+        self.detuning = self.position(timing.monotonic()) + distance
+        self._since = timing.monotonic()
+
+    def error_signal(self, freqs: np.ndarray) -> np.ndarray:
+        """Error signal volts at the given positions."""
+        if self._reference is None:
+            self._reference = np.fromfile(REFERENCE_FILE)
+        ref_freqs = (np.arange(len(self._reference))
+                     - len(self._reference) / 2) * REFERENCE_STEP
+        return self.error_gain * np.interp(freqs, ref_freqs, self._reference,
+                                           left=0., right=0.)
+
+    def log_signal(self, freqs: np.ndarray) -> np.ndarray:
+        """Log photodiode volts at the given positions."""
+        return self.log_level - self.line_depth * np.exp(
+            -freqs**2 / (2 * self.line_width**2))
+
+
+class SimulatedDaq(MccDaq):
+    """Synthesizes readings instead of acquiring them.
+
+    Streaming is not supported.
+    """
+
+    def __init__(self, lock_timeout: float = 0,  # pylint: disable=super-init-not-called
+                 wiring: Dict[DaqChannel, SimSignal] = None,
+                 model: LaserModel = None, idle_level: float = 1.,
+                 latency: float = .003, realtime: bool = True) -> None:
+        """
+        :param lock_timeout: See ``MccDaq``.
+        :param wiring: What signal is connected to which input.  Inputs not
+                    listed read ``idle_level`` volts.
+        :param model: Defaults to a laser resting on the line center.
+        :param latency: Added to every acquisition, in seconds.  This is what
+                    USB transfers take.
+        :param realtime: Take as long as the device would for acquisitions.
+        """
+        self.lock_timeout = lock_timeout if lock_timeout >= 0 else -1
+        self.wiring = {} if wiring is None else wiring
+        self.model = LaserModel() if model is None else model
+        self.idle_level = idle_level
+        self.latency = latency
+        self.realtime = realtime
+        self.n_acquisitions = 0
+        self._offset = 0.0
+        self._lock = threading.Lock()
+        self._stream = None
+        self._scans = None  # type: tuple
+        self._scans_end = 0.
+        self._plans = {}  # type: Dict[tuple, AcquisitionPlan]
+
+    def fetch_scan(self, amplitude: float, time: float,
+                   channels: Union[List[Tuple[DaqChannel, InputRange]],
+                                   AcquisitionPlan],
+                   shape: RampShape = RampShape.DESCENT,
+                   back_to_back: bool = False,
+                   n_samples: int = MAX_AOUT_SAMPLES,
+                   oversampling: int = 1) -> np.ndarray:
+        """See ``MccDaq.fetch_scan()``.
+
+        Back-to-back scans follow each other without latency.  Transferring
+        oversampled readings adds to the latency.
+        """
+        plan = self._get_plan(channels, n_samples, oversampling)
+        self._validate_scan(amplitude, time, shape, n_samples, oversampling,
+                            len(plan.channels))
+        if self.is_too_busy:
+            raise BlockingIOError("DAQ is too busy to fetch a scan.")
+        with self._lock:
+            params = (self._offset, amplitude, time, plan.channels, shape,
+                      n_samples, oversampling)
+            now = timing.monotonic()
+            if (back_to_back and self._scans == params
+                    and now < self._scans_end + .9 * time):
+                start = self._scans_end
+            else:
+                start = now + self.latency * oversampling
+            ramp = np.repeat(self._generate_ramp(amplitude, shape, n_samples),
+                             oversampling)
+            n_readings = n_samples * oversampling
+            when = start + np.arange(n_readings) * time / n_readings
+            self._read(plan.channels, ramp, when, plan.readings)
+            if oversampling > 1:
+                plan.result[:] = np.round(plan.readings.reshape(
+                    n_samples, oversampling, -1).mean(axis=1))
+            self._wait_until(start + time)
+            self._scans = params if back_to_back else None
+            self._scans_end = start + time
+            if plan is not channels:
+                return plan.result.copy()
+        return plan.result
+
+    def sample_channels(self, channels: Union[List[Tuple[DaqChannel, InputRange]],
+                                              AcquisitionPlan],
+                        n_samples: int = None, frequency: float = 1000) -> np.ndarray:
+        """See ``MccDaq.sample_channels()``."""
+        if n_samples is None:
+            n_samples = (channels.n_samples
+                         if isinstance(channels, AcquisitionPlan) else 1)
+        plan = self._get_plan(channels, n_samples)
+        if self.is_too_busy:
+            raise BlockingIOError("DAQ is too busy to sample channels.")
+        with self._lock:
+            self._scans = None
+            start = timing.monotonic()
+            when = start + np.arange(n_samples) / frequency
+            self._read(plan.channels, np.full(n_samples, self._offset), when,
+                       plan.readings)
+            self._wait_until(start + n_samples / frequency + self.latency)
+            if plan is not channels:
+                return plan.readings.copy()
+        return plan.readings
+
+    def stop_scans(self) -> None:
+        with self._lock:
+            self._scans = None
+
+    def start_stream(self, *_, **__) -> None:  # pylint: disable=arguments-differ
+        raise ConnectionError("The simulated DAQ can't stream.")
+
+    def ping(self) -> bool:
+        with self._lock:
+            return True
+
+    def _generate_ramp(self, amplitude: float, shape: RampShape,
+                       n_samples: int) -> np.ndarray:
+        """The output voltages, like libmccdaq's ``GenerateSignal()``.
+
+        :raises ConnectionError: The device would refuse the signal.
+        """
+        if (abs(self._offset) > 10 or self._offset + amplitude / 2 > 10
+                or self._offset - amplitude / 2 < -10):
+            raise ConnectionError("Failed to fetch scan. Combination of offset "
+                                  "and amplitude must not exceed +/- 10 volts.")
+        if shape == RampShape.DIP:
+            raise ConnectionError("Failed to fetch scan. Ramp shape DIP is "
+                                  "not implemented.")
+        ramp = np.full(n_samples, self._offset)
+        slope = np.linspace(self._offset + amplitude / 2,
+                            self._offset - amplitude / 2,
+                            n_samples - N_RAMP_PREFIX - 1)
+        if shape == RampShape.ASCENT:
+            slope = slope[::-1]
+        ramp[N_RAMP_PREFIX:-1] = slope
+        return ramp
+
+    def _read(self, channels: List[Tuple[DaqChannel, InputRange]],
+              ramp: np.ndarray, when: np.ndarray, readings: np.ndarray) -> None:
+        """Write raw readings of ``channels`` while outputting ``ramp`` to
+        ``readings``.
+        """
+        self.n_acquisitions += 1
+        mhz_per_volt = cs.LOCKBOX_MHz_mV * cs.LOCK_SFG_FACTOR * 1000
+        freqs = self.model.position(when) + ramp * mhz_per_volt
+        for column, (channel, gain) in enumerate(channels):
+            signal = self.wiring.get(channel)
+            if signal == SimSignal.RAMP:
+                volts = ramp.copy()
+            elif signal == SimSignal.ERROR:
+                volts = self.model.error_signal(freqs)
+            elif signal == SimSignal.LOG:
+                volts = self.model.log_signal(freqs)
+            else:
+                volts = np.full(len(ramp), self.idle_level)
+            volts += self.model.random.normal(0, self.model.noise, len(ramp))
+            counts = (volts + gain) / (2 * gain) * 2**16
+            readings[:, column] = np.clip(np.round(counts), 0, 2**16 - 1)
+
+    def _wait_until(self, deadline: float) -> None:
+        if self.realtime:
+            timing.sleep(max(0., deadline - timing.monotonic()))
@@ -83,8 +83,10 @@ class Plotter {  // eslint-disable-line no-unused-vars
     const div = $(plotDiv);
     const prefix = plotDiv.dataset.unitName;
     if (!prefix) return;
-    const monitorVals = readingsObj[`${prefix}_monitor`].map(Plotter.convertToPlotPoint);
-    const pMonitorVals = readingsObj[`${prefix}_p_monitor`].map(Plotter.convertToPlotPoint);
+    const monitorVals = (readingsObj[`${prefix}_monitor`] || [])
+      .map(Plotter.convertToPlotPoint);
+    const pMonitorVals = (readingsObj[`${prefix}_p_monitor`] || [])
+      .map(Plotter.convertToPlotPoint);
     if (typeof div.data('chart') === 'undefined') {
       // Create a new plot.
       const chart = new CanvasJS.Chart(plotDiv, {
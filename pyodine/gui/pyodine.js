@@ -18,6 +18,25 @@
   const LEVEL_NAMES = ["UNDEFINED", "SHUTDOWN", "STANDBY", "AMBIENT", "HOT",
     "PRELOCK", "LOCK", "BALANCED"];
 
+  // Binary frame format, see pyodine's `transport.packer` module.  The types
+  // must be in the same order as `constants.MESSAGE_TYPES`.
+  const MESSAGE_TYPES = ['readings', 'texus', 'setup', 'signal', 'aux_temps'];
+  const FRAME_FIXED_BYTES = 12;
+  const FRAME_FLAG_DEFLATE = 0x01;
+  const TYPED_ARRAYS = {
+    '|b1': Uint8Array,
+    '|u1': Uint8Array,
+    '|i1': Int8Array,
+    '<u2': Uint16Array,
+    '<i2': Int16Array,
+    '<u4': Uint32Array,
+    '<i4': Int32Array,
+    '<f4': Float32Array,
+    '<f8': Float64Array,
+  };
+  // Ask the server for binary frames, but accept JSON as well.
+  const WS_SUBPROTOCOLS = ['pyodine.binary.v1', 'pyodine.json'];
+
   function createMessage(object, type) {
     const wrapper = {};
     wrapper.type = type;
@@ -119,6 +138,8 @@
   }
 
   // Parse "readings"-type data package and dispatch associated handlers.
+  // Series only contain points that weren't sent before, states only changed
+  // values.  If `data.keyframe` is set, all states are included.
   // @param {Object} data The message payload as  extracted from the received
   //                      JSON message.
   function parseReadings(data) {
@@ -135,7 +156,10 @@
   // @param {Object} data The message payload as  extracted from the received
   //                      JSON message.
   function parseSignal(data) {
-    const intData = Array.from(FbgUtil.base64toUint16(data.data));
+    // Binary frames carry a typed array, JSON messages a base64 string.
+    const rawData = (typeof data.data === 'string')
+      ? FbgUtil.base64toUint16(data.data) : data.data;
+    const intData = Array.from(rawData);
     const normalizedData = intData.map(entry => (entry - (2 ** 15)) / (2 ** 15));
     const nChannels = data.shape[1];  // # of readings per sample.
     const plotXY = document.getElementById('plotVsRamp').checked;
@@ -148,18 +172,72 @@
     );
   }
 
-  // Parse a received JSON data package and pass the contents on to dedicated
-  // handler functions.
+  // Unpack a binary frame as created by pyodine's `packer.create_frame()`.
+  // @param {ArrayBuffer} buffer The complete frame.
+  // @returns {Object} The message, looking the same as if it had been received
+  //                   as JSON.  Only arrays are typed arrays instead of base64
+  //                   strings.
+  function parseFrame(buffer) {
+    const view = new DataView(buffer);
+    if (view.getUint8(0) !== 0xFF || view.getUint8(1) !== 0x50) {
+      throw new SyntaxError("Invalid frame magic.");
+    }
+    const headerLength = view.getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(
+      new Uint8Array(buffer, FRAME_FIXED_BYTES, headerLength)));
+    const payloadStart = FRAME_FIXED_BYTES + headerLength;
+    const data = header.data;
+    header.arrays.forEach(([key, kind, dtype, shape, offset]) => {
+      const count = shape.reduce((product, dim) => product * dim, 1);
+      const array = new TYPED_ARRAYS[dtype](buffer, payloadStart + offset, count);
+      if (kind === 'series') {
+        // Restore the [[time, value], ...] buffer layout.
+        data[key] = [];
+        for (let i = 0; i < count; i += 2) {
+          data[key].push([array[i], array[i + 1]]);
+        }
+      } else {
+        data[key] = array;
+      }
+    });
+    return { type: MESSAGE_TYPES[view.getUint8(2)], data };
+  }
+
+  // Unwrap a compressed frame (see `FRAME_FLAG_DEFLATE`).
+  // @param {ArrayBuffer} buffer The complete compressed frame.
+  // @returns {Promise} Resolves to the contained uncompressed frame.
+  function inflateFrame(buffer) {
+    const headerLength = new DataView(buffer).getUint32(4, true);
+    const compressed = new Blob([buffer.slice(FRAME_FIXED_BYTES + headerLength)]);
+    const stream = compressed.stream().pipeThrough(new DecompressionStream('deflate'));
+    return new Response(stream).arrayBuffer();
+  }
+
+  // Parse a received data package (JSON or binary frame) and pass the
+  // contents on to dedicated handler functions.
   // @param {Object} event contains the data to be parsed at event.data (a
-  //                       string)
+  //                       string or an ArrayBuffer)
   // @returns null
   function messageHandler(event) {
+    if (typeof event.data !== 'string'
+        && event.data.byteLength >= FRAME_FIXED_BYTES
+        // eslint-disable-next-line no-bitwise
+        && (new DataView(event.data).getUint8(3) & FRAME_FLAG_DEFLATE)) {
+      inflateFrame(event.data)
+        .then(frame => messageHandler({ data: frame }))
+        .catch((exception) => {
+          console.error("Invalid compressed frame received.");
+          console.log(exception);
+        });
+      return;
+    }
     let message;
     try {
-      message = JSON.parse(event.data);
+      message = (typeof event.data === 'string')
+        ? JSON.parse(event.data) : parseFrame(event.data);
     } catch (exception) {
-      if (exception instanceof SyntaxError) {
-        console.error("Invalid JSON received.");
+      if (exception instanceof SyntaxError || exception instanceof RangeError) {
+        console.error("Invalid message received.");
         console.log(exception);
         return;
       }
@@ -258,7 +336,8 @@
     $('#connect_btn').on('click', () => {
       const host = document.getElementsByName('ip')[0].value;
       const wsPort = document.getElementById('ws_port').value;
-      CONNECTION.ws = new WebSocket(`ws://${host}:${wsPort}/`);
+      CONNECTION.ws = new WebSocket(`ws://${host}:${wsPort}/`, WS_SUBPROTOCOLS);
+      CONNECTION.ws.binaryType = 'arraybuffer';
       CONNECTION.ws.onmessage = messageHandler;
     });
     $('#disconnect_btn').on('click', () => {
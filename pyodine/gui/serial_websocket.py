@@ -2,9 +2,13 @@
 """
 import asyncio
 import logging
-import serial
+from typing import Union
 from ..transport.websocket_server import WebsocketServer
 from ..transport.decoder import Decoder
+from ..transport.serial_transport import SerialTransport
+from ..transport import link_compression
+from ..transport import packer
+from .. import constants as cs
 from .. import logger
 
 WS_PORT = 56320
@@ -18,7 +22,11 @@ class SerialWebsocket():
         """Do also run async_init()."""
         LOGGER.debug("Creating instance...")
         self._ws_port = ws_port
-        self._serial = serial.Serial(port=serial_device, baudrate=BAUDRATE)
+        self._serial = SerialTransport(serial_device, BAUDRATE,
+                                       on_receive=self._on_serial_data)
+        self._collector = Decoder()
+        self._inflater = link_compression.LinkDecompressor(
+            link_compression.load_dictionary(cs.RS232_COMPRESSION_DICTIONARY))
         self._ws_server = None  # type: WebsocketServer
         LOGGER.info("Created Serial<->Websocket server. Do call "
                     ".async_init().")
@@ -31,34 +39,37 @@ class SerialWebsocket():
 
     def start_server(self):
         LOGGER.info("Starting server...")
-        asyncio.ensure_future(self._server())
+        self._serial.start_reading()
+        LOGGER.info("Server started.")
 
-    def _forward_reply(self, message: str):
-        bytestream = message.encode()
-        n_bytes = len(bytestream)
-        n_transmitted_bytes = self._serial.write(bytestream)
-        if n_transmitted_bytes == n_bytes:
-            LOGGER.info("To RS232: %s", logger.ellipsicate(message))
-            LOGGER.debug("To RS232: %s", message)
-        else:
-            LOGGER.warning("Error transmitting Message.")
+    def _forward_reply(self, message: Union[str, bytes]):
+        self._serial.write(message)
+        LOGGER.info("To RS232: %s", logger.ellipsicate(message))
+        LOGGER.debug("To RS232: %s", message)
 
-    async def _server(self):
-        LOGGER.info("Server started.")
-        collector = Decoder()
-        while True:
-            if self._serial.in_waiting > 0:
-                data = self._serial.read(1)
-                data += self._serial.read(self._serial.in_waiting)
-                collector.feed(data)
-                if collector.n_pending() > 0:
-                    messages = collector.harvest()
-                    for msg in messages:
-                        LOGGER.info("To WS: %s", logger.ellipsicate(msg))
-                        LOGGER.debug("To WS: %s", msg)
-                        asyncio.ensure_future(self._ws_server.publish(msg))
+    def _on_serial_data(self, data: bytes) -> None:
+        self._collector.feed(data)
+        if self._collector.n_pending() == 0:
+            return
+        for msg in self._collector.harvest():
+            if link_compression.is_stream_frame(msg):
+                inflated = self._inflater.decompress(msg)
+                if inflated is None:
+                    continue
+                msg = inflated if packer.is_frame(inflated) else inflated.decode()
+            LOGGER.info("To WS: %s", logger.ellipsicate(msg))
+            LOGGER.debug("To WS: %s", logger.Ellipsicated(msg))
+            if isinstance(msg, bytes):
+                # Re-encode frames to suit each client's format.
+                try:
+                    msg_type, payload = packer.parse_frame(msg)
+                except ValueError:
+                    LOGGER.warning("Dropping invalid frame.")
+                    continue
+                asyncio.ensure_future(self._ws_server.publish_message(
+                    payload, msg_type))
             else:
-                await asyncio.sleep(0.1)  # OPTIMIZE: Do this elegantly.
+                asyncio.ensure_future(self._ws_server.publish(msg))
 
 
 async def launch():
@@ -173,6 +173,22 @@ def ellipsicate(message: str, max_length: int = 40, strip: bool = True) -> str:
     return str(msg[:snip_length] + ' ... ' + msg[-snip_length:])
 
 
+class Ellipsicated:  # pylint: disable=too-few-public-methods
+    """Defer `ellipsicate()` until the message is actually formatted.
+
+    Pass this as a logging argument to avoid shortening large messages that
+    are never logged: ``LOGGER.debug("Got %s", Ellipsicated(data))``
+    """
+    def __init__(self, message: object, max_length: int = 40,
+                 strip: bool = True) -> None:
+        self._message = message
+        self._max_length = max_length
+        self._strip = strip
+
+    def __str__(self) -> str:
+        return ellipsicate(str(self._message), self._max_length, self._strip)
+
+
 def _get_qty_logger(name: str) -> logging.Logger:
     name = str(name)
     if not name.isidentifier():
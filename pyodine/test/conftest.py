@@ -0,0 +1,13 @@
+"""Fixtures shared by the tests."""
+import asyncio
+import pytest
+
+
+@pytest.fixture
+def loop():
+    """A fresh event loop, which is closed after the test."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+    asyncio.set_event_loop(None)
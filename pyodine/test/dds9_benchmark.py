@@ -0,0 +1,83 @@
+"""Compare the DDS9 drivers by command throughput on an emulated DDS9m.
+
+Run as a module from the repository root:
+
+    python -m pyodine.test.dds9_benchmark [n_rounds [baudrate]]
+
+Each round applies a burst of settings, like a full set of GUI changes, and
+then drags one amplitude slider through 20 values.  The emulator takes as long
+as a DDS9m would at the given baud rate.  Reported are the time per round and
+the number of commands that actually went over the wire.
+"""
+import asyncio
+import sys
+import time
+from typing import Callable, List, Tuple  # pylint: disable=unused-import
+
+from ..drivers.dds9_async import AsyncDds9Control
+from ..drivers.dds9_control import Dds9Control
+from .dds9_emulator import Dds9Emulator
+
+BURST = [('set_frequency', 150.2, 0), ('set_frequency', 150.2, 1),
+         ('set_amplitude', .8, 0), ('set_amplitude', .5, 1),
+         ('set_amplitude', .9, 2), ('set_phase', 20, 0), ('set_phase', 0, 1)]
+"""EOM and mixer frequencies, three amplitudes and the mixer phase."""
+SLIDER = [('set_amplitude', i / 20, 3) for i in range(20)]
+
+
+def sync_rounds(device: str) -> Callable[[], None]:
+    dds = Dds9Control(device)
+
+    def run_round() -> None:
+        for method, value, channel in BURST + SLIDER:
+            getattr(dds, method)(value, channel)
+    return run_round
+
+
+def async_rounds(device: str, pipelined: bool) -> Callable[[], None]:
+    loop = asyncio.get_event_loop()
+    dds = AsyncDds9Control(device)
+    loop.run_until_complete(dds.init_async())
+
+    async def run_round() -> None:
+        calls = [getattr(dds, method)(value, channel)
+                 for method, value, channel in BURST + SLIDER]
+        if pipelined:
+            await asyncio.gather(*calls)
+        else:
+            for call in calls:
+                await call
+    return lambda: loop.run_until_complete(run_round())
+
+
+def benchmark(name: str, setup: Callable[[str], Callable[[], None]],
+              n_rounds: int, baudrate: int) -> None:
+    with Dds9Emulator(baudrate=baudrate) as emulator:
+        run_round = setup(emulator.device)
+        n_commands = len(emulator.commands)
+        start = time.monotonic()
+        for _ in range(n_rounds):
+            run_round()
+        elapsed = (time.monotonic() - start) / n_rounds
+        sent = (len(emulator.commands) - n_commands) / n_rounds
+    print("{:18} {:7.1f} ms/round  {:5.1f} commands/round  "
+          "{:6.1f} settings/s".format(name, elapsed * 1e3, sent,
+                                      len(BURST + SLIDER) / elapsed))
+
+
+def main() -> None:
+    n_rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baudrate = int(sys.argv[2]) if len(sys.argv) > 2 else 19200
+    print("{} settings per round at {} baud:".format(len(BURST + SLIDER),
+                                                     baudrate))
+    setups = [
+        ('sync', sync_rounds),
+        ('async, sequential', lambda device: async_rounds(device, False)),
+        ('async, pipelined', lambda device: async_rounds(device, True))
+    ]  # type: List[Tuple[str, Callable[[str], Callable[[], None]]]]
+    for name, setup in setups:
+        benchmark(name, setup, n_rounds, baudrate)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""A DDS9m frequency generator, emulated behind a pseudo terminal.
+
+Open ``Dds9Emulator.device`` like the serial port of a real DDS9m.  The
+emulator implements the commands used by ``drivers.dds9_control`` and
+``drivers.dds9_async`` and answers from a thread of its own, taking as long as
+the bytes would take on the wire at the given baud rate.  Responses are written
+in chunks of ``CHUNK_BYTES`` as they come in over the wire, so longer responses
+arrive in several pieces.
+
+Faults can be injected to exercise the drivers' error handling:  A stalled
+emulator swallows all commands without answering, garbled responses have their
+characters replaced by random ones, so that they never end in "OK".
+"""
+import os
+import random
+import select
+import threading
+import time
+from typing import Dict, List  # pylint: disable=unused-import
+
+from .pty_harness import PtyLink
+
+FACTORY_STATE = {'F': [1000000000] * 4, 'P': [0] * 4, 'V': [1023] * 4}
+"""100MHz at full amplitude on all channels."""
+MAX_FREQ_VALUE = 171.1276
+"""Highest frequency the chip can store, in (scaled) MHz."""
+CHUNK_BYTES = 8
+"""Write responses in pieces of that many bytes when emulating in real time."""
+
+
+class Dds9Emulator:
+    """Answers like a DDS9m does."""
+
+    def __init__(self, baudrate: int = 19200, realtime: bool = True) -> None:
+        """
+        :param realtime: Take as long as the transmission at ``baudrate``
+                    would take.  Answer right away otherwise.
+        """
+        self.baudrate = baudrate
+        self.realtime = realtime
+        self.stalled = False
+        """Swallow commands without answering."""
+        self.n_garbled = 0
+        """Garble the next ~ responses."""
+        self.commands = []  # type: List[str]
+        """All commands received."""
+        self.registers = _copy_state(FACTORY_STATE)
+        self.echo = True
+        self.clock = 'I'
+        self._saved = _copy_state(FACTORY_STATE)  # EEPROM
+        self._random = random.Random(0)
+        self._link = PtyLink()
+        self.device = self._link.device
+        """Path of the port to be opened by the code under test."""
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='Dds9Emulator',
+                                        daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._link.close()
+
+    def __enter__(self) -> 'Dds9Emulator':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def answer(self, command: str) -> str:
+        """Process ``command`` and return the response."""
+        self.commands.append(command)
+        response = self._process(command.strip(), command.upper().split())
+        return (command + '\r\n' if self.echo else '') + response + '\r\n'
+
+    def _process(self, command: str, words: List[str]) -> str:  # pylint: disable=too-many-return-statements,too-many-branches
+        if not words:
+            return '?0'
+        if words[0] == 'QUE':
+            return ''.join(
+                '{:08X} {:04X} {:04X} 0000 00000000 00000000 000301\r\n'.format(
+                    self.registers['F'][i], self.registers['P'][i],
+                    self.registers['V'][i]) for i in range(4)) + 'OK'
+        if words[0] == 'CLR':
+            self.registers = _copy_state(FACTORY_STATE)
+            self._saved = _copy_state(FACTORY_STATE)
+            self.clock = 'I'
+        elif words[0] == 'S':
+            self._saved = _copy_state(self.registers)
+        elif words[0] == 'R':
+            self.registers = _copy_state(self._saved)
+            self.clock = 'I'
+        elif words[0] == 'E' and words[1:] in (['D'], ['E']):
+            self.echo = words[1] == 'E'
+        elif words[0] == 'C' and words[1:] in (['E'], ['I']):
+            self.clock = words[1]
+        elif words[0] in ('I', 'M', 'VS', 'KP') and len(words) == 2:
+            pass  # Accepted, but without effect here.
+        elif command[:1].upper() in 'FPV':
+            return self._set_register(command[:1].upper(), command[1:].split())
+        else:
+            return '?0'
+        return 'OK'
+
+    def _set_register(self, quantity: str, args: List[str]) -> str:
+        error = {'F': '?1', 'P': '?4', 'V': '?7'}[quantity]
+        try:
+            channel = int(args[0])
+            value = float(args[1]) if quantity == 'F' else int(args[1])
+        except (IndexError, ValueError):
+            return error
+        limit = {'F': MAX_FREQ_VALUE, 'P': 16383, 'V': 1023}[quantity]
+        if channel not in range(4) or not 0 <= value <= limit:
+            return error
+        self.registers[quantity][channel] = (
+            int(round(value * 1e7)) if quantity == 'F' else value)
+        return 'OK'
+
+    def _run(self) -> None:
+        received = b''
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._link.master], [], [], .05)
+            if not readable:
+                continue
+            try:
+                received += os.read(self._link.master, 1024)
+            except (BlockingIOError, OSError):
+                continue
+            *lines, received = received.replace(b'\r', b'\n').split(b'\n')
+            for line in lines:
+                command = line.decode(errors='replace')
+                if not command.strip() or self.stalled:
+                    continue
+                response = self.answer(command)
+                if self.n_garbled > 0:
+                    self.n_garbled -= 1
+                    response = ''.join(
+                        c if c in '\r\n' else self._random.choice('GHXZ#%')
+                        for c in response)
+                if self.realtime:
+                    self._transmit(len(line) + 1, response.encode())
+                else:
+                    self._link.write(response.encode())
+
+    def _transmit(self, n_received: int, data: bytes) -> None:
+        """Write ``data`` at the pace of the baud rate, after waiting for the
+        command of ``n_received`` bytes to come in.
+        """
+        # 8N1: Ten bits per byte, both ways.
+        time.sleep(n_received * 10 / self.baudrate)
+        for start in range(0, len(data), CHUNK_BYTES):
+            chunk = data[start:start + CHUNK_BYTES]
+            time.sleep(len(chunk) * 10 / self.baudrate)
+            self._link.write(chunk)
+
+
+def _copy_state(state: Dict[str, List[int]]) -> Dict[str, List[int]]:
+    return {key: list(values) for key, values in state.items()}
@@ -0,0 +1,38 @@
+"""Benchmark feeding large messages into the Decoder in serial-sized chunks.
+
+Run as a module from the repository root:
+
+    python -m pyodine.test.decoder_benchmark
+"""
+import base64
+import os
+import time
+
+from ..transport import packer
+from ..transport.decoder import Decoder
+
+MESSAGE_BYTES = 100000
+CHUNK_SIZES = [32, 256, 4096]
+N_MESSAGES = 5
+
+
+def run(chunk_size: int) -> float:
+    """Feed ``N_MESSAGES`` messages of ~MESSAGE_BYTES and return bytes/s."""
+    payload = base64.b64encode(os.urandom(MESSAGE_BYTES * 3 // 4)).decode()
+    stream = packer.create_message({'data': payload}, 'signal').encode()
+    stream *= N_MESSAGES
+    chunks = [stream[i:i + chunk_size]
+              for i in range(0, len(stream), chunk_size)]
+
+    decoder = Decoder()
+    start = time.perf_counter()
+    for chunk in chunks:
+        decoder.feed(chunk)
+    elapsed = time.perf_counter() - start
+    assert decoder.n_pending() == N_MESSAGES
+    return len(stream) / elapsed
+
+
+if __name__ == '__main__':
+    for size in CHUNK_SIZES:
+        print("{:>5} byte chunks: {:8.2f} MB/s".format(size, run(size) / 1e6))
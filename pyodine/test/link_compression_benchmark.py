@@ -0,0 +1,117 @@
+"""Replay RS232 messages through the link compression and report its gains.
+
+Run as a module from the repository root:
+
+    python -m pyodine.test.link_compression_benchmark [recording [dictionary]]
+
+A recording is a file written by ``QueueingSerialServer`` when
+``constants.RS232_RECORDING_FILE`` is set.  Without a recording, synthetic
+messages resembling pyodine's telemetry are used.  The first half of the
+messages is used for training a dictionary, the second half for the
+benchmark.  If a dictionary file name is given, the trained dictionary is saved
+there.
+"""
+import random
+import sys
+import time
+from typing import List, Union  # pylint: disable=unused-import
+
+import numpy as np
+
+from ..transport import link_compression, packer
+from ..transport.decoder import Decoder
+
+BAUDRATE = 19200
+N_SYNTHETIC = 400
+
+
+def read_recording(filename: str) -> List[Union[str, bytes]]:
+    decoder = Decoder()
+    messages = []  # type: List[Union[str, bytes]]
+    with open(filename, 'rb') as file:
+        for chunk in iter(lambda: file.read(4096), b''):
+            decoder.feed(chunk)
+            messages.extend(decoder.harvest())
+    return messages
+
+
+def synthesize(n_messages: int) -> List[str]:
+    """Messages like those sent by ``Interfaces``, at similar proportions."""
+    rand = random.Random(0)
+    now = 1.5e9
+    messages = []
+    for i in range(n_messages):
+        now += 0.5 + rand.random() * 0.1
+        readings = {'adc{}'.format(c): [[now, rand.gauss(0, 1)]] for c in range(8)}
+        for name in ['miob', 'vhbg', 'shgb', 'shga']:
+            readings[name + '_temp'] = [[now, 25 + rand.gauss(0, 0.01)]]
+            readings[name + '_tec_current'] = [[now, rand.gauss(300, 2)]]
+        for name in ['mo', 'pa']:
+            readings[name + '_current'] = [[now, rand.gauss(100, 0.1)]]
+        readings['nu_monitor'] = [[now, rand.randint(0, 4095)]]
+        messages.append(packer.create_message(readings, 'readings'))
+        if i % 5 == 0:
+            messages.append(packer.create_message(
+                {'tex{}'.format(t): False for t in range(1, 7)}, 'texus'))
+        if i % 20 == 0:
+            messages.append(packer.create_message(
+                {'eom_freq': [[now, 150.]], 'aom_freq': [[now, 150.]],
+                 'mixer_phase': [[now, 2.3]]}, 'setup'))
+        if i % 50 == 0:
+            signal = (2**15 + 2000 * np.sin(np.linspace(0, 6, 600))[:, None]
+                      + np.random.RandomState(i).normal(0, 20, (600, 3)))
+            signal = signal.astype(np.uint16)
+            messages.append(packer.create_message(
+                {'data': signal, 'shape': signal.shape}, 'signal'))
+    return messages
+
+
+def as_bytes(message: Union[str, bytes]) -> bytes:
+    return message.encode() if isinstance(message, str) else message
+
+
+def run(messages: List[Union[str, bytes]], name: str,
+        dictionary: bytes = None) -> None:
+    raw = sum(len(as_bytes(m)) for m in messages)
+    if name == 'per message':
+        start = time.process_time()
+        frames = [packer.deflate_frame(as_bytes(m)) for m in messages]
+        compress_time = time.process_time() - start
+        inflate_time = 0.
+    else:
+        compressor = link_compression.LinkCompressor(dictionary)
+        start = time.process_time()
+        frames = [compressor.compress(m) for m in messages]
+        compress_time = time.process_time() - start
+        decompressor = link_compression.LinkDecompressor(dictionary)
+        start = time.process_time()
+        restored = [decompressor.decompress(f) for f in frames]
+        inflate_time = time.process_time() - start
+        assert restored == [as_bytes(m) for m in messages]
+    sent = sum(len(f) for f in frames)
+    print("{:<22} ratio {:5.2f}  {:6.1f} msg/s at {} baud  "
+          "CPU {:6.1f} + {:5.1f} us/msg".format(
+              name, raw / sent, len(messages) / (sent * 10 / BAUDRATE),
+              BAUDRATE, compress_time / len(messages) * 1e6,
+              inflate_time / len(messages) * 1e6))
+
+
+def main() -> None:
+    messages = (read_recording(sys.argv[1]) if len(sys.argv) > 1
+                else synthesize(N_SYNTHETIC))
+    training, replay = messages[:len(messages) // 2], messages[len(messages) // 2:]
+    dictionary = link_compression.train_dictionary(training)
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'wb') as file:
+            file.write(dictionary)
+    raw = sum(len(as_bytes(m)) for m in replay)
+    print("Replaying {} messages, {} bytes.".format(len(replay), raw))
+    print("{:<22} ratio {:5.2f}  {:6.1f} msg/s at {} baud".format(
+        'uncompressed', 1, len(replay) / (raw * 10 / BAUDRATE), BAUDRATE))
+    run(replay, 'per message')
+    run(replay, 'stream, builtin dict')
+    run(replay, 'stream, trained dict', dictionary)
+
+
+if __name__ == '__main__':
+    main()
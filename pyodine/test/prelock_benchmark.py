@@ -0,0 +1,107 @@
+"""Run the prelock against a simulated DAQ and report how it performs.
+
+Run as a module from the repository root:
+
+    python -m pyodine.test.prelock_benchmark [n_trials [fast]]
+
+Every trial starts the simulated laser at a random distance from the line and
+lets ``LockBuddy`` search and center it, like ``procedures.prelock()`` does.
+The MO current tuner is simulated as well.  Pass "fast" to skip waiting for
+acquisitions and tuner delays.
+"""
+import asyncio
+from functools import partial
+import random
+import sys
+import time
+
+from ..controller import lock_buddy
+from ..controller.daq_scheduler import DaqScheduler
+from ..controller.subsystems import DaqInput, SIMULATED_DAQ_WIRING
+from ..drivers import mccdaq, simulated_daq
+from .. import constants as cs
+
+MAX_DETUNING = 3000
+"""Start up to ~ SpecMhz away from the line."""
+
+
+def create_tuner(model: simulated_daq.LaserModel,
+                 realtime: bool) -> lock_buddy.Tuner:
+    """The MO current, moving the simulated laser."""
+    mo_range = cs.LD_MO_TUNING_RANGE[1] - cs.LD_MO_TUNING_RANGE[0]
+    scale = abs(mo_range * cs.LD_MO_MHz_mA)
+    state = {'value': .5}
+
+    def setter(value: float) -> None:
+        model.tune((value - state['value']) * scale * cs.LOCK_SFG_FACTOR)
+        state['value'] = value
+
+    return lock_buddy.Tuner(
+        scale=cs.LaserMhz(scale),
+        granularity=cs.LD_MO_GRANULARITY_mA / mo_range,
+        delay=cs.LD_MO_DELAY_s if realtime else 0,
+        getter=lambda: state['value'],
+        setter=setter,
+        name="MO current")
+
+
+async def prelock(locker: lock_buddy.LockBuddy,
+                  tuner: lock_buddy.Tuner) -> cs.DopplerLine:
+    dip = await locker.doppler_search(
+        tuner, judge=partial(locker.is_correct_line, tuner, reset=True))
+    for _ in range(cs.PRELOCK_TUNING_ATTEMPTS):
+        error = cs.SpecMhz(dip.distance - cs.PRELOCK_DIST_SWEET_SPOT_TO_DIP)
+        if abs(error) < cs.PRELOCK_TUNING_PRECISION:
+            return dip
+        await locker.tune(error, tuner)
+        dip = await locker.doppler_sweep(cs.PRELOCK_CENTERING_RESOLUTION)
+    raise lock_buddy.DriftError("Unable to center doppler line.")
+
+
+async def trial(detuning: float, realtime: bool) -> None:
+    model = simulated_daq.LaserModel(detuning=detuning)
+    daq = simulated_daq.SimulatedDaq(wiring=SIMULATED_DAQ_WIRING, model=model,
+                                     realtime=realtime)
+    scheduler = DaqScheduler(lambda: daq)
+
+    async def scanner(amplitude: float,
+                      resolution: cs.ScanResolution = cs.DAQ_SCAN_RESOLUTION
+                     ) -> cs.SpecScan:
+        return await scheduler.fetch_scan(
+            amplitude * cs.DAQ_MAX_SCAN_AMPLITUDE, resolution.time,
+            [(DaqInput.RAMP_MONITOR, mccdaq.InputRange.PM_10V),
+             (DaqInput.ERR_SIGNAL, mccdaq.InputRange.PM_1V),
+             (DaqInput.DETECTOR_LOG, mccdaq.InputRange.PM_5V)],
+            mccdaq.RampShape.DESCENT, n_samples=resolution.n_samples,
+            oversampling=resolution.oversampling)
+
+    locker = lock_buddy.LockBuddy(
+        lock=lambda: None, unlock=lambda: None,
+        locked=lambda: lock_buddy.LockboxState.DISENGAGED,
+        scanner=scanner, scanner_range=cs.LaserMhz(700),
+        lockbox=lock_buddy.Tuner(1, .5, 0, lambda: .5, lambda _: None))
+    start = time.monotonic()
+    cpu_start = time.process_time()
+    try:
+        await prelock(locker, create_tuner(model, realtime))
+        outcome = "offset {:7.1f} MHz".format(
+            -model.detuning - cs.PRELOCK_DIST_SWEET_SPOT_TO_DIP)
+    except lock_buddy.LockError as err:
+        outcome = type(err).__name__
+    print("start {:7.1f} MHz  {:3} scans  {:6.1f} s  CPU {:5.2f} s  {}".format(
+        detuning, daq.n_acquisitions, time.monotonic() - start,
+        time.process_time() - cpu_start, outcome))
+
+
+def main() -> None:
+    n_trials = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    realtime = 'fast' not in sys.argv[2:]
+    rand = random.Random(0)
+    loop = asyncio.get_event_loop()
+    for _ in range(n_trials):
+        loop.run_until_complete(trial(rand.uniform(-MAX_DETUNING, MAX_DETUNING),
+                                      realtime))
+
+
+if __name__ == '__main__':
+    main()
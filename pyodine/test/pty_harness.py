@@ -0,0 +1,46 @@
+"""A pseudo terminal standing in for a serial link.
+
+Code under test opens ``PtyLink.device`` like any serial port, while the test
+talks to the other end.  No hardware involved.
+"""
+import os
+import select
+import tty
+
+
+class PtyLink:
+    """Both ends of a pseudo terminal."""
+
+    def __init__(self) -> None:
+        self.master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        os.set_blocking(self.master, False)
+        self.device = os.ttyname(self._slave)
+        """Path of the end to be opened by the code under test."""
+
+    def write(self, data: bytes) -> None:
+        """Send ``data`` to the code under test."""
+        os.write(self.master, data)
+
+    def read(self, n_bytes: int, timeout: float = 1.) -> bytes:
+        """Receive what the code under test sent.
+
+        :returns: ``n_bytes`` or less, if the timeout was hit.
+        """
+        data = b''
+        while len(data) < n_bytes:
+            readable, _, _ = select.select([self.master], [], [], timeout)
+            if not readable:
+                break
+            data += os.read(self.master, n_bytes - len(data))
+        return data
+
+    def close(self) -> None:
+        os.close(self.master)
+        os.close(self._slave)
+
+    def __enter__(self) -> 'PtyLink':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
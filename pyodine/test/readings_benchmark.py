@@ -0,0 +1,56 @@
+"""Compare the cost of assembling the readings for publication.
+
+Run as a module from the repository root:
+
+    python -m pyodine.test.readings_benchmark [n_cycles]
+
+A simulated Menlo stack receives messages at several rates.  After every
+publication interval's worth of messages, the readings since the last
+publication are assembled, once by calling all Menlo getters and once as a
+snapshot of the ``ReadingsAggregator``.
+"""
+import sys
+import time
+
+from ..controller import lock_buddy  # pylint: disable=unused-import
+from ..controller.readings_aggregator import ReadingsAggregator
+from ..controller.subsystems import READINGS_STATE_KEYS, get_readings_sources
+from ..drivers import menlo_stack
+from .simulated_menlo import MenloFeed, make_stack, read_all_getters
+
+RATES = [100, 1000, 5000]
+"""Messages per second received from the stack."""
+INTERVAL = .5
+"""Seconds between publications."""
+
+
+def benchmark(rate: int, n_cycles: int) -> None:
+    n_messages = int(rate * INTERVAL)
+    menlo = make_stack()
+    feed = MenloFeed(menlo)
+    aggregator = ReadingsAggregator(menlo, get_readings_sources(menlo),
+                                    READINGS_STATE_KEYS)
+    feed.feed(n_messages)
+    getters = snapshots = 0.
+    for _ in range(n_cycles):
+        since = time.time()
+        feed.feed(n_messages)
+        start = time.perf_counter()
+        read_all_getters(menlo, since)
+        middle = time.perf_counter()
+        aggregator.snapshot(since)
+        getters += middle - start
+        snapshots += time.perf_counter() - middle
+    print("{:5} msg/s  getters {:7.1f} us/cycle  snapshot {:7.1f} us/cycle".format(
+        rate, getters / n_cycles * 1e6, snapshots / n_cycles * 1e6))
+
+
+def main() -> None:
+    n_cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    menlo_stack.LOG_QUANTITIES = False
+    for rate in RATES:
+        benchmark(rate, n_cycles)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Compare scan resolutions by latency and by how well they locate the line.
+
+Run as a module from the repository root:
+
+    python -m pyodine.test.scan_resolution_benchmark [n_scans [fast]]
+
+For every resolution, the simulated laser is put at random positions near the
+doppler line and scanned ``n_scans`` times.  Reported are the time a scan takes
+and the RMS error of the line position found by ``ScanPipeline``.  Pass "fast"
+to skip waiting for acquisitions, which leaves only the processing time.
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from ..analysis import signals
+from ..controller import lock_buddy  # pylint: disable=unused-import
+from ..controller.subsystems import DaqInput, SIMULATED_DAQ_WIRING
+from ..drivers import mccdaq, simulated_daq
+from .. import constants as cs
+
+CHANNELS = [(DaqInput.RAMP_MONITOR, mccdaq.InputRange.PM_10V),
+            (DaqInput.ERR_SIGNAL, mccdaq.InputRange.PM_1V),
+            (DaqInput.DETECTOR_LOG, mccdaq.InputRange.PM_5V)]
+RESOLUTIONS = [
+    ('search', cs.PRELOCK_SEARCH_RESOLUTION),
+    ('default', cs.DAQ_SCAN_RESOLUTION),
+    ('centering', cs.PRELOCK_CENTERING_RESOLUTION),
+    ('coarse, slow', cs.ScanResolution(n_samples=640, time=.5, oversampling=4)),
+    ('fine, fast', cs.ScanResolution(n_samples=2560, time=.125, oversampling=1))]
+MAX_DETUNING = 300
+"""Stay within ~ SpecMhz of the line, so it is always in the scan."""
+
+
+def benchmark(resolution: cs.ScanResolution, n_scans: int,
+              realtime: bool) -> None:
+    model = simulated_daq.LaserModel(seed=0)
+    daq = simulated_daq.SimulatedDaq(wiring=SIMULATED_DAQ_WIRING, model=model,
+                                     realtime=realtime)
+    pipeline = signals.ScanPipeline()
+    rand = random.Random(0)
+    errors = []
+    start = time.monotonic()
+    for _ in range(n_scans):
+        model.detuning = rand.uniform(-MAX_DETUNING, MAX_DETUNING)
+        scan = daq.fetch_scan(cs.DAQ_MAX_SCAN_AMPLITUDE, resolution.time,
+                              CHANNELS, mccdaq.RampShape.DESCENT,
+                              n_samples=resolution.n_samples,
+                              oversampling=resolution.oversampling)
+        try:
+            dip = pipeline.locate_doppler_line(scan)
+        except ValueError:
+            errors.append(np.nan)
+            continue
+        errors.append(dip.distance + model.detuning)
+    elapsed = (time.monotonic() - start) / n_scans
+    n_missed = int(np.isnan(errors).sum())
+    print("{:4} x {:5.3f} s x {}  {:6.3f} s/scan  RMS error {:5.1f} MHz  "
+          "{} missed".format(resolution.n_samples, resolution.time,
+                             resolution.oversampling, elapsed,
+                             float(np.sqrt(np.nanmean(np.square(errors)))),
+                             n_missed))
+
+
+def main() -> None:
+    n_scans = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    realtime = 'fast' not in sys.argv[2:]
+    for name, resolution in RESOLUTIONS:
+        print("{:13}".format(name), end='')
+        benchmark(resolution, n_scans, realtime)
+
+
+if __name__ == '__main__':
+    main()
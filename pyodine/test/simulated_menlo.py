@@ -0,0 +1,98 @@
+"""Feed a ``MenloStack`` with made-up replies, as if there was a stack.
+
+No connection is made.  The replies are passed to the stack like they would be
+received from its websocket, one packed message at a time.
+"""
+import random
+from typing import Dict, List, Tuple  # pylint: disable=unused-import
+
+from ..controller import lock_buddy  # pylint: disable=unused-import
+from ..controller.subsystems import (LOCKBOX_ID, TEC_CONTROLLERS, LdDriver,
+                                     TecUnit, _LD_CARDS)
+from ..drivers import menlo_stack
+
+SERVICES = ([(node, svc) for node in menlo_stack.OSC_NODES
+             for svc in menlo_stack.OSC_SVC_GET]
+            + [(node, svc) for node in menlo_stack.PII_NODES
+               for svc in menlo_stack.PII_SVC_GET]
+            + [(menlo_stack.ADC_NODE, svc) for svc in menlo_stack.ADC_SVC_GET])
+"""All services the stack sends readings of."""
+FLAGS = {(node, svc) for node in menlo_stack.OSC_NODES for svc in (288, 304, 305)} | {
+    (node, svc) for node in menlo_stack.PII_NODES for svc in (304, 305, 306, 307)}
+
+
+def make_stack() -> menlo_stack.MenloStack:
+    """A stack that is ready to receive replies."""
+    stack = menlo_stack.MenloStack()
+    stack._init_buffers()  # pylint: disable=protected-access
+    return stack
+
+
+class MenloFeed:  # pylint: disable=too-few-public-methods
+    """Makes up replies of random services."""
+
+    def __init__(self, stack: menlo_stack.MenloStack, seed: int = 0) -> None:
+        self._stack = stack
+        self._random = random.Random(seed)
+
+    def feed(self, n_messages: int, values_per_message: int = 4) -> None:
+        """Pass ``n_messages`` packed messages to the stack."""
+        self.receive(self.make_messages(n_messages, values_per_message))
+
+    def receive(self, messages: List[str]) -> None:
+        """Pass ``messages`` to the stack, as if they were received."""
+        for message in messages:
+            self._stack._parse_reply(message)  # pylint: disable=protected-access
+
+    def make_messages(self, n_messages: int,
+                      values_per_message: int = 4) -> List[str]:
+        """Packed messages of ``values_per_message`` random services each."""
+        messages = []
+        for _ in range(n_messages):
+            replies = []
+            for node, svc in self._random.sample(SERVICES, values_per_message):
+                replies.append('{}:{}:{}'.format(node, svc,
+                                                 self._make_value(node, svc)))
+            messages.append('@'.join(replies))
+        return messages
+
+    def _make_value(self, node: int, svc: int) -> str:
+        if (node, svc) in FLAGS:
+            return str(self._random.randint(0, 1))
+        if node in menlo_stack.OSC_NODES and svc in (256, 272):
+            return str(self._random.randint(500, 2000))  # temperatures
+        if node == menlo_stack.ADC_NODE:
+            return str(self._random.uniform(-5, 5))
+        return str(self._random.randint(0, 4000))
+
+
+def read_all_getters(menlo: menlo_stack.MenloStack,
+                     since: float = None) -> Dict[str, menlo_stack.Buffer]:
+    """The Menlo readings of ``Subsystems.get_full_set_of_readings()``,
+    assembled by calling every getter.
+    """
+    data = {}  # type: Dict[str, menlo_stack.Buffer]
+    for channel in range(8):
+        data['adc' + str(channel)] = menlo.get_adc_voltage(channel, since)
+    for name, unit in [('mo', LdDriver.MASTER_OSCILLATOR),
+                       ('pa', LdDriver.POWER_AMPLIFIER)]:
+        data[name + '_enabled'] = menlo.is_current_driver_enabled(unit)
+        data[name + '_current'] = menlo.get_diode_current(_LD_CARDS[unit], since)
+        data[name + '_current_set'] = menlo.get_diode_current_setpoint(_LD_CARDS[unit])
+    for name, unit2 in TEC_CONTROLLERS.items():
+        unt = TecUnit(unit2)
+        data[name + '_tec_enabled'] = menlo.is_tec_enabled(unt)
+        data[name + '_temp'] = menlo.get_temperature(unt, since)
+        data[name + '_temp_raw_set'] = menlo.get_temp_setpoint(unt)
+        data[name + '_temp_ok'] = menlo.is_temp_ok(unt)
+        data[name + '_tec_current'] = menlo.get_tec_current(unt, since)
+    data['nu_lock_enabled'] = menlo.is_lock_enabled(LOCKBOX_ID)
+    data['nu_i1_enabled'] = menlo.is_integrator_enabled(LOCKBOX_ID, 1)
+    data['nu_i2_enabled'] = menlo.is_integrator_enabled(LOCKBOX_ID, 2)
+    data['nu_ramp_enabled'] = menlo.is_ramp_enabled(LOCKBOX_ID)
+    data['nu_prop'] = menlo.get_error_scale(LOCKBOX_ID)
+    data['nu_offset'] = menlo.get_error_offset(LOCKBOX_ID)
+    data['nu_p_monitor'] = menlo.get_pii_monitor(LOCKBOX_ID, p_only=True,
+                                                 since=since)
+    data['nu_monitor'] = menlo.get_pii_monitor(LOCKBOX_ID, since=since)
+    return data
@@ -0,0 +1,65 @@
+"""Tests for the ``DeDupQueue``."""
+import time
+import pytest
+from pyodine.util.asyncio_tools import DeDupQueue
+
+
+def pop_all(queue: DeDupQueue) -> list:
+    """Empty the queue and return what came out, in order."""
+    items = []
+    while queue:
+        items.append(queue.pop())
+    return items
+
+
+def test_fifo_with_replacement():
+    """Specimens replace queued ones of their species and keep its place."""
+    queue = DeDupQueue()
+    for specimen, species in [(1, 'a'), (2, 'b'), (3, 'a'), (4, 'c')]:
+        queue.enqueue(specimen, species)
+    assert len(queue) == 3
+    assert pop_all(queue) == [3, 2, 4]
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+def test_priorities():
+    """Higher priority species are popped first, FIFO otherwise."""
+    queue = DeDupQueue(priorities={'texus': 2, 'signal': -1})
+    for species in ['signal', 'readings', 'texus', 'setup']:
+        queue.enqueue(species, species)
+    assert pop_all(queue) == ['texus', 'readings', 'setup', 'signal']
+
+
+def test_expiry():
+    """Specimens older than their max age are discarded and counted."""
+    queue = DeDupQueue(max_ages={'signal': 0.01})
+    queue.enqueue('old', 'signal')
+    queue.enqueue('texus', 'texus')
+    time.sleep(0.02)
+    assert pop_all(queue) == ['texus']
+    assert queue.n_expired == 1
+
+
+def test_replacing_resets_age():
+    """A replaced specimen is only as old as its replacement."""
+    queue = DeDupQueue(max_ages={'signal': 0.05})
+    queue.enqueue('old', 'signal')
+    queue.enqueue('readings', 'readings')
+    time.sleep(0.04)
+    queue.enqueue('new', 'signal')
+    time.sleep(0.04)  # The first specimen would have expired by now.
+    assert pop_all(queue) == ['new', 'readings']
+    assert queue.n_expired == 0
+
+
+def test_pop_by_key():
+    """A custom key decides which specimen is popped."""
+    queue = DeDupQueue(priorities={'texus': 1})
+    for species in ['signal', 'readings', 'texus']:
+        queue.enqueue(species, species)
+    ranks = {'signal': 0, 'readings': 1, 'texus': 0}
+    assert queue.pop(key=lambda species, _: ranks[species]) == 'texus'
+    assert queue.pop(key=lambda species, _: ranks[species]) == 'signal'
+    assert queue.items() == [('readings', 'readings')]
+    assert len(queue) == 1
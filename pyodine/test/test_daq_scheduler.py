@@ -0,0 +1,63 @@
+"""Tests for the ``DaqScheduler``, using a fake DAQ."""
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from pyodine.controller.daq_scheduler import DaqPriority, DaqScheduler
+from pyodine.drivers.mccdaq import DaqChannel, InputRange, RampShape
+
+
+class FakeDaq:
+    """Reads channel ``n`` as ``n``.  Records all acquisitions."""
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    def fetch_scan(self, amplitude, duration, channels, shape, back_to_back=False,
+                   n_samples=2560, oversampling=1):
+        self.calls.append('scan')
+        time.sleep(0.05)
+        return np.zeros((10, len(channels)), dtype=np.uint16)
+
+    def sample_channels(self, channels, n_samples=1):
+        self.calls.append([int(c[0]) for c in channels])
+        return np.tile([int(c[0]) for c in channels], (n_samples, 1))
+
+
+def channels(*numbers):
+    """The given channels, all in the 5V range."""
+    return [(DaqChannel(n), InputRange.PM_5V) for n in numbers]
+
+
+def test_merges_and_prioritizes(loop):
+    """Queued requests are merged and served by priority after the scan."""
+    daq = FakeDaq()
+    scheduler = DaqScheduler(lambda: daq)
+
+    async def run():
+        scan = asyncio.ensure_future(scheduler.fetch_scan(
+            1, 0.1, channels(0, 1), RampShape.DESCENT))
+        await asyncio.sleep(0.01)  # Scan is running now.
+        light = scheduler.sample_channels(channels(3, 4), DaqPriority.PHOTODIODES)
+        temps = scheduler.sample_channels(channels(4, 5, 6), DaqPriority.TEMPERATURES)
+        monitor = scheduler.fetch_scan(1, 0.1, channels(0), RampShape.DESCENT,
+                                       DaqPriority.LOCK_MONITOR)
+        return await asyncio.gather(scan, light, temps, monitor)
+
+    _, light, temps, _ = loop.run_until_complete(run())
+    assert light.tolist() == [[3, 4]]
+    assert temps.tolist() == [[4, 5, 6]]
+    assert daq.calls == ['scan', 'scan', [4, 5, 6, 3]]
+    stats = scheduler.get_stats()
+    assert stats['n_acquisitions'] == 3
+    assert stats['priorities']['PHOTODIODES']['max_wait_time'] > 0.05
+
+
+def test_errors_reach_callers(loop):
+    """Failing to get the DAQ raises in the caller's task."""
+    scheduler = DaqScheduler(lambda: None)
+    with pytest.raises(ConnectionError):
+        loop.run_until_complete(
+            scheduler.sample_channels(channels(0), DaqPriority.TEMPERATURES))
@@ -0,0 +1,105 @@
+"""Tests for the asyncio DDS9 driver, talking to an emulated DDS9m."""
+import asyncio
+
+import pytest
+
+from pyodine.drivers.dds9_async import AsyncDds9Control
+from pyodine.test.dds9_emulator import Dds9Emulator
+from pyodine.util import asyncio_tools as tools
+
+
+@pytest.fixture
+def emulator():
+    """A DDS9m emulator that answers immediately."""
+    with Dds9Emulator(realtime=False) as emulator:
+        yield emulator
+
+
+@pytest.fixture
+def dds(loop, emulator):  # pylint: disable=redefined-outer-name
+    """An initialized driver for the emulated device."""
+    dds = AsyncDds9Control(emulator.device)
+    loop.run_until_complete(dds.init_async())
+    yield dds
+    dds.close()
+
+
+def test_setters_are_pipelined_and_cached(loop, emulator, dds):  # pylint: disable=redefined-outer-name
+    """Setters are sent back to back and tracked without querying."""
+    n_commands = len(emulator.commands)
+    loop.run_until_complete(asyncio.gather(dds.set_frequency(150.3, 1),
+                                           dds.set_amplitude(.5),
+                                           dds.set_phase(90, 2)))
+    assert 'QUE' not in emulator.commands[n_commands:]
+    assert len(emulator.commands) - n_commands == 6
+    assert abs(dds.frequencies[1] - 150.3) < 1e-6
+    assert dds.amplitudes == 4 * [511 / 1023]
+    assert abs(dds.phases[2] - 90) < .1
+    assert loop.run_until_complete(dds.verify())
+
+
+def test_superseded_settings_are_skipped(loop, emulator, dds):  # pylint: disable=redefined-outer-name
+    """Settings overwritten while queued are never sent."""
+    n_commands = len(emulator.commands)
+    loop.run_until_complete(asyncio.gather(
+        *[dds.set_amplitude(i / 100, 0) for i in range(30)]))
+    sent = emulator.commands[n_commands:]
+    assert len(sent) < 30
+    assert sent[-1] == 'V0 {}'.format(int(.29 * 1023))
+    assert dds.n_superseded == 30 - len(sent)
+    assert emulator.registers['V'][0] == int(.29 * 1023)
+
+
+def test_garbled_response(loop, emulator, dds):  # pylint: disable=redefined-outer-name
+    """A garbled response fails the request but not the next one."""
+    emulator.n_garbled = 1
+    with pytest.raises(ConnectionError):
+        loop.run_until_complete(dds.set_phase(10, 0))
+    assert loop.run_until_complete(dds.ping())
+
+
+def test_stalled_device(loop, emulator, dds):  # pylint: disable=redefined-outer-name
+    """A stalled device fails requests and recovers when back."""
+    emulator.stalled = True
+    with pytest.raises(ConnectionError):
+        loop.run_until_complete(dds.set_phase(10, 0))
+    assert not loop.run_until_complete(dds.ping())
+    emulator.stalled = False
+    assert loop.run_until_complete(dds.ping())
+
+
+def test_poller_reconnects_after_stall(loop, emulator):  # pylint: disable=redefined-outer-name
+    """The DDS part of ``Subsystems``: Lose the device and get it back."""
+    dds = []
+    events = []
+
+    async def alive() -> bool:
+        return bool(dds) and await dds[0].ping()
+
+    async def reset() -> None:
+        while dds:
+            dds.pop().close()
+        attempt = AsyncDds9Control(emulator.device)
+        try:
+            await attempt.init_async()
+        except ConnectionError:
+            return
+        dds.append(attempt)
+
+    async def wait_for(n_events: int) -> None:
+        while len(events) < n_events:
+            await asyncio.sleep(.05)
+
+    poller = asyncio.ensure_future(tools.poll_resource(
+        alive, .1, reset, lambda: events.append('up'),
+        lambda: events.append('down'), continuous=True))
+    loop.run_until_complete(asyncio.wait_for(wait_for(1), 5))
+    emulator.stalled = True
+    loop.run_until_complete(asyncio.wait_for(wait_for(2), 5))
+    emulator.stalled = False
+    loop.run_until_complete(asyncio.wait_for(wait_for(3), 10))
+    poller.cancel()
+    loop.run_until_complete(asyncio.wait([poller]))
+    assert events == ['up', 'down', 'up']
+    assert loop.run_until_complete(dds[0].ping())
+    dds[0].close()
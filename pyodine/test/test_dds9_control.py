@@ -2,14 +2,14 @@
 
 It is not to be run manually but will instead be found and invoked
 automatically by the Pytest test suite.
-Obviously, mosts tests require a working DDS9 device connected to a accessible
-serial port. However, some basic tests can also be run in "offline" mode, which
-can be enabled below (``is_dds9_connected``).
+Most tests are meant for a working DDS9 device connected to an accessible
+serial port. If there is none, they talk to an emulated DDS9m instead.
 """
 import os
 import pytest
 import serial
 from pyodine.drivers.dds9_control import Dds9Control
+from pyodine.test.dds9_emulator import Dds9Emulator
 
 __author__ = 'Franz Gutsch'
 
@@ -17,21 +17,30 @@ wrong_port = '/dev/tty0'    # Port must not be accessible (ConnectionError).
 dead_port = '/dev/ttyUSB3'  # must be accessible, but no device is connected
 live_port = '/dev/ttyUSB2'  # DDS9m must be connected to that port
 
-# Most tests can only be performed when there is a live DDS9m device available.
+# Some tests only make sense when there is a live DDS9m device available.
 # We create a marker here to skip those tests automatically if there is no
 # device connected.
-is_dds9_connected = True   # For now, just manually hard-code this value!
+is_dds9_connected = os.path.exists(live_port)
 
 needs_live_device = pytest.mark.skipif(
         not is_dds9_connected, reason="No actual DDS9 is plugged in.")
 
 
+@pytest.fixture
+def emulator():
+    """A DDS9m, emulated in real time."""
+    with Dds9Emulator() as emulator:
+        yield emulator
+
+
 # Provide a fixture to avoid opening and closing the device connection for
 # every single test.
 @pytest.fixture
-def dds9():
-    """Provides the serial connection to the actual DDS9 device."""
-    return Dds9Control(live_port)
+def dds9(emulator):  # pylint: disable=redefined-outer-name
+    """Provides the serial connection to the actual DDS9 device or, if there
+    is none, to the emulated one.
+    """
+    return Dds9Control(live_port if is_dds9_connected else emulator.device)
 
 
 def test__parse_query_result_on_valid_string():
@@ -54,6 +63,52 @@ def test__parse_query_result_on_invalid_string():
     assert settings_object.is_zero() is True
 
 
+def test_setters_update_cached_state(emulator):  # pylint: disable=redefined-outer-name
+    """Setters don't query the device, but their effect shows nonetheless."""
+    emulator.realtime = False
+    dds = Dds9Control(emulator.device)
+    n_commands = len(emulator.commands)
+    dds.set_frequency(150.3, 1)
+    dds.set_amplitude(.5)
+    dds.set_phase(90, 2)
+    assert emulator.commands[n_commands:] == [
+        'F1 ' + '{:.7f}'.format(150.3 * dds._freq_scale_factor),
+        'V0 511', 'V1 511', 'V2 511', 'V3 511', 'P2 4095']
+    assert abs(dds.frequencies[1] - 150.3) < 1e-6
+    assert dds.amplitudes == 4 * [511 / 1023]
+    assert abs(dds.phases[2] - 90) < .1
+    assert 'QUE' not in emulator.commands[n_commands:]
+    assert dds.verify() is True
+    emulator.registers['V'][3] = 0  # Someone else changed it.
+    assert dds.verify() is False
+    assert dds.amplitudes[3] == 0
+
+
+def test_faulty_device(emulator):  # pylint: disable=redefined-outer-name
+    """Garbled or missing responses make the device look dead."""
+    dds = Dds9Control(emulator.device)
+    emulator.n_garbled = 1
+    assert dds.ping() is False
+    assert dds.ping() is True
+    emulator.stalled = True
+    assert dds.ping() is False
+    emulator.stalled = False
+    assert dds.ping() is True
+
+
+def test_split_responses(emulator):  # pylint: disable=redefined-outer-name
+    """Responses arriving in several pieces are read completely and don't
+    leak into the next one."""
+    dds = Dds9Control(emulator.device)
+    emulator.registers['V'] = [100, 200, 300, 400]
+    assert dds.verify() is False  # Long "QUE" response.
+    assert dds.amplitudes == [v / 1023 for v in (100, 200, 300, 400)]
+    assert dds._send_command('V0 100') == 'OK\r\n'
+    dds.set_amplitude(.5, 3)
+    assert dds.verify() is True
+    assert emulator.registers['V'][3] == 511
+
+
 def test_connect_to_dead_port():
     """Serial port is not accessible."""
     with pytest.raises(serial.SerialException):
@@ -69,7 +124,6 @@ def test_connect_to_dead_device():
         assert device.ping() is False
 
 
-@needs_live_device
 def test_check_device_sanity(dds9: Dds9Control):
     """Connection to device is established and device is in non-zero state."""
     assert dds9.ping() is True
@@ -86,7 +140,6 @@ def test_recognize_illegal_command(dds9: Dds9Control):
     assert response.find('?4') > 0
 
 
-@needs_live_device
 def test_set_phase(dds9: Dds9Control):
     """Device accepts and saves phase settings."""
     dds9.reset()
@@ -99,7 +152,6 @@ def test_set_phase(dds9: Dds9Control):
     assert max(diff) < 1
 
 
-@needs_live_device
 def test_set_amplitudes(dds9: Dds9Control):
     """Device accepts and saves amplitude settings."""
     dds9.reset()
@@ -112,10 +164,10 @@ def test_set_amplitudes(dds9: Dds9Control):
     assert max(diff) < 0.01
 
 
-@needs_live_device
 def test_set_frequency(dds9: Dds9Control):
     """Device accepts and saves frequency settings."""
     dds9.reset()
+    dds9.switch_to_int_reference()  # The cap is for the internal clock.
     dds9.set_frequency(123)
     dds9.set_frequency(0.007, 1)
     dds9.set_frequency(1000, 2)  # will be capped to 171 MHz!
@@ -129,7 +181,6 @@ def test_set_frequency(dds9: Dds9Control):
     assert max(diff) < 1e-8
 
 
-@needs_live_device
 def test_pause_resume(dds9: Dds9Control):
     """The pause and resume methods act on the amplitude as expected."""
     dds9.reset()
@@ -144,7 +195,6 @@ def test_pause_resume(dds9: Dds9Control):
     assert dds9.amplitudes == 4*[1]
 
 
-@needs_live_device
 def test_switch_reference_source(dds9: Dds9Control):
     """Switching the frequency reference clock throws no errors.
 
@@ -161,7 +211,6 @@ def test_switch_reference_source(dds9: Dds9Control):
     assert max([abs(freq1[i] - freq3[i]) for i in range(4)]) < 1e-6
 
 
-@needs_live_device
 def test_set_frequency_on_external_clock(dds9: Dds9Control):
     """Device accepts and applies frequency settings when on ext. clock."""
     dds9.reset()
@@ -182,7 +231,6 @@ def test_set_frequency_on_external_clock(dds9: Dds9Control):
     assert max(diff) < 1e-8
 
 
-@needs_live_device
 def test_get_settings(dds9: Dds9Control):
     """Instance is fueled by a full set of valid settings.
 
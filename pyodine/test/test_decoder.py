@@ -0,0 +1,75 @@
+"""Tests for chopping a byte stream into messages."""
+import numpy as np
+from pyodine.transport import packer
+from pyodine.transport.decoder import Decoder
+
+
+def chunks(data: bytes, size: int):
+    """`data`, cut into pieces of `size` bytes."""
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_messages_split_into_chunks():
+    """Messages are reassembled however the stream was chunked."""
+    messages = [packer.create_message({'val': i, 'pad': 'x' * 100 * i},
+                                      'readings') for i in range(5)]
+    stream = ''.join(messages).encode()
+    for size in (1, 3, 64, len(stream)):
+        decoder = Decoder()
+        for chunk in chunks(stream, size):
+            decoder.feed(chunk)
+        assert decoder.n_pending() == len(messages)
+        assert decoder.harvest() == messages
+        assert decoder.n_pending() == 0
+
+
+def test_garbage_is_dropped():
+    """Bytes that don't belong to a message are skipped."""
+    message = packer.create_message({'a': 1}, 'setup')
+    decoder = Decoder()
+    decoder.feed(b'garbage}\n\n\n' + message[:10].encode())
+    decoder.feed(message[10:].encode())
+    assert decoder.harvest() == [message]
+
+
+def test_frame_round_trip():
+    """Binary frames decode to what was packed, with arrays restored."""
+    signal = np.arange(30, dtype=np.uint16).reshape(10, 3)
+    payload = {'data': signal, 'shape': signal.shape,
+               'adc0': [(1.5, 2.), (1., 3.)], 'empty': [], 'name': 'foo'}
+    frame = packer.create_frame(payload, 'signal')
+    assert len(frame) % packer.FRAME_ALIGNMENT == 0
+    msg_type, decoded = packer.parse_frame(frame)
+    assert msg_type == 'signal'
+    assert np.array_equal(decoded['data'], signal)
+    assert decoded['adc0'] == [[1.5, 2.], [1., 3.]]
+    assert decoded['shape'] == [10, 3]
+    assert decoded['empty'] == [] and decoded['name'] == 'foo'
+
+
+def test_compressed_frame():
+    """Large frames are deflated and still decode; small ones stay raw."""
+    signal = np.zeros((1000, 3), dtype=np.uint16)
+    frame = packer.create_frame({'data': signal}, 'signal', compress_above=100)
+    assert len(frame) < signal.nbytes
+    msg_type, decoded = packer.parse_frame(frame)
+    assert msg_type == 'signal'
+    assert np.array_equal(decoded['data'], signal)
+
+    small = packer.create_frame({'a': 1}, 'setup', compress_above=100)
+    assert small == packer.create_frame({'a': 1}, 'setup')
+    decoder = Decoder()
+    decoder.feed(small + frame)
+    assert decoder.n_pending() == 2
+
+
+def test_frames_interleaved_with_messages():
+    """Frames and JSON messages are told apart in one stream."""
+    frame = packer.create_frame({'data': np.arange(5000, dtype=np.uint16)},
+                                'signal')
+    message = packer.create_message({'a': 1}, 'setup')
+    stream = frame + message.encode() + b'junk' + frame
+    decoder = Decoder()
+    for chunk in chunks(stream, 7):
+        decoder.feed(chunk)
+    assert decoder.harvest() == [frame, message, frame]
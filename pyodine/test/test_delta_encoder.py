@@ -0,0 +1,91 @@
+"""Tests for the delta encoding of readings."""
+from pyodine.transport.delta_encoder import (DeltaEncoder, is_empty,
+                                             signature, to_payload)
+
+
+def readings(now: float, enabled: int = 1) -> dict:
+    """A set of readings as the aggregator would deliver them at `now`."""
+    return {'temp': [(now - 1, 20.), (now, 21.)],
+            'enabled': [(now, enabled)],
+            'empty': []}
+
+
+def test_first_delta_is_keyframe():
+    """The first delta carries the full state."""
+    encoder = DeltaEncoder(['enabled'])
+    delta = encoder.encode(readings(10), 10)
+    assert delta.is_keyframe
+    assert delta.readings == readings(10)
+    assert encoder.since is None  # Nothing committed yet.
+    encoder.commit(delta)
+    assert encoder.since == 10
+
+
+def test_only_changes_are_sent():
+    """Later deltas contain only what changed."""
+    encoder = DeltaEncoder(['enabled'], keyframe_interval=100)
+    encoder.commit(encoder.encode(readings(10), 10))
+
+    delta = encoder.encode(readings(11), 11)
+    assert not delta.is_keyframe
+    assert delta.readings == {'temp': [(11, 21.)], 'empty': []}
+    encoder.commit(delta)
+
+    delta = encoder.encode(readings(12, enabled=0), 12)
+    assert delta.readings == {'temp': [(12, 21.)], 'enabled': [(12, 0)],
+                              'empty': []}
+
+
+def test_series_without_new_points_are_sent_empty():
+    """Unchanged series are sent without points."""
+    encoder = DeltaEncoder(['nu_lock_enabled'], keyframe_interval=100)
+    data = {'nu_monitor': [(10, 1.)], 'nu_p_monitor': [(10, 2.)],
+            'nu_lock_enabled': [(10, 1)]}
+    encoder.commit(encoder.encode(data, 10))
+    delta = encoder.encode(data, 11)  # No new PII points.
+    assert delta.readings == {'nu_monitor': [], 'nu_p_monitor': []}
+    assert is_empty(delta)
+    assert to_payload(delta) == {'nu_monitor': [], 'nu_p_monitor': [],
+                                 'keyframe': False}
+
+
+def test_uncommitted_deltas_are_resent():
+    """Changes that were never committed are sent again."""
+    encoder = DeltaEncoder(['enabled'], keyframe_interval=100)
+    encoder.commit(encoder.encode(readings(10), 10))
+    encoder.encode(readings(11, enabled=0), 11)  # Never sent.
+    both = {'temp': [(10, 20.), (11, 21.), (12, 22.)], 'enabled': [(12, 0)]}
+    assert encoder.encode(both, 12).readings == {
+        'temp': [(11, 21.), (12, 22.)], 'enabled': [(12, 0)]}
+
+
+def test_periodic_keyframes():
+    """A full keyframe is sent at the configured interval."""
+    encoder = DeltaEncoder(['enabled'], keyframe_interval=3)
+    flags = []
+    for now in range(7):
+        delta = encoder.encode(readings(now), now)
+        flags.append(delta.is_keyframe)
+        encoder.commit(delta)
+    assert flags == [True, False, False, True, False, False, True]
+
+
+def test_keyframes_dont_repeat_series_points():
+    """Keyframes resend settings but not old series points."""
+    encoder = DeltaEncoder(['enabled'], keyframe_interval=100)
+    encoder.commit(encoder.encode(readings(10), 10))
+    delta = encoder.encode(readings(11), 11, keyframe=True)
+    assert delta.is_keyframe
+    assert not is_empty(delta)
+    assert delta.readings == {'temp': [(11, 21.)], 'enabled': [(11, 1)],
+                              'empty': []}
+    assert to_payload(delta)['keyframe']
+
+
+def test_equal_deltas_have_equal_signatures():
+    """Deltas with equal content get equal signatures."""
+    first, second = DeltaEncoder(['enabled']), DeltaEncoder(['enabled'])
+    first.commit(first.encode(readings(10), 10))
+    second.commit(second.encode(readings(10), 10))
+    data = readings(11)
+    assert signature(first.encode(data, 11)) == signature(second.encode(data, 11))
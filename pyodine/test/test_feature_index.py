@@ -0,0 +1,37 @@
+"""Tests for the precomputed reference spectrum index."""
+import os
+import shutil
+import numpy as np
+from pyodine.analysis.feature_index import ReferenceIndex, IndexedFeatureLocator
+
+REF_FILE = os.path.join(os.path.dirname(__file__), 'data',
+                        'Analytic Spectrum (KD)_100kHz.bin')
+REF_SPAN = 1000
+
+
+def test_index_is_stored_and_reused(tmpdir):
+    """The index is saved next to the reference and loaded from there."""
+    ref_file = str(tmpdir.join('ref.bin'))
+    shutil.copy(REF_FILE, ref_file)
+    built = ReferenceIndex.for_file(ref_file)
+    assert os.path.isfile(ref_file + '.index.npz')
+    loaded = ReferenceIndex.for_file(ref_file)
+    for scale, features in built.features.items():
+        for built_array, loaded_array in zip(features, loaded.features[scale]):
+            assert np.array_equal(built_array, loaded_array)
+
+
+def test_locates_noisy_sample():
+    """Noisy, coarsely sampled parts of the reference are located."""
+    index = ReferenceIndex(np.fromfile(REF_FILE))
+    locator = IndexedFeatureLocator(index, REF_SPAN)
+    n_ref = len(index.reference)
+    noise = np.random.RandomState(0)
+    for start, width in [(3950, 1600), (7000, 2000)]:
+        sample = index.reference[start:start + width] + noise.normal(0, .1, width)
+        sample = sample[::10]  # Sample at lower rate than the reference.
+        matches = locator.locate_sample(
+            np.array([np.arange(len(sample)), sample], dtype=float),
+            width / n_ref * REF_SPAN)
+        best_position = matches[0][0]
+        assert abs(best_position - start / n_ref * REF_SPAN) < 1
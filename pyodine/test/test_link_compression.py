@@ -0,0 +1,38 @@
+"""Tests for the compressed RS232 message stream."""
+from pyodine.transport import link_compression, packer
+from pyodine.transport.decoder import Decoder
+
+
+def messages(n: int) -> list:
+    """A series of `n` similar readings messages."""
+    return [packer.create_message({'adc0': [[1.5e9 + i, 0.25]]}, 'readings')
+            for i in range(n)]
+
+
+def test_round_trip_through_decoder():
+    """Compressed messages survive the decoder and shrink by half."""
+    originals = messages(10)
+    dictionary = link_compression.train_dictionary(originals)
+    compressor = link_compression.LinkCompressor(dictionary)
+    stream = b''.join(compressor.compress(m) for m in originals)
+    assert len(stream) < sum(len(m) for m in originals) / 2
+
+    decoder = Decoder()
+    decoder.feed(stream)
+    frames = decoder.harvest()
+    assert all(link_compression.is_stream_frame(f) for f in frames)
+    decompressor = link_compression.LinkDecompressor(dictionary)
+    assert [decompressor.decompress(f).decode() for f in frames] == originals
+
+
+def test_recovers_after_loss():
+    """After a lost frame, decompression resumes at the next reset."""
+    compressor = link_compression.LinkCompressor(reset_interval=3)
+    frames = [compressor.compress(m) for m in messages(7)]
+    decompressor = link_compression.LinkDecompressor()
+    del frames[1]  # Lost in transmission.
+    restored = [decompressor.decompress(f) for f in frames]
+    assert restored[0] is not None
+    # The third message can't be restored, the fourth starts a new stream.
+    assert restored[1] is None
+    assert all(r is not None for r in restored[2:])
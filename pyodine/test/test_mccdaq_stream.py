@@ -0,0 +1,82 @@
+"""Tests for the DAQ's ``AcquisitionStream``, using a fake driver library."""
+import asyncio
+import ctypes as ct
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+from pyodine.drivers.mccdaq import AcquisitionStream, DaqChannel, InputRange
+
+CHANNELS = [(DaqChannel.C_0, InputRange.PM_5V),
+            (DaqChannel.C_3, InputRange.PM_2V)]
+
+
+class FakeLibrary:
+    """Delivers a counter as samples: channel ``i`` reads ``10 * n + i``."""
+
+    def __init__(self) -> None:
+        self.n_samples = 0
+        self.n_starts = 0
+
+    def StartStream(self, *_):  # pylint: disable=invalid-name
+        self.n_starts += 1
+        return 0
+
+    def ReadStream(self, n_samples, n_channels, readings, _):  # pylint: disable=invalid-name
+        buffer = (ct.c_uint16 * (n_samples * n_channels)).from_address(
+            ct.addressof(readings.contents))
+        counter = np.arange(self.n_samples, self.n_samples + n_samples)
+        data = np.frombuffer(buffer, dtype=np.uint16).reshape(n_samples, n_channels)
+        data[:] = 10 * counter[:, None] + np.arange(n_channels)
+        self.n_samples += n_samples
+        time.sleep(0.001)
+        return 0
+
+
+@pytest.fixture
+def stream():
+    """A stream on the fake library, stopped after the test."""
+    daq = types.SimpleNamespace(_lock=threading.Lock(), _daq=FakeLibrary())
+    stream = AcquisitionStream(daq, CHANNELS, frequency=1000., block_size=10,
+                               n_blocks=8)
+    yield stream
+    stream.stop()
+
+
+def test_latest(stream):
+    """The most recent samples are returned for the requested channels."""
+    with pytest.raises(BlockingIOError):
+        stream.latest(5)
+    stream.start()
+    while stream._n_done < 4:  # pylint: disable=protected-access
+        time.sleep(0.001)
+    stream.stop()
+    latest = stream.latest(25, [CHANNELS[1]])
+    assert latest.shape == (25, 1)
+    assert np.all(np.diff(latest[:, 0].astype(int)) == 10)
+    assert latest[-1, 0] % 10 == 1
+    assert stream.covers([CHANNELS[1]])
+    assert not stream.covers([(DaqChannel.C_3, InputRange.PM_5V)])
+    with pytest.raises(ValueError):
+        stream.latest(70)
+
+
+def test_subscribers_get_consecutive_blocks(loop, stream):
+    """Subscribers receive every block in order."""
+    async def consume():
+        queue = stream.subscribe()
+        stream.start()
+        received = []
+        for _ in range(5):
+            block = await queue.get()
+            first = int(block.data[0, 0])
+            if stream.is_current(block):
+                received.append((block.seq, first))
+        return received
+
+    received = loop.run_until_complete(asyncio.wait_for(consume(), 5))
+    assert [seq for seq, _ in received] == list(range(5))
+    assert [first for _, first in received] == [100 * seq for seq in range(5)]
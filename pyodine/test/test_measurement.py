@@ -0,0 +1,65 @@
+"""Tests for the frequency time series evaluation in ``analysis.measurement``.
+"""
+import allantools
+import numpy as np
+from pyodine.analysis import measurement
+
+
+def test_streaming_adev_matches_allantools():
+    """The streaming accumulator yields the overlapping ADEV of allantools."""
+    freqs = np.random.RandomState(1).randn(5000) + 1e6
+    accumulator = measurement.AdevAccumulator(0.5, resolution=16)
+    for block in np.array_split(freqs, 37):
+        accumulator.feed(block)
+    taus, devs, counts = accumulator.adev()
+
+    exact = taus <= 16 * 0.5  # Decimation kicks in for longer taus.
+    _, expected, _, expected_counts = allantools.oadev(
+        freqs, rate=2., data_type='freq', taus=taus[exact])
+    assert np.allclose(devs[exact], expected)
+    assert np.array_equal(counts[exact], expected_counts)
+    assert accumulator.n_samples == len(freqs)
+
+
+def test_adev_from_counter_dat(tmpdir):
+    """Counter files are evaluated chunk by chunk like in one piece."""
+    freqs = np.random.RandomState(2).randn(1000)
+    lines = ['header', 'header']
+    lines += ['{} {} x {}'.format(i, 0.1 * i, f) for i, f in enumerate(freqs)]
+    dat = tmpdir.join('counter.dat')
+    dat.write('\n'.join(lines) + '\n')
+
+    accumulator = measurement.adev_from_counter_dat(str(dat), chunk_size=99)
+    reference = measurement.AdevAccumulator(0.1)
+    reference.feed(freqs)
+    assert accumulator.sample_interval == reference.sample_interval
+    assert np.allclose(accumulator.adev()[1], reference.adev()[1])
+
+
+def test_cached_loader_matches_loadtxt(tmpdir):
+    """The chunked, cached loader yields what np.loadtxt() does."""
+    data = np.random.RandomState(3).rand(500, 4)
+    txt = tmpdir.join('cnt91.txt')
+    np.savetxt(str(txt), data, header='some header')
+    expected = np.loadtxt(str(txt), usecols=(3, 1), skiprows=1, unpack=True)
+
+    for _ in range(2):  # Parse and create cache, then load from cache.
+        loaded = measurement.load_columns(str(txt), (3, 1), 1)
+        assert np.allclose(loaded, expected, rtol=1e-15, atol=0)
+    assert tmpdir.join('cnt91.txt.cols3-1.skip1.npz').check()
+
+    np.savetxt(str(txt), data[:100], header='changed')
+    assert measurement.load_columns(str(txt), (3, 1), 1).shape == (2, 100)
+
+    msmnt = measurement.from_cnt91_txt(str(txt))
+    assert np.allclose(msmnt.frequencies, data[:100, 1], rtol=1e-15, atol=0)
+
+
+def test_cache_depends_on_skipped_rows(tmpdir):
+    """Loading a file with different ``skiprows`` doesn't use the same cache."""
+    data = np.arange(20.).reshape(10, 2)
+    txt = tmpdir.join('rows.txt')
+    np.savetxt(str(txt), data)
+    for skiprows in (0, 3, 0):
+        loaded = measurement.load_columns(str(txt), (0, 1), skiprows)
+        assert np.array_equal(loaded, data[skiprows:].T)
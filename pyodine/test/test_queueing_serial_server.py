@@ -0,0 +1,19 @@
+"""Tests for the bandwidth bookkeeping of ``QueueingSerialServer``."""
+import pytest
+from pyodine.transport.queueing_serial_server import LinkScheduler
+
+
+def test_link_scheduler():
+    """Bandwidth shares are turned into byte budgets and wait times."""
+    scheduler = LinkScheduler(1000, {'texus': .5, 'signal': .1},
+                              default_share=.2, window=10)
+    assert scheduler.max_bytes('texus') == 5000
+    assert scheduler.max_bytes('signal') == 1000
+    assert scheduler.max_bytes('unknown') == 2000
+
+    # Species start with full credit.
+    assert scheduler.wait_time('signal', 1000) == 0
+    scheduler.charge('signal', 1000)
+    assert scheduler.wait_time('signal', 500) == pytest.approx(5, rel=1e-3)
+    assert scheduler.wait_time('texus', 500) == 0
+    assert scheduler.transmit_time(2000) == 2
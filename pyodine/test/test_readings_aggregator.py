@@ -0,0 +1,40 @@
+"""The readings aggregator yields just what the Menlo getters would."""
+import pytest
+
+from pyodine.controller import lock_buddy  # pylint: disable=unused-import
+from pyodine.controller.readings_aggregator import ReadingsAggregator
+from pyodine.controller.subsystems import (READINGS_STATE_KEYS,
+                                           get_readings_sources)
+from pyodine.drivers import menlo_stack
+from pyodine.test.simulated_menlo import MenloFeed, make_stack, read_all_getters
+
+
+@pytest.fixture
+def menlo(monkeypatch):
+    """A simulated Menlo stack that keeps quiet about its quantities."""
+    monkeypatch.setattr(menlo_stack, 'LOG_QUANTITIES', False)
+    return make_stack()
+
+
+def test_snapshot_equals_getters(menlo):  # pylint: disable=redefined-outer-name
+    """Snapshots, full or since some time, match the getters."""
+    feed = MenloFeed(menlo)
+    feed.feed(200)  # Received before the aggregator was there.
+    aggregator = ReadingsAggregator(menlo, get_readings_sources(menlo),
+                                    READINGS_STATE_KEYS)
+    feed.feed(300)
+    assert aggregator.snapshot() == read_all_getters(menlo)
+    since = menlo.get_adc_voltage(0)[0][0]
+    feed.feed(30)
+    snapshot = aggregator.snapshot(since)
+    assert snapshot == read_all_getters(menlo, since)
+    assert 1 < len(snapshot['adc0']) < menlo_stack.ROTATE_N
+
+
+def test_picks_up_rotated_buffers(menlo):  # pylint: disable=redefined-outer-name
+    """Readings are caught up on even after the buffers rotated."""
+    aggregator = ReadingsAggregator(menlo, get_readings_sources(menlo),
+                                    READINGS_STATE_KEYS)
+    assert aggregator.snapshot()['adc0'] == []
+    MenloFeed(menlo).feed(20 * menlo_stack.ROTATE_N)  # Way more than kept.
+    assert aggregator.snapshot(-1.) == read_all_getters(menlo, -1.)
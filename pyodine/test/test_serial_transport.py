@@ -0,0 +1,104 @@
+"""Tests for the asyncio serial transport and servers, using a pty."""
+import asyncio
+import time
+import pytest
+from pyodine.transport import packer
+from pyodine.transport.decoder import Decoder
+from pyodine.transport.link_compression import LinkDecompressor
+from pyodine.transport.serial_server import SerialServer
+from pyodine.transport.queueing_serial_server import QueueingSerialServer
+from pyodine.test.pty_harness import PtyLink
+
+
+@pytest.fixture
+def link():
+    """A pseudo terminal standing in for the serial link."""
+    with PtyLink() as pty:
+        yield pty
+
+
+def test_receive_is_immediate(loop, link):
+    """A message is passed on as soon as its last byte arrived."""
+    received = []
+    arrived = []
+
+    async def scenario():
+        server = SerialServer(link.device, received.append, baudrate=115200)
+        server.serve()
+        message = packer.create_message({'a': 1}, 'setup')
+        sent = time.monotonic()
+        link.write(message[:10].encode())
+        await asyncio.sleep(0.01)
+        assert not received
+        link.write(message[10:].encode())
+        while not received and time.monotonic() - sent < 1:
+            await asyncio.sleep(0.0001)
+        arrived.append(time.monotonic() - sent)
+        server.close()
+        return message
+
+    message = loop.run_until_complete(scenario())
+    assert received == [message]
+    assert arrived[0] < 0.05
+
+
+def test_publish(loop, link):
+    """Large payloads are written completely, without blocking the loop."""
+    async def scenario():
+        server = SerialServer(link.device, baudrate=115200)
+        payload = b'x' * 20000  # More than fits into the OS buffers at once.
+        publishing = asyncio.ensure_future(server.publish(payload))
+        received = b''
+        while len(received) < len(payload):
+            received += link.read(len(payload) - len(received), timeout=0)
+            await asyncio.sleep(0.001)
+        await publishing
+        server.close()
+        return received == payload
+
+    assert loop.run_until_complete(scenario())
+
+
+def test_queueing_server_prefers_flags(loop, link):
+    """Queued messages are sent by priority of their species."""
+    async def scenario():
+        server = QueueingSerialServer(link.device, baudrate=115200)
+        for species in ['signal', 'readings', 'texus']:
+            server.queue_for_publication(
+                packer.create_message({'x': species}, 'setup'), species)
+        while server.uplink_blocked or len(server._queue):
+            await asyncio.sleep(0.01)
+        stats = server.get_link_stats()
+        server.close()
+        return stats
+
+    stats = loop.run_until_complete(scenario())
+    received = link.read(10000, timeout=0.1).decode()
+    # All were queued before the uplink got to work, so priorities apply.
+    positions = [received.index(s) for s in ['texus', 'readings', 'signal']]
+    assert positions == sorted(positions)
+    assert stats['species']['texus']['n_sent'] == 1
+    assert stats['backlog_bytes'] == 0
+
+
+def test_compressed_downlink(loop, link):
+    """With compression on, the link carries frames that restore the message."""
+    message = packer.create_message({'adc0': [[1.5e9, 0.25]]}, 'readings')
+
+    async def scenario():
+        server = QueueingSerialServer(link.device, baudrate=115200,
+                                      compress=True)
+        for _ in range(3):
+            server.queue_for_publication(message, 'readings')
+            while server.uplink_blocked or len(server._queue):
+                await asyncio.sleep(0.01)
+        server.close()
+        return server.get_link_stats()
+
+    stats = loop.run_until_complete(scenario())
+    assert stats['compression_ratio'] > 1
+    decoder = Decoder()
+    decoder.feed(link.read(10000, timeout=0.1))
+    decompressor = LinkDecompressor()
+    assert [decompressor.decompress(f) for f in decoder.harvest()] \
+        == [message.encode()] * 3
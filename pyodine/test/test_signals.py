@@ -0,0 +1,98 @@
+"""Tests for the spectroscopy signal analysis in ``pyodine.analysis.signals``.
+
+Uses the archived DAQ scan in ``data/spectroscopy_signal.log``.
+"""
+import os
+import numpy as np
+import pytest
+from scipy import signal
+from pyodine.analysis import signals
+from pyodine import constants as cs
+
+LOG_FILE = os.path.join(os.path.dirname(__file__), 'data',
+                        'spectroscopy_signal.log')
+
+
+@pytest.fixture(scope='module')
+def raw_scan():
+    """A raw (3, n) DAQ scan as it would be fetched from the DAQ."""
+    return np.array(signals.decode_daq_scan(LOG_FILE, row=1))
+
+
+def test_smooth_savgol_matches_scipy():
+    """Precomputed kernels smooth like scipy's savgol_filter()."""
+    data = np.random.RandomState(0).randn(3, 1000).cumsum(axis=-1)
+    kernels = signals.savgol_kernels(101, 3)
+    expected = signal.savgol_filter(data, 101, 3)
+    assert np.allclose(signals.smooth_savgol(data, kernels), expected)
+
+
+def test_locate_doppler_line_accepts_raw_array(raw_scan):
+    """A raw DAQ scan array can be searched for a line directly."""
+    line = signals.locate_doppler_line(raw_scan)
+    assert isinstance(line, cs.DopplerLine)
+    assert line.depth > cs.SPEC_MIN_LOG_DIP_DEPTH
+
+
+def test_batch_matches_single(raw_scan):
+    """Searching a stack of scans finds the same lines as one by one."""
+    flat = raw_scan.copy()
+    flat[2] = flat[2].mean()  # No dip in here.
+    scans = np.stack([raw_scan, flat, raw_scan])
+    lines, failed = signals.locate_doppler_lines(scans)
+
+    assert failed.tolist() == [False, True, False]
+    single = signals.locate_doppler_line(raw_scan)
+    for i in (0, 2):
+        assert np.allclose(cs.DopplerLine(*lines[i]), single)
+    with pytest.raises(ValueError):
+        signals.locate_doppler_line(flat)
+
+
+def test_batch_of_preprocessed_scans(raw_scan):
+    """Scans of different length are searched, those too short fail."""
+    scan = signals.format_daq_scan(
+        signals.trim_daq_scan(signals.SpecScan(*raw_scan)))
+    short = signals.SpecScan(*(column[:100] for column in scan))
+    lines, failed = signals.locate_doppler_lines([scan, short],
+                                                 preprocess_data=False)
+    assert failed.tolist() == [False, True]
+    assert np.isnan(lines[1].depth)
+    expected = signals.locate_doppler_line(np.array(scan),
+                                           preprocess_data=False)
+    assert np.allclose(cs.DopplerLine(*lines[0]), expected)
+
+
+def test_pipeline_matches_functions(raw_scan):
+    """The pipeline preprocesses and searches scans like the functions do."""
+    pipeline = signals.ScanPipeline()
+    expected = signals.format_daq_scan(
+        signals.trim_daq_scan(signals.SpecScan(*raw_scan)))
+    for _ in range(2):  # Second run reuses the sort permutation.
+        scan = pipeline.process(raw_scan.transpose())
+        for column, expected_column in zip(scan, expected):
+            assert np.allclose(column, expected_column)
+    assert np.allclose(pipeline.locate_doppler_line(raw_scan.transpose()),
+                       signals.locate_doppler_line(raw_scan))
+
+    # Swap two samples of the ramp to invalidate the cached permutation.
+    middle = raw_scan.shape[1] // 2
+    changed = raw_scan.copy()
+    changed[:, [middle, middle + 20]] = changed[:, [middle + 20, middle]]
+    scan = pipeline.process(changed.transpose())
+    assert np.all(np.diff(scan.ramp) >= 0)
+
+
+def test_decimate_minmax_keeps_dips():
+    """Extrema only one sample wide survive the decimation."""
+    ramp = np.arange(100000)
+    error = np.zeros(100000)
+    trans = np.ones(100000)
+    error[31337] = -5  # A dip only one sample wide.
+    trans[77777] = 3
+    data = np.column_stack((ramp, error, trans))
+    decimated = signals.decimate_minmax(data, 500)
+    assert len(decimated) <= 500
+    assert np.all(np.diff(decimated[:, 0]) > 0)
+    assert decimated[:, 1].min() == -5 and decimated[:, 2].max() == 3
+    assert len(signals.decimate_minmax(data[:300], 500)) == 300
@@ -0,0 +1,84 @@
+"""Tests for the ``SimulatedDaq``."""
+import time
+
+import pytest
+
+from pyodine.analysis import signals
+from pyodine.drivers.mccdaq import DaqChannel, InputRange, RampShape
+from pyodine.drivers.simulated_daq import LaserModel, SimSignal, SimulatedDaq
+
+SCAN_CHANNELS = [(DaqChannel.C_11, InputRange.PM_10V),
+                 (DaqChannel.C_7, InputRange.PM_1V),
+                 (DaqChannel.C_6, InputRange.PM_5V)]
+WIRING = {DaqChannel.C_11: SimSignal.RAMP, DaqChannel.C_7: SimSignal.ERROR,
+          DaqChannel.C_6: SimSignal.LOG}
+
+
+def test_scan_shows_line():
+    """Scans show the Doppler line where the model puts it."""
+    model = LaserModel(detuning=400, seed=0)
+    daq = SimulatedDaq(wiring=WIRING, model=model, realtime=False)
+    pipeline = signals.ScanPipeline()
+    line = pipeline.locate_doppler_line(
+        daq.fetch_scan(19, .5, SCAN_CHANNELS, RampShape.DESCENT))
+    assert abs(line.distance + 400) < 20
+    assert abs(line.depth - model.line_depth) < .02
+
+    model.tune(line.distance)
+    line = pipeline.locate_doppler_line(
+        daq.fetch_scan(19, .5, SCAN_CHANNELS, RampShape.DESCENT))
+    assert abs(line.distance) < 20
+
+
+def test_refuses_like_device():
+    """Invalid ramps are refused like the real DAQ does."""
+    daq = SimulatedDaq(wiring=WIRING, realtime=False)
+    daq.ramp_offset = 5
+    with pytest.raises(ConnectionError):
+        daq.fetch_scan(19, .5, SCAN_CHANNELS)
+    with pytest.raises(ValueError):
+        daq.fetch_scan(21, .5, SCAN_CHANNELS)
+    idle = daq.sample_channels([(DaqChannel.C_0, InputRange.PM_5V)], 10)
+    assert idle.shape == (10, 1)
+    assert abs(idle.mean() / 2**16 * 10 - 5 - daq.idle_level) < .01
+
+
+def test_back_to_back_scans_skip_setup():
+    """Only the first of several back-to-back scans pays the latency."""
+    daq = SimulatedDaq(wiring=WIRING, latency=.05)
+    start = time.monotonic()
+    for _ in range(3):
+        daq.fetch_scan(19, .02, SCAN_CHANNELS, back_to_back=True)
+    assert time.monotonic() - start < .05 + 3 * .02 + .04
+    daq.stop_scans()
+
+
+def test_resolution():
+    """Scans with fewer, oversampled points still show the line."""
+    model = LaserModel(detuning=-300, seed=0)
+    daq = SimulatedDaq(wiring=WIRING, model=model, realtime=False)
+    scan = daq.fetch_scan(19, .125, SCAN_CHANNELS, n_samples=640,
+                          oversampling=4)
+    assert scan.shape == (640, 3)
+    line = signals.ScanPipeline().locate_doppler_line(scan)
+    assert abs(line.distance - 300) < 20
+    with pytest.raises(ValueError):
+        daq.fetch_scan(19, .5, SCAN_CHANNELS, n_samples=10)
+    with pytest.raises(ValueError):  # Exceeds input rate.
+        daq.fetch_scan(19, .01, SCAN_CHANNELS, oversampling=4)
+
+
+def test_plans():
+    """Prepared plans are reused and fill a shared buffer."""
+    daq = SimulatedDaq(wiring=WIRING, realtime=False)
+    plan = daq.prepare(SCAN_CHANNELS, n_samples=4)
+    readings = daq.sample_channels(plan)
+    assert readings is plan.readings
+    assert readings.shape == (4, 3)
+    copy = daq.sample_channels(SCAN_CHANNELS, 4)
+    assert copy is not daq.sample_channels(SCAN_CHANNELS, 4)
+    assert len(daq._plans) == 1  # pylint: disable=protected-access
+    with pytest.raises(ValueError):
+        daq.sample_channels(plan, 5)
+    with pytest.raises(ValueError):
+        daq.prepare([(DaqChannel.C_0, 3)])
@@ -0,0 +1,167 @@
+"""Tests for the per-client queueing in ``WebsocketServer``.
+
+Mostly uses stand-in sockets instead of actual network connections.
+"""
+import asyncio
+import json
+import socket
+import pytest
+import websockets
+from websockets.extensions.permessage_deflate import PerMessageDeflate
+from pyodine.transport import packer, websocket_server
+from pyodine.transport.websocket_server import WebsocketServer
+
+
+class FakeSocket:
+    """Stands in for a client connection that takes `delay` to send."""
+
+    def __init__(self, delay: float = 0, subprotocol: str = None) -> None:
+        self.delay = delay
+        self.subprotocol = subprotocol
+        self.remote_address = ('fake', id(self))
+        self.sent = []
+        self.closed = False
+        self._is_closed = asyncio.Event()
+
+    async def send(self, data) -> None:
+        await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+    async def recv(self) -> None:
+        await self._is_closed.wait()
+        raise ConnectionError("Socket was closed.")
+
+    async def close(self) -> None:
+        self.closed = True
+        self._is_closed.set()
+
+
+@pytest.fixture
+def server(loop):  # pylint: disable=redefined-outer-name
+    """A server that is never started; clients are attached by hand."""
+    return WebsocketServer(port=0)
+
+
+@pytest.fixture
+def connect(loop, server):  # pylint: disable=redefined-outer-name
+    """Connects stand-in sockets to the server and disconnects them again
+    after the test.
+    """
+    tasks = []
+
+    async def connect_socket(socket: FakeSocket) -> None:
+        tasks.append(asyncio.ensure_future(server._register_subscriber(socket)))
+        await asyncio.sleep(0)
+
+    yield connect_socket
+    # Dropping a client cancels its writer and closes its socket, which ends
+    # its registration.
+    for client in list(server._clients.values()):
+        tasks.append(client.writer)
+        server._drop_client(client.socket)
+    if tasks:
+        loop.run_until_complete(asyncio.wait(tasks))
+
+
+def test_slow_client_doesnt_block_others(loop, server, connect):  # pylint: disable=redefined-outer-name
+    """A slow client gets replaced messages but doesn't delay others."""
+    async def scenario():
+        fast, slow = FakeSocket(), FakeSocket(delay=0.2)
+        await connect(fast)
+        await connect(slow)
+        for i in range(5):
+            await server.publish_message({'i': i}, 'setup')
+            await asyncio.sleep(0.01)
+        assert len(fast.sent) == 5
+        await asyncio.sleep(0.5)
+        # The slow client only got the first and latest message, as queued
+        # messages of equal type replace each other.
+        assert [m.count('"i": ') for m in slow.sent] == [1, 1]
+        assert '"i": 4' in slow.sent[-1]
+        stats = {s['address']: s for s in server.get_client_stats()}
+        assert stats[slow.remote_address]['n_replaced'] == 3
+    loop.run_until_complete(scenario())
+
+
+def test_on_sent_and_binary_clients(loop, server, connect):  # pylint: disable=redefined-outer-name
+    """Binary clients get packed frames and ``on_sent`` is called for them."""
+    async def scenario():
+        binary = FakeSocket(subprotocol=websocket_server.SUBPROTOCOL_BINARY)
+        await connect(binary)
+        sent_to = []
+        await server.publish_message({'a': 1}, 'setup', on_sent=sent_to.append)
+        await asyncio.sleep(0.01)
+        assert sent_to == [binary]
+        assert isinstance(binary.sent[0], bytes)
+    loop.run_until_complete(scenario())
+
+
+def test_failing_on_sent_callback(loop, server, connect):  # pylint: disable=redefined-outer-name
+    """A failing ``on_sent`` callback doesn't stop sending to its client."""
+    def fail(_):
+        raise RuntimeError("Callback failed.")
+
+    async def scenario():
+        client = FakeSocket()
+        await connect(client)
+        await server.publish_message({'a': 1}, 'setup', on_sent=fail)
+        await asyncio.sleep(0.01)
+        await server.publish_message({'a': 2}, 'readings')
+        await asyncio.sleep(0.01)
+        assert len(client.sent) == 2
+        assert not server._clients[client].writer.done()
+    loop.run_until_complete(scenario())
+
+
+def test_stalled_client_is_dropped(loop, server, connect):  # pylint: disable=redefined-outer-name
+    """A client whose queue overflows is dropped and closed."""
+    async def scenario():
+        stalled = FakeSocket(delay=3600)
+        await connect(stalled)
+        for i in range(websocket_server.MAX_QUEUED_MESSAGES + 2):
+            await server.publish(str(i))
+        await asyncio.sleep(0.01)
+        assert stalled not in server.subscribers
+        assert stalled.closed
+    loop.run_until_complete(scenario())
+
+
+def test_frames_are_prepared_once_per_format(loop, monkeypatch):  # pylint: disable=redefined-outer-name
+    """Binary clients don't get permessage-deflate, JSON clients do, and
+    every frame format is built once for all clients using it."""
+    with socket.socket() as probe:
+        probe.bind(('localhost', 0))
+        port = probe.getsockname()[1]
+    formats = []
+    prepare_frame = websocket_server.prepare_frame
+    monkeypatch.setattr(websocket_server, 'prepare_frame',
+                        lambda data, bits=0: formats.append(bits)
+                        or prepare_frame(data, bits))
+    payload = {'text': 'pyodine ' * 2000}
+
+    async def scenario():
+        server = WebsocketServer(port=port)
+        await server.async_init()
+        await server._serving
+        uri = 'ws://localhost:{}'.format(port)
+        binary = await websockets.connect(
+            uri, subprotocols=[websocket_server.SUBPROTOCOL_BINARY])
+        text = [await websockets.connect(
+            uri, subprotocols=[websocket_server.SUBPROTOCOL_JSON])
+                for _ in range(2)]
+        await asyncio.sleep(0.05)  # Let the server register them.
+        assert binary.extensions == []
+        for client in text:
+            assert isinstance(client.extensions[0], PerMessageDeflate)
+
+        await server.publish_message(payload, 'setup')
+        assert packer.parse_frame(await binary.recv()) == ('setup', payload)
+        for client in text:
+            assert json.loads(await client.recv())['data'] == payload
+        assert sorted(formats) == [0, 15]
+
+        for client in [binary] + text:
+            await client.close()
+        await server.close()
+        await asyncio.sleep(0.01)
+    loop.run_until_complete(scenario())
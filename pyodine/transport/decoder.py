@@ -1,7 +1,10 @@
 """Decodes and chops a bytestream into pyodine-flavoured JSON strings.
+
+Binary frames as created by ``packer.create_frame()`` may be interleaved with
+the JSON messages.  Those are returned as ``bytes``.
 """
 import logging
-from typing import List
+from typing import List, Union
 from . import packer
 from .. import logger
 from .. import constants as cs
@@ -14,63 +17,100 @@ class Decoder:
     """Collect message chunks until complete JSON string is formed.
     """
     def __init__(self) -> None:
-        self._rcv_buffer = b''
+        self._rcv_buffer = bytearray()
+
+        # Where in the receive buffer to continue searching for END_TOKEN and
+        # frame starts.  Everything before this is known not to contain a
+        # complete token.
+        self._search_pos = 0
 
         # Complete messages, ready to be retrieved.
-        self._msg_buffer = []  # type: List[str]
+        self._msg_buffer = []  # type: List[Union[str, bytes]]
 
     def feed(self, data: bytes) -> None:
         """Feed the next chunk of bytes into the collecting mechanism."""
         LOGGER.debug("Feeding data into collector: %s",
-                     logger.ellipsicate(str(data)))
+                     logger.Ellipsicated(data))
         self._rcv_buffer += data
 
+        # Comb out completed messages.  Instead of re-slicing the buffer after
+        # every message, we only move a read offset and drop everything
+        # consumed in one go.
+        read_pos = 0
+        while True:
+            frame_start = self._rcv_buffer.find(packer.FRAME_MAGIC,
+                                                self._search_pos)
+            msg_boundary = self._rcv_buffer.find(END_TOKEN, self._search_pos)
+            if frame_start != -1 and (msg_boundary == -1
+                                      or frame_start < msg_boundary):
+                # JSON never contains the frame magic, thus anything before
+                # it can't be part of a valid message.
+                if frame_start > read_pos:
+                    LOGGER.warning("Dropping %s bytes preceding a frame.",
+                                   frame_start - read_pos)
+                read_pos = self._search_pos = frame_start
+                frame_end = self._get_frame_end(frame_start)
+                if frame_end is None:
+                    break  # Wait for the rest of the frame.
+                self._msg_buffer.append(
+                    bytes(self._rcv_buffer[frame_start:frame_end]))
+                read_pos = self._search_pos = frame_end
+                LOGGER.debug("Received complete frame.")
+                continue
+            if msg_boundary == -1:
+                # The token might be split across chunks, so we need to
+                # re-examine the last few bytes next time.
+                self._search_pos = max(
+                    read_pos, len(self._rcv_buffer) - len(END_TOKEN) + 1)
+                break
+            msg_end = msg_boundary + len(END_TOKEN)
+            with memoryview(self._rcv_buffer) as view:
+                msg_candidate = str(view[read_pos:msg_end],
+                                    encoding='utf-8', errors='ignore')
+            read_pos = self._search_pos = msg_end
+
+            # Store candidate if it is valid.
+            if self._is_message(msg_candidate):
+                LOGGER.debug("Received complete message.")
+                self._msg_buffer.append(msg_candidate)
+            else:
+                LOGGER.warning("Received invalid or incomplete message.")
+
+        if read_pos:
+            del self._rcv_buffer[:read_pos]
+            self._search_pos -= read_pos
+
+        # Only check the incomplete remainder, as a large chunk may well
+        # contain complete messages.
         if len(self._rcv_buffer) > cs.RS232_MAX_MESSAGE_BYTES:
             LOGGER.error("Receive buffer overflow. Message too long? "
                          "Resetting receive buffer.")
-            self._rcv_buffer = b''
-
-        # Comb out completed messages.
-        else:
-            while True:
-
-                # Split buffer by messages.
-
-                msg_boundary = self._rcv_buffer.find(END_TOKEN)
-                if msg_boundary == -1:
-                    break
-
-                # Pop candidate from buffer.
-
-                msg_candidate = (
-                    # Get full message, including token.
-                    self._rcv_buffer[:msg_boundary+len(END_TOKEN)]
-                    ).decode(encoding='utf-8', errors='ignore')
-
-                # Delete it from buffer.
-                self._rcv_buffer = self._rcv_buffer[msg_boundary +
-                                                    len(END_TOKEN):]
-
-                # Store candidate if it is valid.
-
-                if self._is_message(msg_candidate):
-                    LOGGER.debug("Received complete message.")
-                    self._msg_buffer.append(msg_candidate)
-                else:
-                    LOGGER.warning("Received invalid or incomplete message.")
+            self._rcv_buffer.clear()
+            self._search_pos = 0
+
+    def _get_frame_end(self, start: int) -> Union[int, None]:
+        """Where does the frame starting at ``start`` end, if complete?"""
+        try:
+            length = packer.frame_length(self._rcv_buffer, start)
+        except ValueError:
+            return None
+        if length is None or start + length > len(self._rcv_buffer):
+            return None
+        return start + length
 
     @staticmethod
     def _is_message(msg: str) -> bool:
-        LOGGER.debug("Checking for validity: %s", logger.ellipsicate(msg))
+        LOGGER.debug("Checking for validity: %s", logger.Ellipsicated(msg))
         return packer.is_valid_message(msg)
 
     def n_pending(self) -> int:
         """Return the number of ready-to-retrieve complete messages."""
         return len(self._msg_buffer)
 
-    def harvest(self) -> List[str]:
+    def harvest(self) -> List[Union[str, bytes]]:
         """Returns all complete messages and deletes them.
 
+        JSON messages are returned as ``str``, binary frames as ``bytes``.
         One would usually check n_pending() before."""
         crop = self._msg_buffer
         self._msg_buffer = []
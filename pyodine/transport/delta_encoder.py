@@ -0,0 +1,122 @@
+"""Only send those readings a client hasn't seen yet.
+
+Readings come as dicts of buffers, i.e. lists of (time, value) tuples.  There
+are two kinds of buffers:
+
+- Series, e.g. temperatures, which are fetched as a timeline of new points.
+- States, e.g. "is enabled" flags, which are fetched as single latest points.
+  Those usually don't change for long periods of time.
+
+A ``DeltaEncoder`` keeps track of what was sent to one client and strips the
+readings down to new series points and changed states.  Every series is sent
+along, even if there are no new points, so clients can rely on finding all of
+them.  Every now and then, a keyframe carrying all states is sent instead.
+Series are never sent twice, not even in keyframes, as clients append them to
+what they already have.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple  # pylint: disable=unused-import
+
+from .. import constants as cs
+
+LOGGER = logging.getLogger('pyodine.transport.delta_encoder')
+
+Delta = NamedTuple('Delta', [('readings', Dict[str, List[Tuple[float, Any]]]),
+                             ('is_keyframe', bool),
+                             ('fetched_at', float)])
+"""Readings to send to a client along with some bookkeeping information."""
+
+
+class DeltaEncoder:
+    """Track the readings sent to one client and create deltas.
+
+    Creating a delta doesn't change the encoder's state.  Only when the delta
+    was actually sent, it is to be ``commit()`` ted.  This allows for discarding
+    or replacing deltas that never left the building: The next delta will just
+    contain the missed changes as well.
+    """
+
+    def __init__(self, state_keys: Iterable[str],
+                 keyframe_interval: int = cs.READINGS_KEYFRAME_INTERVAL) -> None:
+        """
+        :param state_keys: Keys of those readings, that are states instead of
+                    series (see module docstring).
+        :param keyframe_interval: Send a full keyframe every ~th publication.
+        """
+        self.since = None  # type: float
+        """When were the readings fetched that were last committed?  Fetching
+        all points since then is enough to create the next delta.
+        """
+        self._state_keys = frozenset(state_keys)
+        self._keyframe_interval = keyframe_interval
+        self._n_deltas = 0  # Deltas committed since last keyframe.
+        self._times = {}  # type: Dict[str, float]
+        self._values = {}  # type: Dict[str, Any]
+
+    def encode(self, readings: Dict[str, List[Tuple[float, Any]]],
+               fetched_at: float, keyframe: bool = False) -> Delta:
+        """Extract what's new in ``readings`` for the client.
+
+        :param readings: Readings, containing all series points since
+                    ``self.since``.
+        :param fetched_at: When were the readings fetched?
+        :param keyframe: Force a keyframe.
+        """
+        keyframe = (keyframe or self.since is None
+                    or self._n_deltas + 1 >= self._keyframe_interval)
+        delta = {}  # type: Dict[str, List[Tuple[float, Any]]]
+        for key, buffer in readings.items():
+            if not isinstance(buffer, list):
+                delta[key] = buffer  # Don't know how to diff this.
+            elif key in self._state_keys:
+                if buffer and (keyframe or key not in self._values
+                               or buffer[-1][1] != self._values[key]):
+                    delta[key] = buffer
+            else:
+                last_time = self._times.get(key)
+                if last_time is None:
+                    delta[key] = buffer
+                else:
+                    # Buffers are sorted oldest first.
+                    delta[key] = [p for p in buffer if p[0] > last_time]
+        return Delta(delta, keyframe, fetched_at)
+
+    def commit(self, delta: Delta) -> None:
+        """Mark ``delta`` as sent to the client."""
+        for key, buffer in delta.readings.items():
+            if not isinstance(buffer, list) or not buffer:
+                continue
+            if key in self._state_keys:
+                self._values[key] = buffer[-1][1]
+            else:
+                self._times[key] = max(self._times.get(key, buffer[-1][0]),
+                                       buffer[-1][0])
+        self._n_deltas = 0 if delta.is_keyframe else self._n_deltas + 1
+        if self.since is None or delta.fetched_at > self.since:
+            self.since = delta.fetched_at
+
+
+def is_empty(delta: Delta) -> bool:
+    """Does ``delta`` lack any news, so that there is no point in sending it?"""
+    return not delta.is_keyframe and all(
+        isinstance(buffer, list) and not buffer
+        for buffer in delta.readings.values())
+
+
+def to_payload(delta: Delta) -> Dict[str, Any]:
+    """The message payload to send ``delta`` as.
+
+    The readings are amended by a "keyframe" flag.
+    """
+    payload = dict(delta.readings)  # type: Dict[str, Any]
+    payload['keyframe'] = delta.is_keyframe
+    return payload
+
+
+def signature(delta: Delta) -> Tuple:
+    """A key that is equal for deltas of equal content.
+
+    Deltas created from the same readings by different encoders carry the same
+    content iff they contain the same number of points for the same keys.
+    """
+    return tuple((key, len(buffer)) for key, buffer in delta.readings.items())
@@ -0,0 +1,156 @@
+"""Compression of the message stream sent over a slow serial link.
+
+Pyodine's messages are very similar to each other.  Instead of compressing each
+message on its own, all messages sent over a link are compressed as one
+continuous deflate stream.  Every message is flushed (``Z_SYNC_FLUSH``) and
+sent as a stream frame (see ``packer``), so it can be decompressed as soon as it
+arrives.  A preset dictionary of typical message content helps with the first
+messages after a reset.
+
+A lost or corrupted frame breaks the stream.  Stream frames use their type
+byte as a sequence number, so lost frames are noticed.  The compressor resets
+itself every so often, flagging the respective frame with
+``packer.FRAME_FLAG_RESET``.  The decompressor drops frames after an error until
+it sees such a reset frame.
+
+Use ``train_dictionary()`` to create a dictionary from recorded messages.  Both
+ends of a link need to use the same dictionary.
+"""
+import collections
+import logging
+import re
+import zlib
+from typing import Iterable, Optional, Union  # pylint: disable=unused-import
+
+from . import packer
+from .. import constants as cs
+
+LOGGER = logging.getLogger('pyodine.transport.link_compression')
+
+WBITS = -15
+"""Raw deflate stream, maximum window size."""
+SYNC_TRAILER = b'\x00\x00\xff\xff'
+"""Every sync flush ends like this.  It is stripped before sending."""
+MAX_DICTIONARY_SIZE = 32768
+
+
+def builtin_dictionary() -> bytes:
+    """A dictionary of what all messages have in common."""
+    wrapper = ''.join('"data": {{}}, "type": "{}"}}\n\n\n'.format(msg_type)
+                      for msg_type in cs.MESSAGE_TYPES)
+    return ('{"checksum": "", ' + wrapper).encode()
+
+
+def load_dictionary(filename: Optional[str]) -> bytes:
+    """Load a trained dictionary, or the builtin one if ``filename`` is None.
+    """
+    if filename is None:
+        return builtin_dictionary()
+    with open(filename, 'rb') as file:
+        return file.read()[-MAX_DICTIONARY_SIZE:]
+
+
+def train_dictionary(messages: Iterable[Union[str, bytes]],
+                     size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """Create a preset dictionary from sample messages.
+
+    Collects all keys and string values and the most recent sample of every
+    message type.  Frequent items end up at the back, as deflate encodes close
+    matches more efficiently.
+    """
+    tokens = collections.Counter()  # type: collections.Counter
+    samples = collections.OrderedDict()  # type: collections.OrderedDict
+    for message in messages:
+        text = message.decode(errors='ignore') if isinstance(message, bytes) else message
+        tokens.update(re.findall(r'"[^"]*":? ?\[*', text))
+        match = re.search(r'"type": "(\w+)"', text)
+        if match:
+            samples.pop(match.group(1), None)
+            samples[match.group(1)] = text
+    ranked = sorted(tokens, key=lambda token: tokens[token] * len(token))
+    dictionary = (''.join(ranked) + ''.join(samples.values())).encode()
+    return dictionary[-size:]
+
+
+class LinkCompressor:
+    """Compress messages into stream frames for one link."""
+
+    def __init__(self, dictionary: bytes = None,
+                 reset_interval: int = cs.RS232_COMPRESSION_RESET_INTERVAL) -> None:
+        """
+        :param dictionary: Preset dictionary.  Defaults to the builtin one.
+        :param reset_interval: Start a new stream every ~ messages.
+        """
+        self._dictionary = (builtin_dictionary() if dictionary is None
+                            else dictionary)
+        self._reset_interval = reset_interval
+        self._compressor = None  # type: zlib.Compress
+        self._n_since_reset = 0
+        self._sequence = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    def compress(self, message: Union[str, bytes]) -> bytes:
+        """Compress the next message of the stream into a frame.
+
+        Frames need to be sent in the order they were created.
+        """
+        data = message.encode() if isinstance(message, str) else message
+        flags = packer.FRAME_FLAG_STREAM
+        if self._compressor is None or self._n_since_reset >= self._reset_interval:
+            self._compressor = zlib.compressobj(9, zlib.DEFLATED, WBITS, 9,
+                                                zdict=self._dictionary)
+            self._n_since_reset = 0
+            flags |= packer.FRAME_FLAG_RESET
+        self._n_since_reset += 1
+        chunk = (self._compressor.compress(data)
+                 + self._compressor.flush(zlib.Z_SYNC_FLUSH))
+        chunk = chunk[:-len(SYNC_TRAILER)]
+        self.raw_bytes += len(data)
+        self.compressed_bytes += len(chunk)
+        self._sequence = (self._sequence + 1) % 256
+        return packer.FRAME_HEADER.pack(packer.FRAME_MAGIC, self._sequence,
+                                        flags, 0, len(chunk)) + chunk
+
+
+class LinkDecompressor:
+    """Restore the messages compressed by a ``LinkCompressor``."""
+
+    def __init__(self, dictionary: bytes = None) -> None:
+        self._dictionary = (builtin_dictionary() if dictionary is None
+                            else dictionary)
+        self._decompressor = None  # type: zlib.Decompress
+        self._sequence = 0
+
+    def decompress(self, frame: bytes) -> Optional[bytes]:
+        """Unpack the next stream frame.
+
+        :returns: The original message or None if the stream is broken and
+                    waiting for the next reset.
+        """
+        _, sequence, flags, header_len, _ = packer.FRAME_HEADER.unpack_from(frame)
+        if flags & packer.FRAME_FLAG_RESET:
+            self._decompressor = zlib.decompressobj(WBITS,
+                                                    zdict=self._dictionary)
+        elif (self._decompressor is not None
+              and sequence != (self._sequence + 1) % 256):
+            LOGGER.warning("Lost compressed frames. Waiting for reset.")
+            self._decompressor = None
+        self._sequence = sequence
+        if self._decompressor is None:
+            LOGGER.debug("Dropping stream frame, waiting for reset.")
+            return None
+        chunk = frame[packer.FRAME_HEADER.size + header_len:]
+        try:
+            return self._decompressor.decompress(chunk + SYNC_TRAILER)
+        except zlib.error:
+            LOGGER.warning("Compressed stream is broken. Waiting for reset.")
+            LOGGER.debug("Reason:", exc_info=True)
+            self._decompressor = None
+            return None
+
+
+def is_stream_frame(msg: Union[str, bytes]) -> bool:
+    return (isinstance(msg, bytes) and packer.is_frame(msg)
+            and len(msg) >= packer.FRAME_HEADER.size
+            and bool(msg[3] & packer.FRAME_FLAG_STREAM))
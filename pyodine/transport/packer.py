@@ -1,22 +1,63 @@
 """Create pyodine-flavoured JSON strings out of Python objects.
+
+Besides the JSON messages, there is a binary frame format that carries numeric
+data as raw typed arrays instead of text.  A frame looks like this (all numbers
+little-endian)::
+
+    +-------+------+-------+------------+-------------+--------+---------+
+    | magic | type | flags | header len | payload len | header | payload |
+    | 2 B   | 1 B  | 1 B   | uint32     | uint32      |        |         |
+    +-------+------+-------+------------+-------------+--------+---------+
+
+- magic: ``FRAME_MAGIC``.  As 0xFF never occurs in UTF-8, frames can be told
+  apart from JSON messages in a mixed byte stream.
+- type: Index of the message type in ``constants.MESSAGE_TYPES``.
+- flags: Bit field.  If ``FRAME_FLAG_DEFLATE`` is set, the frame is just a
+  wrapper: Its header is empty and its payload is another, zlib-compressed
+  frame.  If ``FRAME_FLAG_STREAM`` is set, the payload is the next chunk of a
+  compressed stream of messages, see ``link_compression``.  Such frames have
+  an empty header and carry a sequence number instead of the type.  ``FRAME_FLAG_RESET`` marks
+  the start of a new stream.  All other bits are reserved and zero.
+- header: Compact UTF-8 JSON, padded with spaces to ``FRAME_ALIGNMENT``.  It
+  looks like ``{"arrays": [[key, kind, dtype, shape, offset], ...],
+  "data": {...}}``.  "data" holds all payload entries that are not arrays.
+- payload: The raw arrays listed in the header.  Each starts at a multiple of
+  ``FRAME_ALIGNMENT`` relative to the payload start.  Arrays of kind "series"
+  are (time, value) buffers that were converted to float64 arrays of shape
+  (n, 2).  They are converted back to lists when decoding.
 """
+import base64
 import json
 import logging
-from typing import Dict, Any  # pylint: disable=unused-import
+import struct
+import zlib
+from typing import Dict, Any, List, Optional, Tuple  # pylint: disable=unused-import
+
+import numpy as np
+
 from .. import constants as cs
 
 LOGGER = logging.getLogger('pyodine.transport.packer')
 
+FRAME_MAGIC = b'\xffP'
+FRAME_HEADER = struct.Struct('<2sBBII')
+FRAME_ALIGNMENT = 8
+FRAME_FLAG_DEFLATE = 0x01
+FRAME_FLAG_STREAM = 0x02
+FRAME_FLAG_RESET = 0x04
+
 
 def create_message(payload: dict, msg_type: str) -> str:
     """Wrap the passed payload into a pyodine-flavoured JSON-String.
+
+    Numpy arrays in the payload are base64-encoded.
     """
     if msg_type in cs.MESSAGE_TYPES:
         container = {}  # type: Dict[str, Any]
         container['data'] = payload
         container['type'] = msg_type
         container['checksum'] = ''  # TODO
-        message = json.dumps(container, sort_keys=True)
+        message = json.dumps(container, sort_keys=True, default=_encode_array)
         message = message.replace('NaN', 'null')
         message += "\n\n\n"
     else:
@@ -26,10 +67,146 @@ def create_message(payload: dict, msg_type: str) -> str:
     return message
 
 
+def create_frame(payload: dict, msg_type: str,
+                 compress_above: int = None) -> bytes:
+    """Wrap the passed payload into a binary frame.
+
+    Numpy arrays and (time, value) buffers are transmitted as raw arrays,
+    everything else as JSON.
+
+    :param compress_above: Deflate frames that are longer than this many
+                bytes.  Don't compress if None.
+    """
+    if msg_type not in cs.MESSAGE_TYPES:
+        LOGGER.warning("Unknown message type %s. Returning empty frame.",
+                       msg_type)
+        return b''
+    arrays = []  # type: List[List[Any]]
+    chunks = []  # type: List[bytes]
+    data = {}  # type: Dict[str, Any]
+    offset = 0
+    for key, value in payload.items():
+        typed = _as_typed_array(value)
+        if typed is None:
+            data[key] = value
+            continue
+        array, kind = typed
+        arrays.append([key, kind, array.dtype.str, array.shape, offset])
+        chunk = array.tobytes()
+        chunk += b'\0' * (-len(chunk) % FRAME_ALIGNMENT)
+        chunks.append(chunk)
+        offset += len(chunk)
+
+    header = json.dumps({'arrays': arrays, 'data': data},
+                        separators=(',', ':'), default=_encode_array)
+    header_bytes = header.replace('NaN', 'null').encode()
+    header_bytes += b' ' * (-(FRAME_HEADER.size + len(header_bytes))
+                            % FRAME_ALIGNMENT)
+    frame = b''.join([FRAME_HEADER.pack(FRAME_MAGIC,
+                                        cs.MESSAGE_TYPES.index(msg_type), 0,
+                                        len(header_bytes), offset),
+                      header_bytes] + chunks)
+    if compress_above is not None and len(frame) > compress_above:
+        return deflate_frame(frame)
+    return frame
+
+
+def deflate_frame(frame: bytes) -> bytes:
+    """Wrap a frame into a compressed frame of the same type.
+
+    If compression doesn't pay off, ``frame`` is returned unaltered.
+    """
+    compressed = zlib.compress(frame)
+    if FRAME_HEADER.size + len(compressed) >= len(frame):
+        return frame
+    return FRAME_HEADER.pack(FRAME_MAGIC, frame[2], FRAME_FLAG_DEFLATE, 0,
+                             len(compressed)) + compressed
+
+
+def frame_length(buffer: bytes, start: int = 0) -> Optional[int]:
+    """Total length of the frame starting at ``start`` in ``buffer``.
+
+    :raises ValueError: There is no frame starting at ``start``.
+    :returns: The frame length in bytes or None if ``buffer`` doesn't even
+                contain the complete fixed-size part of the frame yet.
+    """
+    if len(buffer) - start < FRAME_HEADER.size:
+        return None
+    magic, _, _, header_len, payload_len = FRAME_HEADER.unpack_from(buffer, start)
+    if magic != FRAME_MAGIC:
+        raise ValueError("Not a frame.")
+    return FRAME_HEADER.size + header_len + payload_len
+
+
+def parse_frame(frame: bytes) -> Tuple[str, Dict[str, Any]]:
+    """Unpack a binary frame as created by ``create_frame()``.
+
+    :raises ValueError: ``frame`` is not a valid frame or a stream frame.
+    :returns: The message type and payload.  Compressed frames are unwrapped
+                transparently.  Arrays are returned as read-only
+                numpy arrays, "series" as lists of [time, value] lists.
+    """
+    length = frame_length(frame)
+    if length is None or length != len(frame):
+        raise ValueError("Frame length mismatch.")
+    _, type_index, flags, header_len, _ = FRAME_HEADER.unpack_from(frame)
+    if flags & FRAME_FLAG_STREAM:
+        raise ValueError("Stream frames need a LinkDecompressor.")
+    if flags & FRAME_FLAG_DEFLATE:
+        try:
+            inner = zlib.decompress(frame[FRAME_HEADER.size + header_len:])
+        except zlib.error as err:
+            raise ValueError("Invalid compressed frame.") from err
+        return parse_frame(inner)
+    try:
+        msg_type = cs.MESSAGE_TYPES[type_index]
+        header = json.loads(frame[FRAME_HEADER.size:
+                                  FRAME_HEADER.size + header_len].decode())
+    except (IndexError, UnicodeDecodeError) as err:
+        raise ValueError("Invalid frame header.") from err
+    payload = header['data']
+    payload_start = FRAME_HEADER.size + header_len
+    for key, kind, dtype, shape, offset in header['arrays']:
+        count = int(np.prod(shape))
+        array = np.frombuffer(frame, dtype=dtype, count=count,
+                              offset=payload_start + offset).reshape(shape)
+        payload[key] = array.tolist() if kind == 'series' else array
+    return msg_type, payload
+
+
+def is_frame(msg: bytes) -> bool:
+    return msg[:len(FRAME_MAGIC)] == FRAME_MAGIC
+
+
 def is_valid_message(msg: str) -> bool:
     return _has_msg_suffix(msg) and _has_msg_prefix(msg)
 
 
+def _as_typed_array(value: Any) -> Optional[Tuple[np.ndarray, str]]:
+    """Convert ``value`` to a little-endian array if it is numeric data."""
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind not in 'biuf':
+            return None
+        return value.astype(value.dtype.newbyteorder('<'), copy=False), 'array'
+    if isinstance(value, list) and value:
+        try:
+            series = np.array(value, dtype='<f8')
+        except (TypeError, ValueError):
+            return None
+        if series.ndim == 2 and series.shape[1] == 2:
+            return series, 'series'
+    return None
+
+
+def _encode_array(obj: Any) -> Any:
+    """Make numpy objects JSON serializable.  Arrays are base64-encoded."""
+    if isinstance(obj, np.ndarray):
+        return base64.b64encode(obj.tobytes()).decode()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError("{} is not JSON serializable.".format(type(obj)))
+
+
 def _has_msg_suffix(msg: str) -> bool:
     return msg[-4:] == '}\n\n\n'
 
@@ -1,11 +1,75 @@
-"""``QueueingSerialServer`` is a subclass of ``serial_server.SerialServer``."""
+"""``QueueingSerialServer`` is a subclass of ``serial_server.SerialServer``.
+
+The serial link is slow compared to the amount of data pyodine produces.  Thus
+the server keeps track of the link's byte budget and assigns every species
+(message type) a share of it, see ``LinkScheduler``.
+"""
 import asyncio
-import functools
-from typing import Any, Callable
+import time
+from typing import Any, BinaryIO, Callable, Dict, Optional, Union  # pylint: disable=unused-import
 
+from . import link_compression
 from . import serial_server
+from .. import constants as cs
 from ..util import asyncio_tools
 
+BITS_PER_BYTE = 10
+"""8N1 serial transmission needs a start and a stop bit for every byte."""
+
+
+class LinkScheduler:
+    """Per-species token buckets sharing the throughput of a serial link.
+
+    Every species earns credit (in bytes) at its share of the link's rate.  The
+    credit is capped at ``window`` seconds worth of its share, which is also the
+    largest message the species may send at once.  Sending a message costs
+    its length in credit.  If no queued species can afford its message, the one
+    which will be able to soonest goes into debt, as idling the link wouldn't
+    help anyone.
+    """
+
+    def __init__(self, bytes_per_second: float, shares: Dict[Any, float],
+                 default_share: float, window: float) -> None:
+        """
+        :param shares: Fraction of the link's throughput for each species.
+        :param default_share: Share of species not mentioned in ``shares``.
+        :param window: Max. burst length in seconds.
+        """
+        self.bytes_per_second = bytes_per_second
+        self.shares = shares
+        self.default_share = default_share
+        self.window = window
+        self._credit = {}  # type: Dict[Any, float]
+        self._updated = {}  # type: Dict[Any, float]
+
+    def max_bytes(self, species: Any) -> int:
+        """The largest message ``species`` may send."""
+        return int(self._rate(species) * self.window)
+
+    def credit(self, species: Any) -> float:
+        """The current credit of ``species`` in bytes."""
+        now = time.monotonic()
+        credit = self._credit.get(species, self.max_bytes(species))
+        credit += (now - self._updated.get(species, now)) * self._rate(species)
+        self._credit[species] = min(credit, self.max_bytes(species))
+        self._updated[species] = now
+        return self._credit[species]
+
+    def wait_time(self, species: Any, n_bytes: int) -> float:
+        """Seconds until ``species`` can afford sending ``n_bytes``."""
+        missing = n_bytes - self.credit(species)
+        return max(0., missing / self._rate(species)) if missing > 0 else 0.
+
+    def charge(self, species: Any, n_bytes: int) -> None:
+        self._credit[species] = self.credit(species) - n_bytes
+
+    def transmit_time(self, n_bytes: int) -> float:
+        """Estimated time it takes to send ``n_bytes`` over the link."""
+        return n_bytes / self.bytes_per_second
+
+    def _rate(self, species: Any) -> float:
+        return self.shares.get(species, self.default_share) * self.bytes_per_second
+
 
 class QueueingSerialServer(serial_server.SerialServer):
     """A queuing, asynchronous extension of serial_server.py
@@ -15,36 +79,91 @@ class QueueingSerialServer(serial_server.SerialServer):
 
     def __init__(self, device: str,
                  received_msg_callback: Callable[[str], None] = None,
-                 baudrate: int = 19200) -> None:
+                 baudrate: int = 19200,
+                 priorities: Dict[Any, int] = None,
+                 max_ages: Dict[Any, float] = None,
+                 shares: Dict[Any, float] = None,
+                 compress: bool = None) -> None:
+        """
+        :param priorities: Among the species that can afford sending, those of
+                    higher priority go first.  Defaults to
+                    ``cs.RS232_PRIORITIES``.
+        :param max_ages: Don't send messages of those species that waited
+                    longer than ~ seconds.  Defaults to ``cs.RS232_MAX_AGES``.
+        :param shares: Fraction of the link's throughput each species gets.
+                    Defaults to ``cs.RS232_BANDWIDTH_SHARES``.
+        :param compress: Send all messages as one compressed stream, see
+                    ``link_compression``.  Defaults to ``cs.RS232_COMPRESSION``.
+        """
         super().__init__(device, received_msg_callback, baudrate)
         self.uplink_blocked = False
         """Is the serial connection currently sending data?"""
         self._loop = asyncio.get_event_loop()  # type: asyncio.AbstractEventLoop
-        self._queue = asyncio_tools.DeDupQueue()
+        self._queue = asyncio_tools.DeDupQueue(
+            cs.RS232_PRIORITIES if priorities is None else priorities,
+            cs.RS232_MAX_AGES if max_ages is None else max_ages)
         """The de-duplicating queue used to store send requests."""
+        self.scheduler = LinkScheduler(
+            baudrate / BITS_PER_BYTE,
+            cs.RS232_BANDWIDTH_SHARES if shares is None else shares,
+            cs.RS232_DEFAULT_BANDWIDTH_SHARE, cs.RS232_BURST_WINDOW)
+        self._compressor = None  # type: link_compression.LinkCompressor
+        if cs.RS232_COMPRESSION if compress is None else compress:
+            self._compressor = link_compression.LinkCompressor(
+                link_compression.load_dictionary(
+                    cs.RS232_COMPRESSION_DICTIONARY))
+        self._recording = None  # type: BinaryIO
+        if cs.RS232_RECORDING_FILE:
+            self._recording = open(cs.RS232_RECORDING_FILE, 'ab')
+        self._started = time.monotonic()
+        self._busy_time = 0.
+        self._stats = {}  # type: Dict[Any, Dict[str, int]]
 
     async def async_serve(self) -> None:
-        """Like ``.serve()``, but non blocking. Instead await'ing forever.
-
-        This runs the actual server in a threaded executor."""
-        self._loop.run_in_executor(None, self.serve)
+        """Start listening, see ``.serve()``."""
+        self.serve()
         serial_server.LOGGER.debug("Started queueing serial server.")
 
-    def queue_for_publication(self, data: str, species: Any) -> None:
+    def queue_for_publication(
+            self, data: Union[str, bytes], species: Any,
+            on_sent: Callable[[], None] = None,
+            shrink: Callable[[int], Optional[Union[str, bytes]]] = None) -> None:
         """Notify the server of the intent to publish ``data`` asap.
 
         This will not guarantee, that the data is sent over the interface right
         now, as other transmissions might currently be happening.  This will
         neither guarantee, that ``data`` is sent at all: If newer messages of
         the same ``species`` arrive while waiting for the next free
-        transmission slot, those will be transferred instead.
+        transmission slot, those will be transferred instead.  Messages may
+        also expire (see ``__init__()``).
 
-        :param data: The message to be sent.
+        :param data: The message or binary frame to be sent.
         :param species: An identification as to which type of news this is.
                     Important for deciding which messages to discard (see
                     above).
+        :param on_sent: Is called once ``data`` was actually sent.  It is not
+                    called if ``data`` gets replaced or expires.
+        :param shrink: If ``data`` exceeds the largest message ``species`` may
+                    send, this is called with that size in bytes.  It returns
+                    a downsampled version of ``data`` or None.  Oversized
+                    messages are skipped if this isn't given or fails.
         """
-        self._queue.enqueue(data, species)
+        bytestream = data.encode() if isinstance(data, str) else data
+        stats = self._species_stats(species)
+        max_bytes = self.scheduler.max_bytes(species)
+        if len(bytestream) > max_bytes:
+            shrunk = shrink(max_bytes) if callable(shrink) else None
+            if isinstance(shrunk, str):
+                shrunk = shrunk.encode()
+            if not shrunk or len(shrunk) > max_bytes:
+                stats['n_skipped'] += 1
+                serial_server.LOGGER.debug(
+                    "Skipped %s bytes of %s, as only %s fit its share.",
+                    len(bytestream), species, max_bytes)
+                return
+            stats['n_shrunk'] += 1
+            bytestream = shrunk
+        self._queue.enqueue((bytestream, species, on_sent), species)
         if not self.uplink_blocked:
             asyncio.ensure_future(self._process_queue())
         else:
@@ -52,6 +171,39 @@ class QueueingSerialServer(serial_server.SerialServer):
         serial_server.LOGGER.debug("Scheduled a %s specimen for publication.",
                                    species)
 
+    def close(self) -> None:
+        super().close()
+        if self._recording is not None:
+            self._recording.close()
+
+    def get_link_stats(self) -> Dict[str, Any]:
+        """Throughput and backlog of the serial link.
+
+        - throughput: Bytes per second actually achieved while sending.
+        - utilization: Fraction of time the link was busy.
+        - backlog_bytes, backlog_time: Queued data and the estimated time to
+          send it (uncompressed).
+        - compression_ratio: Uncompressed / sent bytes.
+        - species: Sent bytes and messages as well as the number of shrunk and
+          skipped messages per species.
+        """
+        backlog = sum(len(item[0]) for _, item in self._queue.items())
+        total = sum(s['sent_bytes'] for s in self._stats.values())
+        raw = sum(s['raw_bytes'] for s in self._stats.values())
+        return {
+            'throughput': total / self._busy_time if self._busy_time else 0.,
+            'utilization': self._busy_time / (time.monotonic() - self._started),
+            'backlog_bytes': backlog,
+            'backlog_time': self.scheduler.transmit_time(backlog),
+            'compression_ratio': raw / total if total else 1.,
+            'n_expired': self._queue.n_expired,
+            'species': {k: dict(v) for k, v in self._stats.items()}}
+
+    def _species_stats(self, species: Any) -> Dict[str, int]:
+        return self._stats.setdefault(species, {
+            'sent_bytes': 0, 'raw_bytes': 0, 'n_sent': 0, 'n_shrunk': 0,
+            'n_skipped': 0})
+
     async def _process_queue(self) -> None:
         """Start to publish the accumulated queue of messages.
 
@@ -59,16 +211,41 @@ class QueueingSerialServer(serial_server.SerialServer):
         time as long as the requests for publication come in faster than what
         the link can handle.
         """
-        if not self._queue.queue:
+        if not self._queue:
             return
         n_published = 0
+
+        def rank(species: Any, item: tuple) -> float:
+            return self.scheduler.wait_time(species, len(item[0]))
+
         try:
             serial_server.LOGGER.debug("Publishing queue...")
             self.uplink_blocked = True
             while True:
-                await self._loop.run_in_executor(None, functools.partial(
-                    super().publish, self._queue.pop()))
+                data, species, on_sent = self._queue.pop(key=rank)
+                raw_length = len(data)
+                if self._recording is not None:
+                    self._recording.write(data)
+                if self._compressor is not None:
+                    data = self._compressor.compress(data)
+                self.scheduler.charge(species, len(data))
+                start = time.monotonic()
+                await super().publish(data)
+                # The OS buffers writes.  Don't hand over the next message
+                # before this one is (estimated to be) on the wire, as
+                # that would take the decision on what to send next from us.
+                remaining = (self.scheduler.transmit_time(len(data))
+                             - (time.monotonic() - start))
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+                self._busy_time += time.monotonic() - start
+                stats = self._species_stats(species)
+                stats['sent_bytes'] += len(data)
+                stats['raw_bytes'] += raw_length
+                stats['n_sent'] += 1
                 n_published += 1
+                if callable(on_sent):
+                    on_sent()
         except IndexError:
             self.uplink_blocked = False
             serial_server.LOGGER.debug("Published %s elements in a row.",
@@ -1,55 +1,58 @@
 """Imitate the .websocket_server functionality using RS232 instead of TCP/IP.
 """
 import logging
-from typing import Callable
-
-import serial
+from typing import Callable, Union
 
 from .decoder import Decoder
+from .serial_transport import SerialTransport
 from .. import logger
 
 LOGGER = logging.getLogger("serial_server")
 
 
 class SerialServer:
-    """A server that listens on and sends through a serial port."""
+    """A server that listens on and sends through a serial port.
+
+    Caller must be calling from a running asyncio loop.
+    """
 
     def __init__(self, device: str,
                  received_msg_callback: Callable[[str], None] = None,
                  baudrate: int = 19200) -> None:
         try:
-            self._dev = serial.Serial(port=device, baudrate=baudrate)
-        except (FileNotFoundError, serial.SerialException):
+            self._transport = SerialTransport(device, baudrate,
+                                              on_receive=self._on_receive)
+        except ConnectionError:
             LOGGER.error("Failed to open serial connection for serving.")
             raise ConnectionError("Starting serial connection for server "
                                   "failed.")
         self._rcv_callback = received_msg_callback
-        LOGGER.info("Creating instance. Do call the async_init() fcn.")
-
-    def publish(self, data: str) -> None:
-        """Send the given string over the serial interface."""
-        bytestream = data.encode()
-        n_bytes = len(bytestream)
-        n_transmitted_bytes = self._dev.write(bytestream)
-        if n_transmitted_bytes == n_bytes:
-            LOGGER.debug("Sent message: %s", logger.ellipsicate(data))
-        else:
-            LOGGER.warning("Error transmitting Message: %s",
-                           logger.ellipsicate(data))
+        self._collector = Decoder()
+        LOGGER.info("Creating instance. Do call serve().")
+
+    async def publish(self, data: Union[str, bytes]) -> None:
+        """Send the given string or binary frame over the serial interface.
+
+        Returns as soon as the data was handed over to the OS.
+        """
+        self._transport.write(data)
+        await self._transport.drain()
+        LOGGER.debug("Sent message: %s", logger.Ellipsicated(data))
 
     def serve(self) -> None:
-        """Start listening. This blocks indefinitely. Use threading."""
-        LOGGER.info("Listening on port %s", self._dev.port)
-        collector = Decoder()
-        while True:
-            # Receive data. This will block until some data is received.
-            # This will avoid busy waiting.
-            data = self._dev.read(1)
-            data += self._dev.read(self._dev.in_waiting)
-            collector.feed(data)
-            if collector.n_pending() > 0:
-                messages = collector.harvest()
-                for msg in messages:
-                    LOGGER.debug("Received message: %s", msg)
-                    if callable(self._rcv_callback):
-                        self._rcv_callback(msg)
+        """Start listening.  Received messages are passed to the callback as
+        soon as they are complete.
+        """
+        LOGGER.info("Listening on port %s", self._transport.port)
+        self._transport.start_reading()
+
+    def close(self) -> None:
+        self._transport.close()
+
+    def _on_receive(self, data: bytes) -> None:
+        self._collector.feed(data)
+        if self._collector.n_pending() > 0:
+            for msg in self._collector.harvest():
+                LOGGER.debug("Received message: %s", logger.Ellipsicated(msg))
+                if callable(self._rcv_callback):
+                    self._rcv_callback(msg)
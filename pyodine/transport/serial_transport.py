@@ -0,0 +1,132 @@
+"""Non-blocking serial port access, driven by the asyncio event loop.
+
+Instead of blocking a thread on ``read()`` or polling ``in_waiting``, the port's
+file descriptor is watched by the event loop.  Received data is passed on as
+soon as it arrives and writes never block the loop.  No executor threads are
+involved, which leaves the default executor to the DAQ and DDS calls.
+
+This only works on POSIX systems.
+"""
+import asyncio
+import logging
+import os
+from typing import Callable, Union  # pylint: disable=unused-import
+
+import serial
+
+LOGGER = logging.getLogger('pyodine.transport.serial_transport')
+
+READ_CHUNK_SIZE = 4096
+
+
+class SerialTransport:
+    """A serial port whose I/O is handled by the asyncio loop.
+
+    Caller must be calling from a running asyncio loop.
+    """
+
+    def __init__(self, device: str, baudrate: int,
+                 on_receive: Callable[[bytes], None] = None) -> None:
+        """Open the port.  Call ``start_reading()`` to receive data.
+
+        :param on_receive: Is called with every chunk of received bytes.
+        :raises ConnectionError: Couldn't open the port.
+        """
+        try:
+            # pyserial opens the port in non-blocking mode.
+            self._dev = serial.Serial(port=device, baudrate=baudrate, timeout=0)
+        except (FileNotFoundError, serial.SerialException) as err:
+            raise ConnectionError(
+                "Couldn't open serial port {}.".format(device)) from err
+        self._fd = self._dev.fileno()
+        self._loop = asyncio.get_event_loop()
+        self._on_receive = on_receive
+        self._write_buffer = bytearray()
+        self._drained = None  # type: asyncio.Future
+        self._is_reading = False
+
+    @property
+    def port(self) -> str:
+        return self._dev.port
+
+    @property
+    def dev(self) -> serial.Serial:
+        """The underlying port.  Use for modem lines only, not for I/O."""
+        return self._dev
+
+    def start_reading(self) -> None:
+        """Pass all data received from now on to the ``on_receive`` callback."""
+        if not self._is_reading:
+            self._loop.add_reader(self._fd, self._read_ready)
+            self._is_reading = True
+
+    def stop_reading(self) -> None:
+        if self._is_reading:
+            self._loop.remove_reader(self._fd)
+            self._is_reading = False
+
+    def write(self, data: Union[str, bytes]) -> None:
+        """Send ``data`` without blocking.
+
+        What can't be written right away is buffered and sent as soon as the
+        port is ready.  Await ``drain()`` to wait for that.
+        """
+        bytestream = data.encode() if isinstance(data, str) else data
+        if not self._write_buffer:
+            try:
+                n_written = os.write(self._fd, bytestream)
+            except BlockingIOError:
+                n_written = 0
+            bytestream = bytestream[n_written:]
+            if not bytestream:
+                return
+            self._loop.add_writer(self._fd, self._write_ready)
+        self._write_buffer.extend(bytestream)
+
+    async def drain(self) -> None:
+        """Wait until all written data was handed over to the OS."""
+        if not self._write_buffer:
+            return
+        if self._drained is None or self._drained.done():
+            self._drained = self._loop.create_future()
+        await asyncio.shield(self._drained)
+
+    def close(self) -> None:
+        self.stop_reading()
+        if self._write_buffer:
+            self._loop.remove_writer(self._fd)
+            self._write_buffer.clear()
+        self._set_drained()
+        self._dev.close()
+
+    def _read_ready(self) -> None:
+        try:
+            data = os.read(self._fd, READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            LOGGER.error("Reading from %s failed. Stopping.", self.port)
+            LOGGER.debug("Reason:", exc_info=True)
+            self.stop_reading()
+            return
+        if data and callable(self._on_receive):
+            self._on_receive(data)
+
+    def _write_ready(self) -> None:
+        try:
+            n_written = os.write(self._fd, self._write_buffer)
+        except BlockingIOError:
+            return
+        except OSError:
+            LOGGER.error("Writing to %s failed. Dropping %s bytes.", self.port,
+                         len(self._write_buffer))
+            LOGGER.debug("Reason:", exc_info=True)
+            n_written = len(self._write_buffer)
+        del self._write_buffer[:n_written]
+        if not self._write_buffer:
+            self._loop.remove_writer(self._fd)
+            self._set_drained()
+
+    def _set_drained(self) -> None:
+        if self._drained is not None and not self._drained.done():
+            self._drained.set_result(None)
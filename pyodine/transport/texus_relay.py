@@ -1,5 +1,6 @@
 """Communication with the TEXUS flight signals."""
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import enum
 import logging
 from typing import Awaitable, Callable, Dict, List, Optional
@@ -38,6 +39,11 @@ class TexusRelay:
                                   "TEXUS relay.")
         self._recent_state = None  # type: List[bool]
 
+        # The modem line ioctls are quick, but USB adapters can make them
+        # block.  Use a private thread for them so they don't compete with DAQ
+        # and DDS calls for the default executor.
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
     async def get_full_set(self) -> Dict[str, bool]:
         """Return a Dict of all signal lines.
 
@@ -61,7 +67,7 @@ class TexusRelay:
             except Exception as err:
                 raise ConnectionError("Failed to get TEXUS flags.") from err
 
-        return await GL.loop.run_in_executor(None, hw_blocking_call)
+        return await GL.loop.run_in_executor(self._executor, hw_blocking_call)
 
     @property
     def tex1(self) -> bool:
@@ -147,7 +153,7 @@ class TexusRelay:
                 LOGGER.debug("Reason:", exc_info=True)
             return self._recent_state
 
-        return await GL.loop.run_in_executor(None, get_state)
+        return await GL.loop.run_in_executor(self._executor, get_state)
 
     async def poll_timer(
             self,
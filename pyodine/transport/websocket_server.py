@@ -2,21 +2,153 @@
 
 It manages a list of subscribers to whom it can publish data.
 It can forward received messages to a callback handler.
+
+Clients choose the wire format by requesting a WebSocket subprotocol.  Clients
+requesting ``SUBPROTOCOL_BINARY`` receive binary frames (see ``packer``), all
+others receive JSON messages.  Either way, a message is encoded only once.  It
+is then wrapped into a websocket frame once per frame format (see
+``prepare_frame()``) and the very same frame is written to all clients using
+that format.
+
+Large binary frames are compressed by ``packer`` already, which is why
+permessage-deflate is only negotiated with JSON clients.  It is negotiated
+without context takeover on the server side, so that a message deflated once is
+valid for every JSON client.
+
+Every subscriber has its own outgoing queue that is worked off by a dedicated
+writer task.  This way, a slow client doesn't hold up publishing to the
+others.  Queued messages of the same species replace each other, and clients
+that stop making progress are disconnected.
 """
 import asyncio
+import functools
 import logging
-from typing import Callable
+import struct
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union  # pylint: disable=unused-import
 import websockets
+from websockets.extensions.permessage_deflate import (
+    PerMessageDeflate, ServerPerMessageDeflateFactory)
 
+from . import packer
+from .. import constants as cs
 from .. import logger
+from ..util import asyncio_tools
 
 LOGGER = logging.getLogger("pyodine.transport.websocket_server")
 
+SUBPROTOCOL_BINARY = 'pyodine.binary.v1'
+SUBPROTOCOL_JSON = 'pyodine.json'
+
+MAX_QUEUED_MESSAGES = 50
+"""Disconnect clients that have more than this many messages waiting."""
+MAX_STALL_TIME = 10.
+"""Disconnect clients that haven't accepted a message for ~ seconds while
+there were messages waiting for them."""
+
 # The websockets' protocol logger dumps every message sent and reiceived when
 # set to DEBUG. We thus degrade to INFO.
 logging.getLogger('websockets.protocol').setLevel(logging.INFO)
 
 
+
+
+def prepare_frame(data: Union[str, bytes], deflate_bits: int = 0) -> bytes:
+    """Wrap a message into a complete, unmasked websocket frame.
+
+    Server frames are the same for every client that negotiated the same
+    extensions, so they can be written to all of them as is.
+
+    :param data: Strings are sent as text, bytes as binary messages.
+    :param deflate_bits: Compress the message as permessage-deflate without
+                context takeover does, using a window of that many bits.  Don't
+                compress if 0.
+    """
+    if isinstance(data, str):
+        opcode, payload = 0x1, data.encode()
+    else:
+        opcode, payload = 0x2, bytes(data)
+    first_byte = 0x80 | opcode  # FIN
+    if deflate_bits:
+        encoder = zlib.compressobj(wbits=-deflate_bits)
+        payload = encoder.compress(payload) + encoder.flush(zlib.Z_SYNC_FLUSH)
+        if payload.endswith(b'\x00\x00\xff\xff'):
+            payload = payload[:-4]
+        first_byte |= 0x40  # RSV1: compressed
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', first_byte, length)
+    elif length < 2**16:
+        header = struct.pack('!BBH', first_byte, 126, length)
+    else:
+        header = struct.pack('!BBQ', first_byte, 127, length)
+    return header + payload
+
+
+class _Protocol(websockets.WebSocketServerProtocol):
+    """Negotiates permessage-deflate with JSON clients only and writes
+    prepared frames.
+    """
+
+    def process_extensions(self, headers: Any, available_extensions: Any) -> Any:
+        # Extensions are processed before the subprotocol during handshake.
+        subprotocol = self.process_subprotocol(headers,
+                                               self.available_subprotocols)
+        if subprotocol == SUBPROTOCOL_BINARY:
+            return None, []
+        return super().process_extensions(headers, available_extensions)
+
+    @property
+    def frame_format(self) -> Optional[int]:
+        """The ``deflate_bits`` of ``prepare_frame()`` to use for this client.
+        None if prepared frames can't be used due to the extensions in use.
+        """
+        if not self.extensions:
+            return 0
+        extension = self.extensions[0]
+        if (len(self.extensions) == 1
+                and isinstance(extension, PerMessageDeflate)
+                and extension.local_no_context_takeover):
+            return extension.local_max_window_bits
+        return None
+
+    async def send_prepared(self, frame: bytes) -> None:
+        """Write a frame created by ``prepare_frame()`` as is.
+
+        :raises websockets.exceptions.ConnectionClosed: Connection is closed.
+        """
+        await self.ensure_open()
+        self.transport.write(frame)
+        # Handle flow control, as ``send()`` does.  Older websockets versions
+        # must not drain concurrently.
+        drain_lock = getattr(self, '_drain_lock', None)
+        try:
+            if drain_lock is None:
+                await self._drain()
+            else:
+                async with drain_lock:
+                    await self._drain()
+        except ConnectionError:
+            self.fail_connection()
+            await self.ensure_open()
+
+
+class _Subscriber:  # pylint: disable=too-few-public-methods
+    """Outgoing queue and statistics of one connected client."""
+
+    def __init__(self, socket: Any, now: float) -> None:
+        self.socket = socket
+        self.queue = asyncio_tools.DeDupQueue()
+        """Holds (data, prepared frame or None, time of enqueueing, on_sent
+        callback) tuples."""
+        self.has_news = asyncio.Event()
+        self.writer = None  # type: asyncio.Task
+        self.last_progress = now  # Last time the queue was empty or sent.
+        self.latency = 0.  # Time from enqueueing to sent of last message.
+        self.n_sent = 0
+        self.n_replaced = 0
+
+
 class WebsocketServer:
     """Sets up a listening WebSocket server on given TCP port.
 
@@ -26,37 +158,186 @@ class WebsocketServer:
 
     def __init__(self, port: int,
                  on_msg_receive: Callable[[str], None] = None,
-                 on_client_connect: Callable[[], None] = None) -> None:
+                 on_client_connect: Callable[[Any], None] = None,
+                 on_client_disconnect: Callable[[Any], None] = None) -> None:
         """Mustn't be run alone. Be sure to await the async_init() coroutine
         afterwards.
         The default port number is inspired by the 56(32)-0 iodine hyperfine
         transition. If you want to use lower port numbers, the OS will probably
         ask you for superuser privileges.
+
+        :param on_client_connect: Is called with the client's socket whenever
+                    a client connects.  The socket may be used to address the
+                    client in ``publish_message()``.
+        :param on_client_disconnect: Is called with the socket of a client
+                    that disconnected.
         """
         # pylint: disable=unsubscriptable-object
 
         self.port = port
         self.subscribers = set()  # type: set
+        self._serving = None  # type: asyncio.Future
+        self._clients = {}  # type: Dict[Any, _Subscriber]
+        self._loop = asyncio.get_event_loop()
         self._rcv_callback = on_msg_receive
         self._client_connected_callback = on_client_connect
+        self._client_disconnected_callback = on_client_disconnect
         LOGGER.info("Creating instance. Do call the async_init() fcn.")
 
     async def async_init(self) -> None:
         """This must be awaited after instantiation."""
         LOGGER.info("async_init() called.")
         LOGGER.info("Starting server on port %d.", self.port)
-        asyncio.ensure_future(websockets.serve(
-            lambda ws, _: self._register_subscriber(ws), port=self.port))
+        self._serving = asyncio.ensure_future(websockets.serve(
+            lambda ws, _: self._register_subscriber(ws), port=self.port,
+            subprotocols=[SUBPROTOCOL_BINARY, SUBPROTOCOL_JSON],
+            create_protocol=_Protocol, compression=None,
+            extensions=[ServerPerMessageDeflateFactory(
+                server_no_context_takeover=True)]))
+
+    async def close(self) -> None:
+        """Stop serving and disconnect all clients."""
+        if self._serving is None:
+            return
+        server = await self._serving
+        server.close()
+        await server.wait_closed()
+
+    async def publish(self, data: Union[str, bytes], species: Any = None) -> None:
+        """Queue an already encoded message for all subscribers as is.
 
-    async def publish(self, data: str) -> None:
+        :param species: Queued messages of the same species replace each other.
+                    If None, the message doesn't replace anything.
+        """
         if self.subscribers:
-            # Send data to every subscriber.
-            await asyncio.wait([ws.send(data) for ws in self.subscribers])
-            LOGGER.debug("Published: %s", logger.ellipsicate(data))
+            self._enqueue_all(list(self.subscribers), data, species)
+            LOGGER.debug("Published: %s", logger.Ellipsicated(data))
         else:
             LOGGER.debug("Won't publish as there are no subscribers "
                          "connected.")
 
+    async def publish_message(self, payload: Dict[str, Any], msg_type: str,
+                              clients: Iterable[Any] = None,
+                              on_sent: Callable[[Any], None] = None) -> None:
+        """Encode a message in each client's preferred format and queue it.
+
+        Every format is only encoded and framed once, and only if there are
+        clients that use it.  Messages longer than
+        ``cs.WS_COMPRESS_FRAMES_ABOVE`` are compressed.  Queued messages of the
+        same type replace each other.
+
+        :param clients: Only send to those subscribers.  Defaults to all.
+        :param on_sent: Is called with a client's socket once the message was
+                    actually sent to that client.  It is not called for
+                    clients to which the message was never sent.
+        """
+        recipients = (self.subscribers if clients is None
+                      else self.subscribers.intersection(clients))
+        if not recipients:
+            LOGGER.debug("Won't publish as there are no subscribers "
+                         "connected.")
+            return
+        binary = [ws for ws in recipients
+                  if ws.subprotocol == SUBPROTOCOL_BINARY]
+        text = [ws for ws in recipients
+                if ws.subprotocol != SUBPROTOCOL_BINARY]
+        create_frame = functools.partial(
+            packer.create_frame, compress_above=cs.WS_COMPRESS_FRAMES_ABOVE)
+        for sockets, encode in ((binary, create_frame),
+                                (text, packer.create_message)):
+            if not sockets:
+                continue
+            data = encode(payload, msg_type)
+            if not data:
+                continue
+            self._enqueue_all(sockets, data, msg_type, on_sent)
+        LOGGER.debug("Published %s message.", msg_type)
+
+    def get_client_stats(self) -> List[Dict[str, Any]]:
+        """Queue depth and send latency (seconds) for every client."""
+        return [{'address': client.socket.remote_address,
+                 'queue_depth': len(client.queue),
+                 'latency': client.latency,
+                 'n_sent': client.n_sent,
+                 'n_replaced': client.n_replaced}
+                for client in self._clients.values()]
+
+    def _enqueue_all(self, sockets: Iterable[Any], data: Union[str, bytes],
+                     species: Any,
+                     on_sent: Callable[[Any], None] = None) -> None:
+        """Queue ``data`` for all ``sockets``, framing it once per format."""
+        frames = {}  # type: Dict[int, bytes]
+        for socket in sockets:
+            frame_format = getattr(socket, 'frame_format', None)
+            frame = None
+            if frame_format is not None:
+                frame = frames.get(frame_format)
+                if frame is None:
+                    deflate = (frame_format and isinstance(data, str)
+                               and cs.WS_COMPRESS_FRAMES_ABOVE is not None
+                               and len(data) > cs.WS_COMPRESS_FRAMES_ABOVE)
+                    frame = frames[frame_format] = prepare_frame(
+                        data, frame_format if deflate else 0)
+            self._enqueue(socket, data, frame, species,
+                          (lambda s=socket: on_sent(s)) if on_sent else None)
+
+    def _enqueue(self, socket: Any, data: Union[str, bytes],
+                 frame: Optional[bytes], species: Any,
+                 on_sent: Callable[[], None] = None) -> None:
+        client = self._clients.get(socket)
+        if client is None:
+            return
+        now = self._loop.time()
+        if not client.queue:
+            client.last_progress = now
+        n_queued = len(client.queue)
+        client.queue.enqueue((data, frame, now, on_sent),
+                             object() if species is None else species)
+        if len(client.queue) == n_queued:
+            client.n_replaced += 1
+        if (len(client.queue) > MAX_QUEUED_MESSAGES
+                or now - client.last_progress > MAX_STALL_TIME):
+            LOGGER.warning("Client %s is lagging behind (%s messages queued). "
+                           "Disconnecting.", socket.remote_address,
+                           len(client.queue))
+            self._drop_client(socket)
+            return
+        client.has_news.set()
+
+    def _drop_client(self, socket: Any) -> None:
+        client = self._clients.pop(socket, None)
+        if client is None:
+            return
+        if client.writer is not None:
+            client.writer.cancel()
+        self.subscribers.discard(socket)
+        asyncio.ensure_future(socket.close())
+
+    async def _write(self, client: _Subscriber) -> None:
+        """Work off a client's queue.  Runs as long as the client is there."""
+        try:
+            while True:
+                await client.has_news.wait()
+                client.has_news.clear()
+                while client.queue:
+                    data, frame, enqueued_at, on_sent = client.queue.pop()
+                    if frame is None:
+                        await client.socket.send(data)
+                    else:
+                        await client.socket.send_prepared(frame)
+                    now = self._loop.time()
+                    client.last_progress = now
+                    client.latency = now - enqueued_at
+                    client.n_sent += 1
+                    if callable(on_sent):
+                        asyncio_tools.safe_call(on_sent)
+                LOGGER.debug("Client %s is up to date. Latency was %.3fs.",
+                             client.socket.remote_address, client.latency)
+        except (websockets.exceptions.ConnectionClosed, ConnectionError):
+            # Unregistering is done by the receiving end in
+            # `_register_subscriber()`.
+            LOGGER.debug("Connection closed while sending.")
+
     async def _create_loopback(
             self, socket: websockets.protocol.WebSocketCommonProtocol) -> None:
         while True:
@@ -70,9 +351,12 @@ class WebsocketServer:
 
         This also launches a task that maintains the connection to them.
         """
+        client = _Subscriber(socket, self._loop.time())
+        client.writer = self._loop.create_task(self._write(client))
+        self._clients[socket] = client
         self.subscribers.add(socket)
         if callable(self._client_connected_callback):
-            self._client_connected_callback()
+            self._client_connected_callback(socket)
         LOGGER.info("Subscribed a client. There are %d connected clients.",
                     len(self.subscribers))
         try:
@@ -87,6 +371,9 @@ class WebsocketServer:
                 LOGGER.debug("Received message: %s", message)
         except (websockets.exceptions.ConnectionClosed, ConnectionError,
                 AssertionError):
-            self.subscribers.remove(socket)
-            LOGGER.info("Unsubscribed a client. %d clients left.",
-                        len(self.subscribers))
+            pass
+        self._drop_client(socket)
+        LOGGER.info("Unsubscribed a client. %d clients left.",
+                    len(self.subscribers))
+        if callable(self._client_disconnected_callback):
+            self._client_disconnected_callback(socket)
@@ -3,7 +3,8 @@
 import asyncio
 import logging
 import time
-from typing import Any, Awaitable, Callable, List, Optional, Tuple, Union  # pylint: disable=unused-import
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union  # pylint: disable=unused-import
 
 LOGGER = logging.getLogger('asyncio_tools')
 
@@ -16,15 +17,17 @@ def safe_call(callback: Callable, *args: Any, **kwargs: Any) -> Any:
 
     :param callback: The function to call. May expect arbitrary combination of
                 arguments, as long as they are passed to me. It's return value
-                is returned if the call succeeds.
+                is returned if the call succeeds, None otherwise.
     """
+    name = getattr(callback, '__name__', callback)  # partials have no name
+    rval = None
     try:
         rval = callback(*args, **kwargs)
     except Exception:  # It might raise hell. # pylint: disable=broad-except
-        LOGGER.exception("""Error calling callback "%s"!""", callback.__name__)
+        LOGGER.exception("""Error calling callback "%s"!""", name)
     if asyncio.iscoroutine(rval):
         LOGGER.error("Callback %s returned a coroutine.  This is very "
-                     "likely to be a mistake.", callback.__name__)
+                     "likely to be a mistake.", name)
         LOGGER.info("Consider using safe_async_call() for async calls.")
     return rval
 
@@ -122,8 +125,9 @@ async def poll_resource(indicator: Callable[[], Union[bool, Awaitable[bool]]],
 
     # This outer loop will only run more than once if the user wants us to keep
     # observing a currently healthy connection.
+    is_online = await safe_async_call(indicator)
     while True:
-        if not await safe_async_call(indicator):
+        if not is_online:
             LOGGER.info("Trying to connect connect %s.", name)
             while not await safe_async_call(indicator):
                 LOGGER.debug("Resource %s is still offline.", name)
@@ -134,10 +138,13 @@ async def poll_resource(indicator: Callable[[], Union[bool, Awaitable[bool]]],
         if not continuous:
             LOGGER.info("Stopped polling of resource %s.", name)
             break
-        if not indicator():  # There was a connection, but it got lost.
+        await asyncio.sleep(float(delay))
+
+        # Every loss of connection must be reported, as every reconnection is.
+        is_online = await safe_async_call(indicator)
+        if not is_online:
             await safe_async_call(on_disconnect)
             LOGGER.info("Resource %s became unavailable.", name)
-        await asyncio.sleep(float(delay))
 
 
 async def repeat_task(
@@ -210,39 +217,104 @@ async def watch_loop(on_delay: Callable[[], Any],
 
 
 class DeDupQueue:
-    """A deduplicating FIFO queue.
+    """A deduplicating FIFO queue with optional priorities and expiry.
 
     When a specimen is enqueued of whose species there currently is an element
     in the queue, the existing element is replaced by the new element without
     changing the queue order.
-    """
-    def __init__(self) -> None:
-        self.queue = []  # type: List[Tuple[Any, Any]]
-        """List of tuples like (specimen, species).
 
-        The last item is returned first.
+    Elements of higher priority species are always popped before those of
+    lower priority.  Within the same priority, the queue is FIFO.  Enqueueing
+    and popping is O(1) with respect to the number of queued elements.
+    """
+    def __init__(self, priorities: Dict[Any, int] = None,
+                 max_ages: Dict[Any, float] = None) -> None:
         """
+        :param priorities: Priority of each species.  Higher goes first.
+                    Species not mentioned have priority 0.
+        :param max_ages: Discard elements of those species instead of popping
+                    them if they were enqueued more than ~ seconds ago.
+                    Replacing an element resets its age, as its content is
+                    new.
+        """
+        self.priorities = priorities or {}  # type: Dict[Any, int]
+        self.max_ages = max_ages or {}  # type: Dict[Any, float]
+        self.n_expired = 0
+        """Number of elements discarded due to ``max_ages``."""
+        self._levels = {}  # type: Dict[int, OrderedDict]
+        """Maps priorities to {species: (specimen, time enqueued)}."""
+        self._order = []  # type: List[int]
+        """Priorities currently in use, highest first."""
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
 
     def enqueue(self, specimen: Any, species: Any) -> None:
         """Enqueue an element or update an existing specimen.
 
         :param specimen: The actual item to store. Can be of any type.
         :param species: The identifying info to use when comparing to other
-                    items. Needs to == to existing element's species. Can be of
-                    any type.
+                    items. Needs to be hashable.
         """
-        for index, item in enumerate(self.queue):
-            if item[1] == species:
-                self.queue[index] = (specimen, species)
-                break
-        else:
-            self.queue.insert(0, (specimen, species))
-
-    def pop(self) -> Any:
+        priority = self.priorities.get(species, 0)
+        level = self._levels.get(priority)
+        if level is None:
+            level = self._levels[priority] = OrderedDict()
+            self._order = sorted(self._levels, reverse=True)
+        if species not in level:
+            self._length += 1
+        level[species] = (specimen, time.monotonic())  # Keeps position.
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        """All (species, specimen) pairs in the order they would be popped."""
+        return [(species, specimen) for priority in self._order
+                for species, (specimen, _) in self._levels[priority].items()]
+
+    def pop(self, key: Callable[[Any, Any], Any] = None) -> Any:
         """Retrieve the most urgent element and remove it from the queue.
 
-        ``if not bool(self.queue)``, this will throw.
+        Expired elements are silently discarded on the way.
 
-        :raises IndexError: Queue is empty. Checkable by ``bool(self.queue)``.
+        :param key: If given, pop the element for which ``key(species,
+                    specimen)`` is lowest instead.  Ties are resolved by the
+                    usual order.  This is O(n).
+        :raises IndexError: Queue is empty. Checkable by ``len(queue)``.
         """
-        return self.queue.pop()[0]  # Raises if queue is empty.
+        if key is not None:
+            return self._pop_by_key(key)
+        for priority in self._order:
+            level = self._levels[priority]
+            while level:
+                species, (specimen, enqueued_at) = level.popitem(last=False)
+                self._length -= 1
+                if self._is_expired(species, enqueued_at):
+                    continue
+                return specimen
+        raise IndexError("pop from empty queue")
+
+    def _pop_by_key(self, key: Callable[[Any, Any], Any]) -> Any:
+        best = None  # type: Tuple[Any, OrderedDict, Any]
+        for priority in self._order:
+            level = self._levels[priority]
+            for species, (specimen, enqueued_at) in list(level.items()):
+                if self._is_expired(species, enqueued_at):
+                    del level[species]
+                    self._length -= 1
+                    continue
+                rank = key(species, specimen)
+                if best is None or rank < best[0]:
+                    best = (rank, level, species)
+        if best is None:
+            raise IndexError("pop from empty queue")
+        _, level, species = best
+        self._length -= 1
+        return level.pop(species)[0]
+
+    def _is_expired(self, species: Any, enqueued_at: float) -> bool:
+        max_age = self.max_ages.get(species)
+        if max_age is not None and time.monotonic() - enqueued_at > max_age:
+            self.n_expired += 1
+            LOGGER.debug("Discarded expired %s element.", species)
+            return True
+        return False